@@ -0,0 +1,85 @@
+"""List-of-lists vs. bitboard: time and allocations for one game turn.
+
+Run from the repository root:
+    python -m benchmarks.bench_board
+"""
+import copy
+import random
+import time
+import tracemalloc
+
+from bitBoard import Board
+from ticTacToe import evaluate, is_moves_left, reachable_boards
+
+
+# ---- the per-turn work main.main did with lists ----
+
+def list_turn(previous, det_board):
+    detected = [[('x' if c == 'X' else ('o' if c == 'O' else '_')) for c in row] for row in det_board]
+    diffs = []
+    for i in range(3):
+        for j in range(3):
+            if previous[i][j] != detected[i][j]:
+                diffs.append((i, j))
+    current = detected
+    snapshot = copy.deepcopy(current)       # previous = deepcopy(current)
+    search = copy.deepcopy(current)         # best_move_for_robot(deepcopy(current))
+    swap = {'x': 'o', 'o': 'x', '_': '_'}
+    swapped = [[swap[c] for c in row] for row in search]
+    return evaluate(current), is_moves_left(current), diffs, snapshot, swapped
+
+
+def board_turn(previous, det_board):
+    current = det_board
+    diffs = previous.diff(current)
+    snapshot = current
+    swapped = current.swapped()
+    return evaluate(current), is_moves_left(current), diffs, snapshot, swapped
+
+
+def measure(fn, pairs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for prev, det in pairs:
+            fn(prev, det)
+    elapsed = (time.perf_counter() - start) / (repeat * len(pairs))
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [fn(prev, det) for prev, det in pairs]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    allocated = sum(s.size_diff for s in stats if s.size_diff > 0)
+    del results
+    return elapsed, allocated / len(pairs)
+
+
+def main():
+    rng = random.Random(0)
+    boards = reachable_boards()
+    sample = [boards[rng.randrange(len(boards))] for _ in range(2000)]
+
+    list_pairs, board_pairs = [], []
+    for cells in sample:
+        rows = [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+        det = [[c.upper() if c != '_' else ' ' for c in row] for row in rows]
+        list_pairs.append((rows, det))
+        board_pairs.append((Board.from_rows(rows), Board.from_rows(det)))
+
+    t_list, m_list = measure(list_turn, list_pairs, repeat=20)
+    t_board, m_board = measure(board_turn, board_pairs, repeat=20)
+    print(f"lists   : {t_list * 1e6:7.2f} us/turn, {m_list:7.0f} B retained/turn")
+    print(f"bitboard: {t_board * 1e6:7.2f} us/turn, {m_board:7.0f} B retained/turn")
+    print(f"speedup x{t_list / t_board:.1f}, {m_list - m_board:.0f} B/turn less allocation")
+
+    b = Board.from_rows(list_pairs[0][0])
+    for name, fn in (("winner", b.winner), ("has_moves", b.has_moves), ("hash", b.__hash__)):
+        start = time.perf_counter()
+        for _ in range(200000):
+            fn()
+        print(f"Board.{name:<9}: {(time.perf_counter() - start) / 200000 * 1e9:6.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
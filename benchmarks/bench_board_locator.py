@@ -0,0 +1,86 @@
+"""Fixed-thirds vs. homography cell mapping on recorded frames.
+
+Replays a folder of frames in name order through process_frame with and
+without a BoardLocator and reports the localization cost (full locate vs.
+the cached check) and, if the folder has a labels.json, per-cell accuracy of
+both mappings. labels.json maps a file name to the expected board as three
+rows in process_frame orientation, e.g. {"img_03.png": ["X__", "_O_", "___"]}.
+
+Run from the repository root:
+    python -m benchmarks.bench_board_locator [frame_dir] [weights]
+"""
+import json
+import os
+import sys
+import time
+
+from benchmarks.bench_cell_inference import load_frames
+from bitBoard import Board
+from boardLocator import BoardLocator
+from detectGrid import DEFAULT_CONF, DEFAULT_WEIGHTS, process_frame
+
+
+def cell_errors(board, expected):
+    return sum(board.cell(i, j) != expected.cell(i, j) for i in range(3) for j in range(3))
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else "debug"
+    weights = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEIGHTS
+    frames = load_frames(folder)
+    if not frames:
+        raise SystemExit(f"No frames found in {folder}")
+    labels = {}
+    label_path = os.path.join(folder, "labels.json")
+    if os.path.exists(label_path):
+        with open(label_path) as f:
+            labels = {name: Board.from_rows(rows) for name, rows in json.load(f).items()}
+
+    # localization cost alone: a fresh locate vs. the cached still_valid check
+    locator = BoardLocator()
+    locate_sec = check_sec = 0.0
+    found = 0
+    for _, frame in frames:
+        t0 = time.perf_counter()
+        found += locator.locate(frame)
+        t1 = time.perf_counter()
+        locator.still_valid(frame)
+        check_sec += time.perf_counter() - t1
+        locate_sec += t1 - t0
+
+    from ultralytics import YOLO  # only the model needs ultralytics
+    model = YOLO(weights)
+    model.predict(source=frames[0][1], conf=DEFAULT_CONF, verbose=False)  # warm-up
+    locator = BoardLocator()
+    thirds_sec = rect_sec = 0.0
+    thirds_err = rect_err = labelled = 0
+    for path, frame in frames:
+        t0 = time.perf_counter()
+        thirds, _ = process_frame(frame, model, conf_thr=DEFAULT_CONF)
+        t1 = time.perf_counter()
+        rect, _ = process_frame(frame, model, conf_thr=DEFAULT_CONF, locator=locator)
+        t2 = time.perf_counter()
+        thirds_sec += t1 - t0
+        rect_sec += t2 - t1
+        expected = labels.get(os.path.basename(path))
+        if expected is not None:
+            labelled += 1
+            thirds_err += cell_errors(thirds, expected)
+            rect_err += cell_errors(rect, expected)
+
+    n = len(frames)
+    print(f"{n} frames from {folder}, grid found in {found}")
+    print(f"locate      : {locate_sec / n * 1e3:7.2f} ms/frame")
+    print(f"cached check: {check_sec / n * 1e3:7.2f} ms/frame")
+    print(f"process_frame thirds    : {thirds_sec / n * 1e3:7.1f} ms/frame")
+    print(f"process_frame homography: {rect_sec / n * 1e3:7.1f} ms/frame ({locator.locate_count} re-locates)")
+    if labelled:
+        cells = 9 * labelled
+        print(f"cell accuracy on {labelled} labelled frames: thirds {1 - thirds_err / cells:.1%}, "
+              f"homography {1 - rect_err / cells:.1%}")
+    else:
+        print(f"no {label_path}: accuracy not measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Full-frame detection vs. change-masked per-cell inference on recorded frames.
+
+Replays a folder of frames in name order (e.g. the debug/img_*.png files
+save_debug_image writes during a game) through both paths and reports CPU
+time per poll, how many cells were sent to the model and how often the two
+boards disagree.
+
+Run from the repository root:
+    python -m benchmarks.bench_cell_inference [frame_dir] [weights]
+"""
+import glob
+import os
+import sys
+import time
+
+import cv2
+
+from detectGrid import DEFAULT_CONF, DEFAULT_WEIGHTS, CellInference, process_frame
+
+
+def load_frames(folder):
+    paths = sorted(p for ext in ("png", "jpg") for p in glob.glob(os.path.join(folder, f"*.{ext}")))
+    return [(p, cv2.imread(p)) for p in paths]
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else "debug"
+    weights = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEIGHTS
+    frames = load_frames(folder)
+    if not frames:
+        raise SystemExit(f"No frames found in {folder}")
+    from ultralytics import YOLO  # only the model needs ultralytics, not load_frames
+    model = YOLO(weights)
+    model.predict(source=frames[0][1], conf=DEFAULT_CONF, verbose=False)  # warm-up
+
+    cells = CellInference(model, conf_thr=DEFAULT_CONF)
+    full_cpu = cell_cpu = 0.0
+    sent = disagree = 0
+    for path, frame in frames:
+        t0 = time.process_time()
+        full_board, _ = process_frame(frame, model, conf_thr=DEFAULT_CONF)
+        t1 = time.process_time()
+        cell_board = cells(frame)
+        t2 = time.process_time()
+        full_cpu += t1 - t0
+        cell_cpu += t2 - t1
+        sent += len(cells.last_changed)
+        if full_board != cell_board:
+            disagree += 1
+            print(f"{os.path.basename(path)}: full {full_board} vs cells {cell_board}")
+
+    n = len(frames)
+    print(f"{n} frames from {folder}")
+    print(f"full frame : {full_cpu / n * 1e3:7.1f} ms CPU/poll")
+    print(f"cell crops : {cell_cpu / n * 1e3:7.1f} ms CPU/poll, {sent / n:.2f} cells/poll sent to the model")
+    print(f"boards that differ: {disagree}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Cold start, warm latency and memory of each detector backend.
+
+Each backend runs in a fresh interpreter, so cold start includes importing
+its runtime, loading the model and the first inference, and peak memory
+(max RSS) is that backend's alone. Warm latency is the median and p95 of
+`runs` detect() calls on one frame. Exported models that do not exist yet
+are exported first, outside the timed run.
+
+Run from the repository root:
+    python -m benchmarks.bench_detector_backend [frame] [weights] [runs]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BACKENDS = [("yolo", False), ("onnx", False), ("onnx", True), ("openvino", False), ("openvino", True)]
+
+
+def measure(backend, int8, frame_path, weights, runs):
+    t0 = time.perf_counter()
+    import cv2
+    import numpy as np
+    from detectorBackend import load_detector
+    from detectGrid import DEFAULT_CONF
+    detector = load_detector(weights, backend, int8=int8)
+    frame = cv2.imread(frame_path) if frame_path else None
+    if frame is None:
+        frame = np.full((480, 640, 3), 255, dtype=np.uint8)
+    detector.detect([frame], DEFAULT_CONF)
+    cold = time.perf_counter() - t0
+
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        detector.detect([frame], DEFAULT_CONF)
+        times.append(time.perf_counter() - t)
+    times.sort()
+    return {
+        "backend": detector.name + (" int8" if int8 else ""),
+        "cold_sec": cold,
+        "p50_ms": times[len(times) // 2] * 1e3,
+        "p95_ms": times[int(0.95 * (len(times) - 1))] * 1e3,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    }
+
+
+def main():
+    frame = sys.argv[1] if len(sys.argv) > 1 else ""
+    from detectGrid import DEFAULT_WEIGHTS
+    weights = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEIGHTS
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    if os.environ.get("BENCH_BACKEND"):
+        backend, int8 = os.environ["BENCH_BACKEND"].split(":")
+        print(json.dumps(measure(backend, int8 == "1", frame, weights, runs)))
+        return
+
+    from detectorBackend import export, exported_path
+    print(f"{'backend':<14} {'cold start':>10} {'warm p50':>9} {'warm p95':>9} {'max RSS':>9}")
+    for backend, int8 in BACKENDS:
+        label = backend + (" int8" if int8 else "")
+        if backend != "yolo" and not os.path.exists(exported_path(weights, backend, int8)):
+            try:
+                export(weights, backend, int8=int8)
+            except Exception as exc:
+                print(f"{label:<14} export failed: {exc}")
+                continue
+        env = dict(os.environ, BENCH_BACKEND=f"{backend}:{int(int8)}")
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_detector_backend", frame, weights, str(runs)],
+                             env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{label:<14} failed: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{r['backend']:<14} {r['cold_sec']:9.2f}s {r['p50_ms']:7.1f}ms {r['p95_ms']:7.1f}ms "
+              f"{r['max_rss_mb']:6.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Offline detector benchmark: replay labelled recordings through process_frame.
+
+Each argument before the weights is a recording that frameSource.open_source
+accepts: an image folder (e.g. the debug/ frames debugRecorder writes),
+a video file or a .raw archive from `python frameSource.py pack`. Labels map
+a frame name to the expected board as three rows in process_frame
+orientation, like bench_temporal_vote, e.g. {"img_03.png": ["X__", "_O_", "___"]};
+they come from labels.json in the folder (next to a video) or from the
+archive's metadata. Frames without a label are timed but not scored.
+
+For every recording it reports per-frame latency (p50/p95/p99), throughput,
+cell-level and board-level accuracy, and the peak resident memory the
+replay added. Weights "synthetic" uses simulate.SyntheticDetector, so the
+harness itself can be checked without model weights.
+
+Run from the repository root:
+    python -m benchmarks.bench_detector_offline <recording> [<recording> ...] [weights]
+"""
+import resource
+import sys
+import time
+
+import cv2
+
+from bitBoard import Board
+from detectGrid import DEFAULT_BACKEND, DEFAULT_CONF, DEFAULT_WEIGHTS, process_frame
+from detectorBackend import load_detector, warm_up
+from frameSource import load_labels, open_source
+from simulate import SyntheticDetector, percentiles
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0    # KB on Linux
+
+
+def replay(spec, model):
+    """Latencies and accuracy counters for one recording."""
+    src = open_source(spec)
+    if not src.isOpened():
+        raise SystemExit(f"Cannot open {spec}")
+    labels = {name: Board.from_rows(rows) for name, rows in load_labels(spec).items()}
+    stats = dict(frames=0, scored=0, boards_right=0, cells_right=0, latencies=[], sec=0.0)
+    warmed = False
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    for name, frame in src.frames():
+        if not warmed:
+            warm_up(model, frame.shape, DEFAULT_CONF)
+            warmed = True
+            start = time.perf_counter()
+        t0 = time.perf_counter()
+        board, _ = process_frame(frame, model, conf_thr=DEFAULT_CONF)
+        stats["latencies"].append(time.perf_counter() - t0)
+        stats["frames"] += 1
+        expected = labels.get(name)
+        if expected is None:
+            continue
+        stats["scored"] += 1
+        right = sum(board.cell(i, j) == expected.cell(i, j) for i in range(3) for j in range(3))
+        stats["cells_right"] += right
+        stats["boards_right"] += right == 9
+        if right != 9:
+            print(f"{spec}:{name}: read {board}, expected {expected}")
+    stats["sec"] = time.perf_counter() - start
+    stats["rss_mb"] = peak_rss_mb() - rss_before
+    src.release()
+    return stats
+
+
+def summary(label, stats):
+    n = stats["frames"]
+    p50, p95, p99 = percentiles(stats["latencies"])
+    line = (f"{label}: {n} frames, {n / max(stats['sec'], 1e-9):6.1f} fps, "
+            f"p50 {p50 * 1e3:6.1f} ms, p95 {p95 * 1e3:6.1f} ms, p99 {p99 * 1e3:6.1f} ms, "
+            f"+{stats['rss_mb']:.1f} MB peak RSS")
+    if stats["scored"]:
+        line += (f"; {stats['scored']} labelled: cells {100.0 * stats['cells_right'] / (9 * stats['scored']):5.1f}%, "
+                 f"boards {100.0 * stats['boards_right'] / stats['scored']:5.1f}%")
+    return line
+
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        raise SystemExit(__doc__.strip().splitlines()[-1].strip())
+    weights = DEFAULT_WEIGHTS
+    if len(args) > 1 and (args[-1] == "synthetic" or args[-1].endswith((".pt", ".onnx", ".xml"))):
+        weights = args.pop()
+    rss_start = peak_rss_mb()
+    model = SyntheticDetector() if weights == "synthetic" else load_detector(weights, DEFAULT_BACKEND)
+    print(f"detector {weights} loaded: +{peak_rss_mb() - rss_start:.1f} MB peak RSS, OpenCV threads {cv2.getNumThreads()}")
+
+    total = None
+    for spec in args:
+        stats = replay(spec, model)
+        print(summary(spec, stats))
+        total = stats if total is None else {k: total[k] + v for k, v in stats.items()}
+    if len(args) > 1:
+        total["rss_mb"] = peak_rss_mb() - rss_start
+        print(summary("all", total))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Drawing an O: fixed 25-degree steps vs. adaptive chords vs. native arcs.
+
+Counts commands and serial bytes per O and runs each variant on the simulated
+arm. Byte counts follow the Dobot protocol: 6 bytes of framing per packet, a
+17-byte PTP payload, a 32-byte ARC payload and an 8-byte queued-index reply.
+
+Run from the repository root:
+    python -m benchmarks.bench_draw_o [time_scale]
+"""
+import math
+import sys
+
+from dobotGrid import DobotGrid, arc_segments
+from dobotSim import SimDobot
+from motionPlan import ARC, HOME
+
+FRAME_BYTES = 6
+PAYLOAD_BYTES = {"ptp": 17, ARC: 32, HOME: 4}
+REPLY_BYTES = FRAME_BYTES + 8
+
+
+def serial_bytes(plan):
+    sent = sum(FRAME_BYTES + PAYLOAD_BYTES.get(wp.mode, PAYLOAD_BYTES["ptp"]) for wp in plan.waypoints)
+    return sent + REPLY_BYTES * len(plan)
+
+
+def run(label, scale, native_arcs, **kwargs):
+    dobot = DobotGrid(device=SimDobot(time_scale=scale))
+    dobot.native_arcs = native_arcs
+    dobot.generate_points()
+    dobot.generate_grid()
+    dobot.move_to_intermediate()
+    plan = dobot.plan_o(2, 2, **kwargs)
+    if kwargs.get("angle_step"):
+        plan.home()  # the old draw_o homed after every O
+    dobot.run_plan(plan)
+    _, expected, actual = dobot.plan_log[-1]
+    return label, len(plan), serial_bytes(plan), expected, actual * scale
+
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    radius = 15.0
+    old_sagitta = radius * (1 - math.cos(math.radians(25) / 2))
+    rows = [
+        run(f"fixed 25 deg + home (err {old_sagitta:.2f} mm)", scale, False, angle_step=25),
+        run(f"adaptive chords ({arc_segments(radius)} segs)", scale, False),
+        run("native arcs", scale, True),
+    ]
+    print()
+    for label, commands, nbytes, expected, actual in rows:
+        print(f"{label:<34} {commands:3d} commands {nbytes:5d} B  "
+              f"expected {expected:5.2f} s  simulated {actual:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Grid geometry startup cost: vectorized computation vs. the in-memory cache.
+
+Run from the repository root:
+    python -m benchmarks.bench_geometry
+"""
+import time
+
+from gridGeometry import compute_geometry, load_geometry
+
+CALIBRATION = dict(x=250, y=-80, z=-30, r=0, d=40, offset=5, lift=20)
+
+
+def timed(fn, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    for n in (3, 5, 9):
+        t_compute = timed(lambda: compute_geometry(n=n, **CALIBRATION))
+        load_geometry(n=n, **CALIBRATION)  # first use computes it
+        t_hit = timed(lambda: load_geometry(n=n, **CALIBRATION))
+        print(f"{n}x{n}: compute {t_compute * 1e6:7.1f} us | cached {t_hit * 1e6:7.3f} us")
+
+
+if __name__ == "__main__":
+    main()
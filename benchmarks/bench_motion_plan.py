@@ -0,0 +1,59 @@
+"""Batched motion plans vs. the old move-by-move drawing, on the simulated arm.
+
+The old draw_x homed before and after every X and draw_o homed after every O.
+This compares their expected durations with the compiled plans, then runs
+the plans on the simulator (pipelined, like the game loop) and prints the
+expected vs. actual stroke time of each.
+
+Run from the repository root:
+    python -m benchmarks.bench_motion_plan [time_scale]
+"""
+import sys
+
+from dobotGrid import DobotGrid
+from dobotSim import HOME_POSE, SimDobot
+from motionPlan import MotionPlan
+
+SYMBOLS = ((1, 1, "x"), (2, 2, "o"), (3, 3, "x"), (3, 1, "o"), (1, 3, "x"))
+
+
+def legacy_plan(plan, home_before):
+    """The same strokes with the homing runs the old drawing code added."""
+    legacy = MotionPlan(plan.name + " (old)")
+    if home_before:
+        legacy.home()
+    legacy.waypoints += plan.waypoints
+    return legacy.home()
+
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    dobot = DobotGrid(device=SimDobot(time_scale=scale))
+    dobot.generate_points()
+    dobot.generate_grid()
+
+    print("\nExpected duration per symbol (from the home pose):")
+    old_total = new_total = 0.0
+    for row, col, symbol in SYMBOLS:
+        plan = dobot.plan_x(row, col) if symbol == "x" else dobot.plan_o(row, col)
+        old = legacy_plan(plan, home_before=symbol == "x").expected_duration(HOME_POSE)
+        new = plan.expected_duration(HOME_POSE)
+        old_total += old
+        new_total += new
+        print(f"  {plan.name:<6} old {old:5.1f} s -> plan {new:5.1f} s ({len(plan)} waypoints)")
+    print(f"  total  old {old_total:5.1f} s -> plan {new_total:5.1f} s")
+
+    print("\nPipelined run on the simulator:")
+    dobot.draw_grid(wait=False)
+    for row, col, symbol in SYMBOLS:
+        if symbol == "x":
+            dobot.draw_x(row, col, wait=False)
+        else:
+            dobot.draw_o(row, col, wait=False)
+    dobot.wait_plans()
+    for name, expected, actual in dobot.plan_log:
+        print(f"  {name:<6} expected {expected:5.1f} s, actual {actual * scale:5.1f} s")
+
+
+if __name__ == "__main__":
+    main()
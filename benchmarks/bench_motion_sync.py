@@ -0,0 +1,68 @@
+"""Fixed sleeps vs. synchronized motion waits, on the simulated arm.
+
+The old code slept 30 s after draw_grid, 7 s after move_to_intermediate and
+5 s after every symbol. This draws a grid, four symbols and the moves back to
+the intermediate pose, and reports how long each wait really had to be: a
+fixed sleep either idles after the arm has stopped, or returns while it is
+still moving (and the camera sees the arm over the board).
+
+Run from the repository root:
+    python -m benchmarks.bench_motion_sync [time_scale]
+"""
+import sys
+
+from dobotGrid import DobotGrid
+from dobotSim import SimDobot
+
+FIXED_SLEEPS = {"grid": 30.0, "intermediate": 7.0, "x": 5.0, "o": 5.0}
+
+
+class PoseOnlySim(SimDobot):
+    """Sim that hides command ids, so DobotGrid has to fall back to pose convergence."""
+
+    def move_to(self, *args, **kwargs):
+        super().move_to(*args, **kwargs)
+
+    def home(self):
+        super().home()
+
+
+def run(device, scale):
+    dobot = DobotGrid(device=device)
+    dobot.generate_points()
+    dobot.generate_grid()
+    dobot.draw_grid()
+    for row, col, symbol in ((1, 1, "x"), (2, 2, "o"), (3, 3, "x"), (3, 1, "o")):
+        dobot.move_to_intermediate()
+        if symbol == "x":
+            dobot.draw_x(row, col)
+        else:
+            dobot.draw_o(row, col)
+    return [(label, sec * scale) for label, sec in dobot.motion_log]
+
+
+def report(name, log):
+    wasted = late = 0.0
+    print(f"\n{name}")
+    for label, sec in log:
+        fixed = FIXED_SLEEPS[label.split()[0]]
+        if fixed >= sec:
+            wasted += fixed - sec
+            note = f"fixed sleep idles {fixed - sec:5.1f} s"
+        else:
+            late += sec - fixed
+            note = f"fixed sleep returns {sec - fixed:5.1f} s before the arm stops"
+        print(f"  {label:<14} {sec:6.2f} s ({note})")
+    total = sum(sec for _, sec in log)
+    print(f"  total {total:.1f} s; fixed sleeps would idle {wasted:.1f} s "
+          f"and cut {late:.1f} s of motion short")
+
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    report("queued-command index", run(SimDobot(time_scale=scale), scale))
+    report("pose convergence", run(PoseOnlySim(time_scale=scale), scale))
+
+
+if __name__ == "__main__":
+    main()
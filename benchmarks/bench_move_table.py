@@ -0,0 +1,50 @@
+"""Move table vs. minimax: exhaustive equivalence check and per-move latency.
+
+The same equivalence check runs as a test in tests/test_move_table.py.
+
+Run from the repository root:
+    python -m benchmarks.bench_move_table
+"""
+import time
+
+from ticTacToe import evaluate_next_move, minimax_next_move, reachable_boards, rows_of, table_mismatches
+
+
+def check_equivalence(boards):
+    mismatches = table_mismatches(boards)
+    for cells, expected, got in mismatches:
+        print(f"MISMATCH {''.join(cells)}: minimax={expected} table={got}")
+    return len(mismatches)
+
+
+def time_per_move(fn, boards, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cells in boards:
+            fn(rows_of(cells))
+    return (time.perf_counter() - start) / (repeat * len(boards))
+
+
+def main():
+    boards = reachable_boards()
+    print(f"Reachable positions: {len(boards)}")
+
+    start = time.perf_counter()
+    mismatches = check_equivalence(boards)
+    print(f"Equivalence: {len(boards) - mismatches}/{len(boards)} positions agree "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    empty = [('_',) * 9]
+    one = [c for c in boards if c.count('_') == 8]
+    for name, workload in (("empty board", empty), ("after 1 move", one), ("all positions", boards)):
+        t_mm = time_per_move(minimax_next_move, workload)
+        t_tb = time_per_move(evaluate_next_move, workload, repeat=20)
+        print(f"{name:>14}: minimax {t_mm * 1e3:9.3f} ms/move | table {t_tb * 1e6:7.2f} us/move "
+              f"| x{t_mm / t_tb:,.0f}")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
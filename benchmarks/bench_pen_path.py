@@ -0,0 +1,65 @@
+"""Pen-travel optimizer: path length and simulated time before and after.
+
+"Before" is the fixed stroke order the drawing code used (grid lines in
+S1->S2, S3->S4, ... order; X strokes corner 0->3 then 1->2); "after" is the
+order and direction chosen by penPath.optimize_strokes from the arm's pose.
+
+Run from the repository root:
+    python -m benchmarks.bench_pen_path
+"""
+from dobotGrid import DobotGrid, LIFT_MM
+from dobotSim import HOME_POSE, MODE_PTP, SimDobot
+from motionPlan import MotionPlan
+
+
+def fixed_plan(dobot, name, strokes, mode, home=False):
+    plan = MotionPlan(name + " (fixed)")
+    if home:
+        plan.home()
+    z, r = dobot.z, dobot.r
+    for (x0, y0, *_), (x1, y1, *_) in strokes:
+        plan.add((x0, y0, z + LIFT_MM, r), mode)
+        plan.add((x0, y0, z, r), mode)
+        plan.add((x1, y1, z, r), mode)
+        plan.add((x1, y1, z + LIFT_MM, r), mode)
+    return plan
+
+
+def compare(label, before, after, start):
+    lb, la = before.path_length(start), after.path_length(start)
+    tb, ta = before.expected_duration(start), after.expected_duration(start)
+    print(f"  {label:<24} path {lb:6.0f} -> {la:6.0f} mm | time {tb:5.2f} -> {ta:5.2f} s")
+    return lb, la, tb, ta
+
+
+def main():
+    for n in (3, 4, 5):
+        dobot = DobotGrid(device=SimDobot(), n=n)
+        dobot.generate_points()
+        dobot.generate_grid()
+        print(f"\n{n}x{n} board")
+
+        strokes = [(dobot.points[f"S{k}"], dobot.points[f"S{k + 1}"]) for k in range(1, 4*(n - 1), 2)]
+        compare("grid from home", fixed_plan(dobot, "grid", strokes, MODE_PTP.MOVJ_XYZ, home=True),
+                dobot.plan_grid(), HOME_POSE)
+
+        # every X on the board, each starting from the intermediate pose (after a board read)
+        # and from the end of the previous symbol (pipelined)
+        totals = [0.0] * 4
+        prev = dobot.intermediate
+        for row in range(1, n + 1):
+            for col in range(1, n + 1):
+                grid = dobot.grid[f"G{row}{col}"]
+                before = fixed_plan(dobot, "x", [(grid[0], grid[3]), (grid[1], grid[2])], MODE_PTP.MOVL_XYZ)
+                for start in (dobot.intermediate, prev):
+                    after = dobot.plan_x(row, col, start_pose=start)
+                    for k, v in enumerate((before.path_length(start), after.path_length(start),
+                                           before.expected_duration(start), after.expected_duration(start))):
+                        totals[k] += v
+                prev = after.last_pose()
+        print(f"  {'all X symbols':<24} path {totals[0]:6.0f} -> {totals[1]:6.0f} mm | "
+              f"time {totals[2]:5.2f} -> {totals[3]:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
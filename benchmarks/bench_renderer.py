@@ -0,0 +1,86 @@
+"""Detection latency with inline annotation, without it, and with the renderer thread attached.
+
+Replays frames through
+  - process_frame: detection plus drawing on the caller's thread (the old path),
+  - detect_board: detection only (headless),
+  - detect_board with a frameRenderer.Renderer drawing every submitted frame
+    on its own thread (no window), to see what the renderer costs detection.
+
+With a recording (an image folder, video or .raw archive, read with
+frameSource.open_source) the detector is the model; without one it
+replays simulate's synthetic frames through its synthetic detector, so it
+runs without weights.
+
+Run from the repository root:
+    python -m benchmarks.bench_renderer [recording] [weights]
+"""
+import random
+import sys
+import time
+
+from detectGrid import DEFAULT_BACKEND, DEFAULT_CONF, DEFAULT_WEIGHTS, detect_board, process_frame
+from detectorBackend import load_detector, warm_up
+from frameRenderer import Renderer
+from frameSource import open_source
+from simulate import SyntheticCamera, SyntheticDetector
+from bitBoard import Board
+
+ROUNDS = 3
+
+
+def synthetic_frames(n=60, seed=0):
+    rng = random.Random(seed)
+    camera = SyntheticCamera()
+    frames = []
+    for k in range(n):
+        board = Board.EMPTY
+        for i, j in rng.sample(board.empty_cells(), rng.randint(0, 9)):
+            board = board.place(i, j, rng.choice("xo"))
+        camera.show(board)
+        frames.append((f"synthetic_{k}", camera.read()[1]))
+    return frames
+
+
+def latencies(frames, fn, renderer=None):
+    out = []
+    for _ in range(ROUNDS):
+        for _, frame in frames:
+            t0 = time.perf_counter()
+            result = fn(frame)
+            out.append(time.perf_counter() - t0)
+            if renderer is not None:
+                renderer.submit(frame, result)
+    return sorted(out)
+
+
+def line(label, values):
+    p50 = values[len(values) // 2]
+    p95 = values[int(0.95 * (len(values) - 1))]
+    return f"{label:<28} p50 {p50 * 1e3:7.2f} ms  p95 {p95 * 1e3:7.2f} ms"
+
+
+def main():
+    if len(sys.argv) > 1:
+        frames = list(open_source(sys.argv[1]).frames())
+        if not frames:
+            raise SystemExit(f"No frames found in {sys.argv[1]}")
+        model = load_detector(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEIGHTS, DEFAULT_BACKEND)
+        warm_up(model, frames[0][1].shape, DEFAULT_CONF)
+    else:
+        frames, model = synthetic_frames(), SyntheticDetector()
+
+    inline = latencies(frames, lambda f: process_frame(f, model, conf_thr=DEFAULT_CONF))
+    bare = latencies(frames, lambda f: detect_board(f, model, conf_thr=DEFAULT_CONF))
+    renderer = Renderer(fps=30.0, show=False).start()
+    attached = latencies(frames, lambda f: detect_board(f, model, conf_thr=DEFAULT_CONF), renderer)
+    renderer.stop()
+
+    print(f"{len(frames)} frames x {ROUNDS} rounds")
+    print(line("process_frame (inline draw)", inline))
+    print(line("detect_board (headless)", bare))
+    print(line("detect_board + renderer", attached))
+    print(renderer.report())
+
+
+if __name__ == "__main__":
+    main()
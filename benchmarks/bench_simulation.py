@@ -0,0 +1,33 @@
+"""Simulated games per second against the number of worker processes.
+
+Plays the same seeded games with 1, 2, 4, ... workers (up to the CPU count)
+through simulate.run and prints throughput and scaling, followed by the full
+report of the largest pool.
+
+Run from the repository root:
+    python -m benchmarks.bench_simulation [games] [human]
+"""
+import os
+import sys
+
+from simulate import report, run
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    human = sys.argv[2] if len(sys.argv) > 2 else "random"
+    cpus = os.cpu_count() or 1
+    counts = sorted({min(1 << k, cpus) for k in range(cpus.bit_length() + 1)})
+
+    base = None
+    for workers in counts:
+        sec, outcomes, timings = run(games, workers, human)
+        rate = games / sec
+        base = base or rate
+        print(f"{workers:3d} workers: {rate:8.1f} games/s ({rate / base:4.1f}x)")
+    print()
+    print(report(games, workers, sec, outcomes, timings))
+
+
+if __name__ == "__main__":
+    main()
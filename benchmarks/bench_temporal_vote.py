@@ -0,0 +1,89 @@
+"""Single-frame reads vs. burst voting, replayed over recorded frame sequences.
+
+Every sub-folder of frame_dir (or frame_dir itself) is one recorded
+sequence, replayed in natural name order (img_9 before img_10) by
+frameSource.ImageDirSource. At each labelled frame the board is read once
+from that frame alone and once by BoardVoter from it and the frames just
+before it. labels.json in a sequence folder maps a file name to the
+expected board as three rows in process_frame orientation, like
+bench_board_locator, e.g. {"img_03.png": ["X__", "_O_", "___"]}.
+
+A wrong read that is accepted is what used to end a game as "cheating"; a
+rejected (unstable) vote only costs another read.
+
+Run from the repository root:
+    python -m benchmarks.bench_temporal_vote [frame_dir] [weights] [burst]
+"""
+import os
+import sys
+import time
+
+from bitBoard import Board
+from boardVote import BoardVoter
+from detectGrid import DEFAULT_BACKEND, DEFAULT_CONF, DEFAULT_WEIGHTS, process_frame
+from detectorBackend import load_detector, warm_up
+from frameSource import ImageDirSource, load_labels, natural_key
+
+
+def sequences(folder):
+    subdirs = sorted((d for d in (os.path.join(folder, n) for n in os.listdir(folder)) if os.path.isdir(d)),
+                     key=natural_key)
+    return subdirs or [folder]
+
+
+def replay(frames, labels, model, burst):
+    """Counters for one sequence: single-frame and voted reads against the labels."""
+    voter = BoardVoter(model, conf_thr=DEFAULT_CONF, frames=burst)
+    stats = dict(reads=0, single_wrong=0, vote_wrong=0, vote_rejected=0, single_sec=0.0, vote_sec=0.0)
+    for k, (name, frame) in enumerate(frames):
+        expected = labels.get(name)
+        if expected is None or k + 1 < burst:
+            continue
+        stats["reads"] += 1
+        t0 = time.perf_counter()
+        single, _ = process_frame(frame, model, conf_thr=DEFAULT_CONF)
+        t1 = time.perf_counter()
+        vote = voter.vote([f for _, f in frames[k + 1 - burst:k + 1]])
+        t2 = time.perf_counter()
+        stats["single_sec"] += t1 - t0
+        stats["vote_sec"] += t2 - t1
+        stats["single_wrong"] += single != expected
+        if not vote.stable:
+            stats["vote_rejected"] += 1
+        elif vote.board != expected:
+            stats["vote_wrong"] += 1
+            print(f"{name}: accepted {vote}, expected {expected}")
+    return stats
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else "debug"
+    weights = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEIGHTS
+    burst = int(sys.argv[3]) if len(sys.argv) > 3 else BoardVoter(None).frames
+    model = load_detector(weights, DEFAULT_BACKEND)
+
+    total = None
+    for seq_dir in sequences(folder):
+        frames = list(ImageDirSource(seq_dir).frames())
+        labels = {name: Board.from_rows(rows) for name, rows in load_labels(seq_dir).items()}
+        if not frames or not labels:
+            print(f"{seq_dir}: no frames or no labels.json, skipped")
+            continue
+        warm_up(model, frames[0][1].shape, DEFAULT_CONF)
+        stats = replay(frames, labels, model, burst)
+        print(f"{seq_dir}: {stats['reads']} reads, single wrong {stats['single_wrong']}, "
+              f"vote wrong {stats['vote_wrong']}, vote rejected {stats['vote_rejected']}")
+        total = stats if total is None else {k: total[k] + v for k, v in stats.items()}
+
+    if not total or not total["reads"]:
+        raise SystemExit(f"No labelled sequences in {folder}")
+    n = total["reads"]
+    print(f"\n{n} labelled reads, burst of {burst} frames")
+    print(f"single frame: {total['single_wrong']:4d} wrong boards accepted, "
+          f"{total['single_sec'] / n * 1e3:7.1f} ms/read")
+    print(f"burst vote  : {total['vote_wrong']:4d} wrong boards accepted, {total['vote_rejected']} re-reads, "
+          f"{total['vote_sec'] / n * 1e3:7.1f} ms/read (+{burst / 30.0 * 1e3:.0f} ms capture at 30 fps)")
+
+
+if __name__ == "__main__":
+    main()
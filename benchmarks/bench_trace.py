@@ -0,0 +1,47 @@
+"""Cost of a stageTrace span and a traced call, with tracing off and on.
+
+Run from the repository root:
+    python -m benchmarks.bench_trace [calls]
+"""
+import sys
+import time
+
+import stageTrace
+from stageTrace import span, traced
+
+
+def bare():
+    pass
+
+
+@traced("bench.call")
+def decorated():
+    pass
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def in_span():
+    with span("bench.span"):
+        pass
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    base = per_call(bare, calls)
+    print(f"plain call          : {base * 1e9:7.0f} ns")
+    for label, enable in (("tracing off", False), ("tracing on ", True)):
+        if enable:
+            stageTrace.enable()
+        print(f"{label}: span   {(per_call(in_span, calls) - base) * 1e9:7.0f} ns overhead, "
+              f"traced call {(per_call(decorated, calls) - base) * 1e9:7.0f} ns overhead")
+    stageTrace.disable()
+
+
+if __name__ == "__main__":
+    main()
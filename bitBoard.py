@@ -0,0 +1,172 @@
+"""Immutable 3x3 board stored as two 9-bit masks, one per player.
+
+Cell (i, j) is bit i*3 + j. Win checks, diffs and hashing are plain integer
+operations, so boards can be compared, copied and used as dict keys for free.
+"""
+
+FULL = 0x1FF
+
+LINE_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # cols
+    0b100010001, 0b001010100,               # diagonals
+)
+
+# HAS_LINE[mask] is True when the mask contains a complete line
+HAS_LINE = tuple(any(mask & line == line for line in LINE_MASKS) for mask in range(FULL + 1))
+
+# TRIT[mask] is the base-3 number with a 1 for every set bit (see ticTacToe.board_index)
+TRIT = tuple(sum(3 ** k for k in range(9) if mask >> k & 1) for mask in range(FULL + 1))
+
+POPCOUNT = tuple(bin(mask).count("1") for mask in range(FULL + 1))
+
+CELLS = tuple((k // 3, k % 3) for k in range(9))
+
+
+class Board:
+    __slots__ = ("x", "o")
+
+    def __init__(self, x=0, o=0):
+        if x & o:
+            raise ValueError("A cell cannot hold both 'x' and 'o'.")
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "o", o)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Board is immutable")
+
+    # ---------- adapters for the list-of-lists form ----------
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Accepts 'x'/'X' and 'o'/'O' cells; anything else ('_', ' ') is empty."""
+        x = o = 0
+        for i in range(3):
+            for j in range(3):
+                c = rows[i][j]
+                if c in ('x', 'X'):
+                    x |= 1 << (i * 3 + j)
+                elif c in ('o', 'O'):
+                    o |= 1 << (i * 3 + j)
+        return cls(x, o)
+
+    def to_rows(self, empty='_', x='x', o='o'):
+        return [[self.cell(i, j, empty, x, o) for j in range(3)] for i in range(3)]
+
+    # ---------- queries ----------
+
+    def cell(self, i, j, empty='_', x='x', o='o'):
+        bit = 1 << (i * 3 + j)
+        if self.x & bit:
+            return x
+        if self.o & bit:
+            return o
+        return empty
+
+    def winner(self):
+        if HAS_LINE[self.x]:
+            return 'x'
+        if HAS_LINE[self.o]:
+            return 'o'
+        return None
+
+    def score(self):
+        """Same convention as ticTacToe.evaluate: +10 'x' wins, -10 'o' wins, else 0."""
+        if HAS_LINE[self.x]:
+            return 10
+        if HAS_LINE[self.o]:
+            return -10
+        return 0
+
+    def empty_mask(self):
+        return FULL & ~(self.x | self.o)
+
+    def has_moves(self):
+        return (self.x | self.o) != FULL
+
+    def empty_cells(self):
+        free = self.empty_mask()
+        return [CELLS[k] for k in range(9) if free >> k & 1]
+
+    def count(self):
+        return POPCOUNT[self.x | self.o]
+
+    @property
+    def index(self):
+        """Base-3 index used by the move table."""
+        return TRIT[self.x] + 2 * TRIT[self.o]
+
+    def diff(self, other):
+        """Cells (row, col) whose content differs between the two boards."""
+        changed = (self.x ^ other.x) | (self.o ^ other.o)
+        return [CELLS[k] for k in range(9) if changed >> k & 1]
+
+    # ---------- derived boards ----------
+
+    def place(self, i, j, token):
+        bit = 1 << (i * 3 + j)
+        if (self.x | self.o) & bit:
+            raise ValueError(f"Cell ({i}, {j}) is already taken.")
+        if token == 'x':
+            return Board(self.x | bit, self.o)
+        if token == 'o':
+            return Board(self.x, self.o | bit)
+        raise ValueError(f"Unknown token {token!r}")
+
+    def swapped(self):
+        return Board(self.o, self.x)
+
+    def rotated180(self):
+        """Same as reversing both the row list and every row."""
+        return Board(_REVERSE9[self.x], _REVERSE9[self.o])
+
+    # ---------- value semantics ----------
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.x == other.x and self.o == other.o
+
+    def __hash__(self):
+        return self.x | self.o << 9
+
+    def __repr__(self):
+        return "Board(%r)" % "/".join("".join(row) for row in self.to_rows())
+
+
+_REVERSE9 = tuple(int(format(mask, "09b")[::-1], 2) for mask in range(FULL + 1))
+
+
+def _permute_table(perm):
+    """Mask lookup that moves bit k to bit perm[k]."""
+    return tuple(sum(1 << perm[k] for k in range(9) if mask >> k & 1) for mask in range(FULL + 1))
+
+
+# the 8 symmetries of the square, as cell permutations (identity first)
+SYMMETRIES = tuple(
+    _permute_table([f(i, j)[0] * 3 + f(i, j)[1] for i, j in CELLS])
+    for f in (
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    )
+)
+
+
+def canonical_key(board):
+    """Hash key shared by a board and all its rotations/reflections."""
+    x, o = board.x, board.o
+    return min(sym[x] | sym[o] << 9 for sym in SYMMETRIES)
+
+
+Board.EMPTY = Board()
+
+
+def as_board(board):
+    """Adapter: returns a Board for either a Board or a 3x3 list of lists."""
+    if isinstance(board, Board):
+        return board
+    return Board.from_rows(board)
@@ -0,0 +1,153 @@
+"""Finds the drawn grid in the camera image and maps image points to board cells.
+
+The two horizontal and two vertical grid lines are found once with a Hough
+transform on the ink mask. Their four crossings fix a homography from the
+image to a square, top-down board, which is cached and re-used until a cheap
+check sees that the grid lines are no longer where they were (camera moved).
+"""
+import math
+
+import cv2
+import numpy as np
+
+RECTIFIED_SIZE = 300        # side of the rectified board image, in pixels
+INK_BLOCK = 31              # adaptive threshold neighbourhood for the ink mask
+INK_C = 10
+ANGLE_TOL_DEG = 20          # how far a line may deviate from the two grid directions
+MIN_LINE_GAP = 0.08         # min distance between two grid lines, as a fraction of the frame
+LINE_SAMPLES = 40           # samples per grid line for the camera-moved check
+INK_CONTRAST = 25           # how much darker than the paper a line sample must be
+MIN_LINE_HITS = 0.6         # fraction of line samples that must still be ink
+
+
+def _intersection(l1, l2):
+    (r1, t1), (r2, t2) = l1, l2
+    a = np.array([[math.cos(t1), math.sin(t1)], [math.cos(t2), math.sin(t2)]])
+    if abs(np.linalg.det(a)) < 1e-6:
+        return None
+    x, y = np.linalg.solve(a, np.array([r1, r2]))
+    return float(x), float(y)
+
+
+def _angle_diff(a, b):
+    """Distance between two line orientations, modulo pi."""
+    d = abs(a - b) % math.pi
+    return min(d, math.pi - d)
+
+
+class BoardLocator:
+    def __init__(self, size=RECTIFIED_SIZE):
+        self.size = size
+        self.homography = None      # image -> rectified board
+        self.inverse = None         # rectified board -> image
+        self._samples = None        # image points along the grid lines
+        self.locate_count = 0
+
+    # ---------- localization ----------
+
+    def _ink_mask(self, gray):
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV,
+                                     INK_BLOCK, INK_C)
+
+    def _grid_lines(self, mask):
+        H, W = mask.shape
+        lines = cv2.HoughLines(mask, 1, np.pi / 180, threshold=min(W, H) // 4)
+        if lines is None:
+            return None
+        lines = [(float(r), float(t)) for r, t in lines[:, 0]]
+        main_theta = lines[0][1]  # strongest line sets the first direction
+        tol = math.radians(ANGLE_TOL_DEG)
+        min_gap = MIN_LINE_GAP * min(W, H)
+
+        groups = []
+        for direction in (main_theta, main_theta + math.pi / 2):
+            picked = []
+            for rho, theta in lines:  # strongest first
+                if _angle_diff(theta, direction) > tol:
+                    continue
+                # compare positions as signed distance from the image center along the normal
+                pos = rho - (W / 2) * math.cos(theta) - (H / 2) * math.sin(theta)
+                if abs(theta - (direction % math.pi)) > math.pi / 2:
+                    pos = -pos
+                if all(abs(pos - p) > min_gap for p, _ in picked):
+                    picked.append((pos, (rho, theta)))
+                if len(picked) == 2:
+                    break
+            if len(picked) < 2:
+                return None
+            groups.append([line for _, line in picked])
+        return groups
+
+    def locate(self, frame_bgr):
+        """Finds the grid and caches the homography; returns False if no grid was found."""
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY) if frame_bgr.ndim == 3 else frame_bgr
+        groups = self._grid_lines(self._ink_mask(gray))
+        if groups is None:
+            return False
+        crossings = [_intersection(a, b) for a in groups[0] for b in groups[1]]
+        if any(p is None for p in crossings):
+            return False
+
+        # order the crossings top-left, top-right, bottom-left, bottom-right in the image
+        crossings.sort(key=lambda p: p[1])
+        top = sorted(crossings[:2])
+        bottom = sorted(crossings[2:])
+        src = np.array(top + bottom, dtype=np.float32)
+        s = self.size / 3.0
+        dst = np.array([[s, s], [2 * s, s], [s, 2 * s], [2 * s, 2 * s]], dtype=np.float32)
+        self.homography = cv2.getPerspectiveTransform(src, dst)
+        self.inverse = np.linalg.inv(self.homography)
+
+        # points along the four grid lines, mapped back into the image, for still_valid()
+        t = np.linspace(0.05, 0.95, LINE_SAMPLES) * self.size
+        pts = [np.stack([t, np.full_like(t, k * s)], axis=1) for k in (1, 2)]
+        pts += [np.stack([np.full_like(t, k * s), t], axis=1) for k in (1, 2)]
+        pts = np.concatenate(pts).reshape(-1, 1, 2).astype(np.float32)
+        self._samples = cv2.perspectiveTransform(pts, self.inverse).reshape(-1, 2)
+        self.locate_count += 1
+        return True
+
+    def still_valid(self, frame_bgr):
+        """Cheap check that the grid lines are still under the cached sample points."""
+        if self.homography is None:
+            return False
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY) if frame_bgr.ndim == 3 else frame_bgr
+        H, W = gray.shape
+        xs = np.clip(np.round(self._samples[:, 0]).astype(int), 0, W - 1)
+        ys = np.clip(np.round(self._samples[:, 1]).astype(int), 0, H - 1)
+        # darkest pixel in a 5x5 neighbourhood tolerates a pixel or two of jitter
+        dark = cv2.erode(gray, np.ones((5, 5), np.uint8))[ys, xs]
+        paper = float(np.median(gray))
+        return np.mean(dark < paper - INK_CONTRAST) >= MIN_LINE_HITS
+
+    def update(self, frame_bgr):
+        """Keeps the homography current: re-locates only when the cached one no longer fits."""
+        if self.still_valid(frame_bgr):
+            return True
+        return self.locate(frame_bgr)
+
+    # ---------- mapping ----------
+
+    def cell_of(self, cx, cy):
+        """(row, col) of an image point, in image orientation like detectGrid._cell_index_from_center."""
+        u, v = cv2.perspectiveTransform(np.array([[[cx, cy]]], dtype=np.float32), self.homography)[0, 0]
+        s = self.size / 3.0
+        return int(min(2, max(0, v // s))), int(min(2, max(0, u // s)))
+
+    def grid_lines(self):
+        """Image-space end points of the four grid lines, for drawing overlays."""
+        s = self.size / 3.0
+        ends = [[(k * s, 0), (k * s, self.size)] for k in (1, 2)] + [[(0, k * s), (self.size, k * s)] for k in (1, 2)]
+        pts = cv2.perspectiveTransform(np.array(ends, dtype=np.float32).reshape(-1, 1, 2), self.inverse)
+        pts = pts.reshape(-1, 2, 2)
+        return [(tuple(map(int, a)), tuple(map(int, b))) for a, b in pts]
+
+    def rectified(self, frame_bgr):
+        """Top-down view of the board, size x size pixels."""
+        return cv2.warpPerspective(frame_bgr, self.homography, (self.size, self.size))
+
+    def cell_crops(self, frame_bgr):
+        """3x3 list of rectified cell images, in image orientation."""
+        board = self.rectified(frame_bgr)
+        s = self.size // 3
+        return [[board[r * s:(r + 1) * s, c * s:(c + 1) * s] for c in range(3)] for r in range(3)]
@@ -0,0 +1,104 @@
+"""Multi-frame board reads: a short burst of frames votes on every cell.
+
+A single misread cell (a hand shadow, a reflection, a low-confidence box)
+used to be enough to end the game as "cheating". BoardVoter runs the
+detector on a burst of consecutive frames in one batched call and lets each
+frame vote for a token in every cell, weighted by the detection confidence.
+A cell without a box votes empty with EMPTY_WEIGHT. The read is accepted
+only when every cell's winning token has at least `min_share` of that
+cell's votes; otherwise the caller should simply read again.
+"""
+import numpy as np
+
+from bitBoard import Board
+from detectGrid import DEFAULT_CONF, _cell_index_from_center, best_per_cell
+from detectorBackend import detect
+from stageTrace import traced
+
+BURST_FRAMES = 5
+BURST_TIMEOUT_SEC = 1.0
+EMPTY_WEIGHT = 0.5      # vote of a frame that saw no box in a cell
+MIN_SHARE = 0.7         # winning token's share of a cell's votes for a stable read
+
+
+class Vote:
+    """Result of one burst: board (process_frame orientation), per-cell share and stability."""
+
+    def __init__(self, board, confidence, stable, frames):
+        self.board = board
+        self.confidence = confidence    # 3x3 winning share per cell, image orientation
+        self.stable = stable
+        self.frames = frames
+
+    def weakest(self):
+        """(share, (row, col)) of the least certain cell, in image orientation."""
+        return min((c, (i, j)) for i, row in enumerate(self.confidence) for j, c in enumerate(row))
+
+    def __repr__(self):
+        state = "stable" if self.stable else "unstable"
+        share, cell = self.weakest()
+        return f"Vote({self.board}, {state}, {self.frames} frames, weakest {cell} at {share:.2f})"
+
+
+class BoardVoter:
+    def __init__(self, model, conf_thr=DEFAULT_CONF, frames=BURST_FRAMES, min_share=MIN_SHARE,
+                 empty_weight=EMPTY_WEIGHT, locator=None):
+        self.model = model
+        self.conf_thr = conf_thr
+        self.frames = frames
+        self.min_share = min_share
+        self.empty_weight = empty_weight
+        self.locator = locator
+        self.unstable = 0
+        self.reads = 0
+
+    @traced("capture.burst")
+    def burst(self, grabber, after=None, timeout=BURST_TIMEOUT_SEC):
+        """Copies of the next `frames` frames from a frameGrabber.FrameGrabber."""
+        seq = grabber.read_seq()[0] if after is None else after
+        frames = []
+        while len(frames) < self.frames:
+            seq, view = grabber.wait_newer(seq, timeout)
+            if view is None:
+                break
+            frames.append(np.array(view))
+        return frames
+
+    @traced("detect.vote")
+    def vote(self, frames):
+        """Vote over a list of BGR frames of the same board."""
+        H, W = frames[-1].shape[:2]
+        # the camera does not move during a burst: locate (or check) the grid once
+        if self.locator is not None and self.locator.update(frames[-1]):
+            cell_of = self.locator.cell_of
+        else:
+            cell_of = lambda cx, cy: _cell_index_from_center(cx, cy, W, H)
+
+        weights = [[{} for _ in range(3)] for _ in range(3)]
+        for boxes in detect(self.model, frames, self.conf_thr):
+            rows, conf = best_per_cell(boxes, cell_of)
+            for i in range(3):
+                for j in range(3):
+                    w = conf[i][j] if conf[i][j] >= 0 else self.empty_weight
+                    weights[i][j][rows[i][j]] = weights[i][j].get(rows[i][j], 0.0) + w
+
+        board = [[" "] * 3 for _ in range(3)]
+        confidence = [[0.0] * 3 for _ in range(3)]
+        for i in range(3):
+            for j in range(3):
+                token, w = max(weights[i][j].items(), key=lambda kv: kv[1])
+                board[i][j] = token
+                confidence[i][j] = w / sum(weights[i][j].values())
+        stable = all(c >= self.min_share for row in confidence for c in row)
+        self.reads += 1
+        self.unstable += not stable
+        # the camera looks at the board upside down
+        return Vote(Board.from_rows(board).rotated180(), confidence, stable, len(frames))
+
+    def read(self, grabber, after=None):
+        """Vote on a fresh burst from the grabber; None if no frames arrived."""
+        frames = self.burst(grabber, after)
+        return self.vote(frames) if frames else None
+
+    def report(self):
+        return f"[vote] {self.reads} burst reads, {self.unstable} rejected as unstable"
@@ -0,0 +1,92 @@
+"""Cheap motion/stability gate that decides when the board is worth a YOLO pass.
+
+Every frame is shrunk to a small grayscale image and compared with the
+previous one. A hand over the board shows up as motion; once the scene has
+been still for `stable_frames` frames and differs from the last accepted
+board image, the gate fires once so the detector runs on a settled scene.
+"""
+import time
+
+import cv2
+import numpy as np
+
+GATE_SIZE = (160, 120)          # (width, height) of the comparison image
+PIXEL_DIFF = 20                 # gray-level change that marks a pixel as changed (above sensor noise)
+MOTION_THRESHOLD = 0.005        # fraction of pixels changed between consecutive frames = motion
+STABLE_FRAMES = 6               # still frames required after the motion stops
+CHANGE_THRESHOLD = 0.001        # fraction of pixels changed from the reference = a new scene
+
+
+class StabilityGate:
+    def __init__(self, motion_threshold=MOTION_THRESHOLD, stable_frames=STABLE_FRAMES,
+                 change_threshold=CHANGE_THRESHOLD, size=GATE_SIZE, pixel_diff=PIXEL_DIFF):
+        self.motion_threshold = motion_threshold
+        self.pixel_diff = pixel_diff
+        self.stable_frames = stable_frames
+        self.change_threshold = change_threshold
+        self.size = size
+        self._prev = None
+        self._reference = None
+        self._last_seq = None
+        self._stable = 0
+        self._motion_start = None
+        self._motion_end = None
+        self.triggers = []  # per trigger: dict of timings
+
+    def _small(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _changed(self, a, b):
+        """Fraction of pixels that differ noticeably between two small images."""
+        return float(np.count_nonzero(np.abs(a - b) > self.pixel_diff)) / a.size
+
+    def reset(self, frame):
+        """Take `frame` as the accepted board; the gate fires only for scenes that differ from it."""
+        self._reference = self._prev = self._small(frame)
+        self._stable = 0
+        self._motion_start = self._motion_end = None
+
+    def update(self, frame, seq=None):
+        """Feed the next frame; returns True when the detector should run on it."""
+        if frame is None or (seq is not None and seq == self._last_seq):
+            return False  # nothing new from the camera
+        self._last_seq = seq
+        now = time.monotonic()
+        small = self._small(frame)
+        if self._prev is None:
+            self.reset(frame)
+            return False
+
+        motion = self._changed(small, self._prev)
+        self._prev = small
+        if motion > self.motion_threshold:
+            if self._motion_start is None:
+                self._motion_start = now
+            self._motion_end = now
+            self._stable = 0
+            return False
+
+        self._stable += 1
+        if self._stable < self.stable_frames:
+            return False
+        change = self._changed(small, self._reference)
+        if change <= self.change_threshold:
+            return False
+
+        # settled on a new scene: fire once, then wait for the next change
+        self.triggers.append({
+            "motion_sec": (self._motion_end - self._motion_start) if self._motion_start else 0.0,
+            "settle_sec": (now - self._motion_end) if self._motion_end else 0.0,
+            "change": change,
+        })
+        self._reference = small
+        self._motion_start = self._motion_end = None
+        return True
+
+    def last_trigger_summary(self):
+        if not self.triggers:
+            return "[gate] no triggers yet"
+        t = self.triggers[-1]
+        return (f"[gate] triggered: motion for {t['motion_sec']:.2f} s, settled {t['settle_sec']:.2f} s "
+                f"after it stopped, {t['change']:.2%} of the scene changed")
@@ -0,0 +1,314 @@
+"""Local HTTP control and MJPEG streaming API for one game.
+
+The game runs as an orchestrator.Orchestrator in the same event loop as a
+small HTTP server (asyncio streams, no extra dependencies), so requests are
+answered while the arm moves: the arm, the detector and the solver all run
+in worker threads.
+
+    GET  /               page with the stream, the board and the history
+    GET  /board          the game's status (board, whose turn, result, counters)
+    GET  /history        the moves of the current (or last) game
+    GET  /timings        per-stage latency percentiles from stageTrace, in ms
+    GET  /stream         MJPEG stream of the annotated camera frames
+    POST /game/start     start a game; ?first=robot|human, or choose it later:
+    POST /game/first     ?first=robot|human for a game waiting for the answer
+    POST /game/stop      end the running game
+
+Parameters can also be sent as a JSON body. Frames are annotated and
+encoded once per new frame for all stream clients together, and not at all
+while nobody is watching.
+
+With the stub arm and a recorded game:
+    python controlServer.py --stub --video game.mp4
+    curl -X POST 'localhost:8080/game/start?first=human'; curl localhost:8080/board
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import cv2
+
+from boardLocator import BoardLocator
+from detectGrid import DEFAULT_BACKEND, DEFAULT_CONF, DEFAULT_DEVICE, DEFAULT_WEIGHTS, annotate
+from detectorBackend import load_detector, warm_up
+from frameSource import open_source
+from orchestrator import Orchestrator
+import stageTrace
+from stageTrace import span
+
+HTTP_HOST = "127.0.0.1"
+HTTP_PORT = 8080
+STREAM_FPS = 15.0
+STREAM_QUALITY = 80
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict"}
+
+PAGE = b"""<!doctype html>
+<title>Dobot TicTacToe</title>
+<img src="/stream" style="max-width:60%;float:left">
+<pre id="board"></pre><pre id="history"></pre>
+<script>
+async function poll() {
+  document.getElementById("board").textContent = JSON.stringify(await (await fetch("/board")).json(), null, 1);
+  document.getElementById("history").textContent = JSON.stringify(await (await fetch("/history")).json(), null, 1);
+}
+setInterval(poll, 1000); poll();
+</script>
+"""
+
+
+class ServedGame(Orchestrator):
+    """Orchestrator that takes the first player from the API instead of input()."""
+
+    _first = None
+
+    async def ask_first(self):
+        self._first = asyncio.get_running_loop().create_future()
+        try:
+            return await self._first
+        finally:
+            self._first = None
+
+    def waiting_for_first(self):
+        return self._first is not None and not self._first.done()
+
+    def choose_first(self, first):
+        self._first.set_result(first)
+
+
+class ControlServer:
+    def __init__(self, game, recorded=False, stream_fps=STREAM_FPS, quality=STREAM_QUALITY):
+        """recorded=True rewinds the frame source at the start of every game."""
+        self.game = game
+        self.recorded = recorded
+        self.stream_fps = stream_fps
+        self.quality = quality
+        self.task = None                   # the running game
+        self._quit = None                  # set to end it, even before it starts running
+        self._clients = 0
+        self._watched = asyncio.Event()    # set while any stream client is connected
+        self._new_jpeg = asyncio.Condition()
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self.encoded = 0
+
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    # ---------- API ----------
+
+    def board(self):
+        status = self.game.status()
+        status["running"] = self.running()
+        status["waiting_for_first"] = self.game.waiting_for_first()
+        status["stream_clients"] = self._clients
+        status["frames_encoded"] = self.encoded
+        return status
+
+    def timings(self):
+        tracer = stageTrace.current()
+        stages = tracer.stages() if tracer is not None else {}
+        return {name: {"n": n, "p50_ms": p50 * 1e3, "p95_ms": p95 * 1e3, "p99_ms": p99 * 1e3}
+                for name, (n, p50, p95, p99) in stages.items()}
+
+    def start(self, first=None):
+        if self.running():
+            return 409, {"error": "a game is already running"}
+        if first not in (None, "robot", "human"):
+            return 400, {"error": "first must be 'robot' or 'human'"}
+        if self.recorded:
+            self.game.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.game.first = first
+        self._quit = asyncio.Event()
+        self.task = asyncio.create_task(self.game.run(self._quit), name="game")
+        return 202, {"started": True, "first": first}
+
+    def choose_first(self, first):
+        if not self.game.waiting_for_first():
+            return 409, {"error": "no game is waiting for the first player"}
+        if first not in ("robot", "human"):
+            return 400, {"error": "first must be 'robot' or 'human'"}
+        self.game.choose_first(first)
+        return 200, {"first": first}
+
+    def stop(self):
+        if not self.running():
+            return 409, {"error": "no game is running"}
+        self._quit.set()
+        return 202, {"stopping": True}
+
+    # ---------- HTTP ----------
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                request = await self._read_request(reader)
+            except ValueError as exc:
+                await self._send(writer, 400, json.dumps({"error": str(exc)}).encode(), "application/json")
+                return
+            if request is None:
+                return
+            method, path, params = request
+            if path == "/stream" and method == "GET":
+                await self._stream(writer)
+                return
+            status, body = self._route(method, path, params)
+            if isinstance(body, bytes):
+                await self._send(writer, status, body, "text/html; charset=utf-8")
+            else:
+                await self._send(writer, status, json.dumps(body).encode(), "application/json")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) < 2:
+            return None
+        headers = dict(line.split(":", 1) for line in lines[1:] if ":" in line)
+        headers = {k.strip().lower(): v.strip() for k, v in headers.items()}
+        url = urlsplit(parts[1])
+        params = dict(parse_qsl(url.query))
+        length = min(int(headers.get("content-length", 0) or 0), MAX_BODY)
+        if length:
+            body = await reader.readexactly(length)
+            if headers.get("content-type", "").startswith("application/json"):
+                data = json.loads(body or b"{}")
+                if not isinstance(data, dict):
+                    raise ValueError("the JSON body must be an object")
+                params.update(data)
+            else:
+                params.update(parse_qsl(body.decode()))
+        return parts[0].upper(), url.path.rstrip("/") or "/", params
+
+    def _route(self, method, path, params):
+        gets = {"/": lambda: PAGE, "/board": self.board, "/history": lambda: self.game.history,
+                "/timings": self.timings}
+        posts = {"/game/start": lambda: self.start(params.get("first")),
+                 "/game/first": lambda: self.choose_first(params.get("first")),
+                 "/game/stop": self.stop}
+        if path in gets:
+            return (200, gets[path]()) if method == "GET" else (405, {"error": "use GET"})
+        if path in posts:
+            return posts[path]() if method == "POST" else (405, {"error": "use POST"})
+        return 404, {"error": f"no such endpoint {path}"}
+
+    async def _send(self, writer, status, body, ctype):
+        writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {ctype}\r\n"
+                      f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\nConnection: close\r\n\r\n").encode()
+                     + body)
+        await writer.drain()
+
+    # ---------- stream ----------
+
+    async def _stream(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary=frame\r\n"
+                     b"Cache-Control: no-store\r\nConnection: close\r\n\r\n")
+        self._clients += 1
+        self._watched.set()
+        seen = 0
+        try:
+            while True:
+                async with self._new_jpeg:
+                    await self._new_jpeg.wait_for(lambda: self._jpeg_seq > seen)
+                    seen, jpeg = self._jpeg_seq, self._jpeg
+                # a slow client skips to the newest frame instead of queueing old ones
+                writer.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % len(jpeg)
+                             + jpeg + b"\r\n")
+                await writer.drain()
+        finally:
+            self._clients -= 1
+            if not self._clients:
+                self._watched.clear()
+
+    def _encode(self, frame, detection):
+        with span("stream.encode"):
+            image = annotate(frame, detection, board_text=True) if detection is not None else frame
+            ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return data.tobytes() if ok else None
+
+    async def encoder(self):
+        """Encodes the newest frame at up to stream_fps, only while someone is watching."""
+        shown = (None, None)
+        while True:
+            await self._watched.wait()
+            current = (self.game.display, self.game.detection)
+            if current[0] is not None and (current[0] is not shown[0] or current[1] is not shown[1]):
+                shown = current
+                jpeg = await asyncio.to_thread(self._encode, *current)
+                if jpeg is not None:
+                    self.encoded += 1
+                    async with self._new_jpeg:
+                        self._jpeg, self._jpeg_seq = jpeg, self._jpeg_seq + 1
+                        self._new_jpeg.notify_all()
+            await asyncio.sleep(1.0 / self.stream_fps)
+
+    async def serve(self, host=HTTP_HOST, port=HTTP_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        encoder = asyncio.create_task(self.encoder(), name="encoder")
+        print(f"[http] Serving on http://{host}:{port}/")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            encoder.cancel()
+            if self.running():
+                self.task.cancel()
+            await asyncio.gather(encoder, *([self.task] if self.task else []), return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--stub", action="store_true", help="use dobotGrid_stubbings instead of the arm")
+    parser.add_argument("--port", default="/dev/ttyACM0", help='arm port, or "sim" for the simulated arm')
+    parser.add_argument("--video", help="read frames from a video file, image folder or .raw archive instead of a camera")
+    parser.add_argument("--camera", type=int, default=1, help="camera index")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="detector backend (see detectorBackend)")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS)
+    parser.add_argument("--host", default=HTTP_HOST)
+    parser.add_argument("--http-port", type=int, default=HTTP_PORT)
+    args = parser.parse_args()
+    stageTrace.enable()     # /timings reads the per-stage spans
+
+    if args.stub:
+        from dobotGrid_stubbings import DobotGrid
+    else:
+        from dobotGrid import DobotGrid
+    dobot = DobotGrid(port=args.port)
+    dobot.generate_points()
+    dobot.generate_grid()
+    dobot.draw_grid(wait=False)
+
+    model = load_detector(args.weights, args.backend, device=DEFAULT_DEVICE)
+    cap = open_source(args.video or args.camera)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open {args.video or f'camera {args.camera}'}")
+    ok, frame = cap.read()
+    if ok:
+        warm_up(model, frame.shape, DEFAULT_CONF)
+
+    game = ServedGame(dobot, model, cap, headless=True, locator=BoardLocator(), realtime=bool(args.video))
+    server = ControlServer(game, recorded=bool(args.video))
+    started = time.perf_counter()
+    try:
+        asyncio.run(server.serve(args.host, args.http_port))
+    except KeyboardInterrupt:
+        print("Interrupted.")
+    finally:
+        cap.release()
+        try:
+            dobot.disconnect()
+        except Exception:
+            pass
+        print(f"\n[shutdown] Served for {time.perf_counter() - started:.0f} s, "
+              f"{server.encoded} stream frames encoded; camera closed and Dobot disconnected.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Debug frame recorder that can stay on during a game.
+
+record() copies the frame into a buffer from a small pool and queues it; a
+writer thread encodes and writes it, so the caller pays for one memcpy and
+never for encoding or disk I/O. When the queue is full the frame is dropped
+(and counted) instead of blocking detection. Frames are numbered by an
+in-process counter, picked up once from the folder at start so a new run
+continues after the last one.
+
+Formats:
+- "jpg" / "png": debug/img_000123.jpg plus a debug/img_000123.json sidecar
+  with the frame's board, boxes, timings and any extra fields. The folder
+  replays with frameSource.ImageDirSource.
+- "raw": frames go into memory-mapped segments debug/seg_0001.raw of up to
+  `segment_frames` frames, no encoding at all; each segment's .json holds
+  the per-frame sidecars and is the frameSource.RawArchiveSource metadata.
+  It is written when the segment opens and refreshed every
+  SEGMENT_META_FRAMES frames, so a segment cut short by a crash still opens.
+
+Only the newest `max_files` frames (or segments, for "raw") and `max_bytes`
+bytes are kept, counting what earlier runs left in the folder; older ones
+are deleted as new ones are written.
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from frameSource import DEFAULT_FPS
+from stageTrace import span
+
+DEBUG_DIR = "debug"
+DEFAULT_FORMAT = "jpg"
+FORMATS = ("jpg", "png", "raw")
+JPEG_QUALITY = 90
+QUEUE_FRAMES = 8             # frames waiting for the writer; more are dropped
+MAX_FILES = 2000             # frames kept on disk (segments for "raw")
+MAX_BYTES = 2 * 1024 ** 3
+SEGMENT_FRAMES = 300         # frames per raw segment
+SEGMENT_META_FRAMES = 30     # frames between rewrites of an open segment's metadata
+
+_IMG_RE = re.compile(r"img_(\d+)\.")
+_SEG_RE = re.compile(r"seg_(\d+)\.(raw|json)$")
+
+
+def sidecar(name, detection=None, board=None, timings=None, **extra):
+    """JSON-ready metadata for one frame."""
+    meta = {"name": name, "time": time.time()}
+    if detection is not None:
+        board = detection.board
+        if detection.boxes is not None:
+            xyxy, cls, conf = detection.boxes
+            meta["boxes"] = [[*map(float, xyxy[k]), int(cls[k]), float(conf[k])] for k in range(xyxy.shape[0])]
+        else:
+            meta["boxes"] = []
+    if board is not None:
+        meta["board"] = ["".join(row) for row in board.to_rows()]
+    if timings:
+        meta["timings"] = {k: float(v) for k, v in timings.items()}
+    meta.update(extra)
+    return meta
+
+
+class DebugRecorder:
+    def __init__(self, folder=DEBUG_DIR, fmt=DEFAULT_FORMAT, quality=JPEG_QUALITY, queue_frames=QUEUE_FRAMES,
+                 max_files=MAX_FILES, max_bytes=MAX_BYTES, segment_frames=SEGMENT_FRAMES, fps=DEFAULT_FPS):
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {FORMATS}, not {fmt!r}")
+        self.folder = folder
+        self.fmt = fmt
+        self.quality = quality
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.segment_frames = segment_frames
+        self.fps = fps
+        self._queue = queue.Queue(maxsize=queue_frames)
+        self._pool = deque()                # free frame buffers
+        self._buffers = queue_frames + 1    # one more for the frame being written
+        self._lock = threading.Lock()
+        self._kept = deque()                # (paths, bytes) written, oldest first
+        self._kept_bytes = 0
+        self._segment = None                # [memmap, path, first name, sidecars]
+        self._segno = 0
+        self._next = 0
+        self._t = None
+        # counters for report()
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.deleted = 0
+        self.bytes = 0
+        self.copy_sec = 0.0
+        self.write_sec = 0.0
+
+    def start(self):
+        if self._t is not None:
+            return self
+        os.makedirs(self.folder, exist_ok=True)
+        self._scan()
+        self._t = threading.Thread(target=self._loop, name="debug-writer", daemon=True)
+        self._t.start()
+        return self
+
+    def _scan(self):
+        """Continue numbering after, and rotate together with, what is already in the folder.
+
+        This is the only directory listing the recorder makes.
+        """
+        groups = {}     # ("img" or "seg", number) -> [paths]
+        for fname in os.listdir(self.folder):
+            path = os.path.join(self.folder, fname)
+            m = _IMG_RE.match(fname)
+            if m:
+                self._next = max(self._next, int(m.group(1)) + 1)
+                groups.setdefault(("img", int(m.group(1))), []).append(path)
+                continue
+            m = _SEG_RE.match(fname)
+            if not m:
+                continue
+            self._segno = max(self._segno, int(m.group(1)))
+            groups.setdefault(("seg", int(m.group(1))), []).append(path)
+            if m.group(2) == "json":
+                try:
+                    with open(path) as f:
+                        names = json.load(f).get("names") or []
+                except (OSError, ValueError):
+                    names = []
+                if names:
+                    self._next = max(self._next, int(_IMG_RE.match(names[-1] + ".").group(1)) + 1)
+        # oldest first, so rotation deletes earlier runs' files before this run's
+        found = []
+        for paths in groups.values():
+            stats = [os.stat(p) for p in paths]
+            found.append((min(s.st_mtime for s in stats), paths, sum(s.st_size for s in stats)))
+        for _, paths, nbytes in sorted(found, key=lambda f: f[0]):
+            self._kept.append((paths, nbytes))
+            self._kept_bytes += nbytes
+        self._rotate()
+
+    # ---------- caller side ----------
+
+    def record(self, frame, detection=None, board=None, timings=None, **extra):
+        """Queue a copy of `frame` with its metadata; returns its name, or None if dropped."""
+        if self._t is None or frame is None:
+            return None
+        t0 = time.perf_counter()
+        with span("debug.record"):
+            with self._lock:
+                buf = self._pool.popleft() if self._pool else None
+                if buf is None and self._buffers > 0:
+                    self._buffers -= 1
+                    buf = np.empty_like(frame)
+            if buf is None:
+                self.dropped += 1
+                return None
+            if buf.shape != frame.shape or buf.dtype != frame.dtype:
+                buf = np.empty_like(frame)
+            np.copyto(buf, frame)
+            with self._lock:
+                name = f"img_{self._next:06d}"
+                self._next += 1
+            meta = sidecar(name, detection, board, timings, **extra)
+            try:
+                self._queue.put_nowait((buf, meta))
+            except queue.Full:
+                self._release(buf)
+                self.dropped += 1
+                return None
+        self.recorded += 1
+        self.copy_sec += time.perf_counter() - t0
+        return name
+
+    def _release(self, buf):
+        with self._lock:
+            self._pool.append(buf)
+
+    # ---------- writer ----------
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            buf, meta = item
+            t0 = time.perf_counter()
+            with span("debug.write"):
+                try:
+                    self._write(buf, meta)
+                    self.written += 1
+                except Exception as e:
+                    print(f"[debug] Could not write {meta['name']}: {e}")
+            self.write_sec += time.perf_counter() - t0
+            self._release(buf)
+        self._close_segment()
+
+    def _write(self, frame, meta):
+        if self.fmt == "raw":
+            self._append_raw(frame, meta)
+            return
+        base = os.path.join(self.folder, meta["name"])
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality] if self.fmt == "jpg" else [cv2.IMWRITE_PNG_COMPRESSION, 1]
+        ok, data = cv2.imencode("." + self.fmt, frame, params)
+        if not ok:
+            raise RuntimeError("encoding failed")
+        with open(f"{base}.{self.fmt}", "wb") as f:
+            f.write(data.tobytes())
+        with open(f"{base}.json", "w") as f:
+            json.dump(meta, f)
+        self._keep([f"{base}.{self.fmt}", f"{base}.json"], data.nbytes)
+
+    def _append_raw(self, frame, meta):
+        seg = self._segment
+        if seg is not None and (seg[0].shape[1:] != frame.shape or len(seg[3]) == self.segment_frames):
+            self._close_segment()
+            seg = None
+        if seg is None:
+            self._segno += 1
+            path = os.path.join(self.folder, f"seg_{self._segno:04d}.raw")
+            frames = np.memmap(path, dtype=np.uint8, mode="w+", shape=(self.segment_frames, *frame.shape))
+            seg = self._segment = [frames, path, meta["name"], []]
+            self._keep([path, os.path.splitext(path)[0] + ".json"], frames.nbytes)
+            self._write_segment_meta(seg)
+        frames, _, _, metas = seg
+        frames[len(metas)] = frame
+        metas.append(meta)
+        if len(metas) % SEGMENT_META_FRAMES == 0:
+            frames.flush()
+            self._write_segment_meta(seg)
+
+    def _write_segment_meta(self, seg):
+        """RawArchiveSource metadata for the frames of `seg` written so far."""
+        frames, path, _, metas = seg
+        meta = {"shape": [len(metas), *frames.shape[1:]], "fps": self.fps,
+                "names": [m["name"] for m in metas], "frames": metas}
+        with open(os.path.splitext(path)[0] + ".json", "w") as f:
+            json.dump(meta, f)
+
+    def _close_segment(self):
+        """Flush the open raw segment, cut it to the frames written and write its metadata."""
+        seg, self._segment = self._segment, None
+        if seg is None:
+            return
+        frames, path, _, metas = seg
+        frames.flush()
+        self._write_segment_meta(seg)
+        nbytes = len(metas) * int(np.prod(frames.shape[1:]))
+        dropped = frames.nbytes - nbytes
+        del frames, seg
+        with open(path, "r+b") as f:
+            f.truncate(nbytes)
+        self._shrink(path, dropped)
+
+    def _keep(self, paths, nbytes):
+        """Account for new files and delete the oldest beyond max_files / max_bytes."""
+        self._kept.append((paths, nbytes))
+        self._kept_bytes += nbytes
+        self.bytes += nbytes
+        self._rotate()
+
+    def _shrink(self, path, dropped):
+        """Account for `dropped` bytes cut from the end of the kept file `path`."""
+        for k in range(len(self._kept) - 1, -1, -1):
+            paths, size = self._kept[k]
+            if paths[0] == path:
+                self._kept[k] = (paths, size - dropped)
+                self._kept_bytes -= dropped
+                self.bytes -= dropped
+                return
+
+    def _rotate(self):
+        while len(self._kept) > 1 and (len(self._kept) > self.max_files or self._kept_bytes > self.max_bytes):
+            old, size = self._kept.popleft()
+            self._kept_bytes -= size
+            for p in old:
+                if os.path.exists(p):
+                    os.remove(p)
+            self.deleted += 1
+
+    def stop(self):
+        """Write everything still queued, then stop the writer."""
+        if self._t is None:
+            return
+        self._queue.put(None)
+        self._t.join()
+        self._t = None
+
+    # ---------- stats ----------
+
+    def report(self):
+        n = max(self.recorded, 1)
+        return (f"[debug] {self.recorded} frames recorded ({self.fmt}), {self.written} written, "
+                f"{self.dropped} dropped, {self.deleted} rotated out; {self.bytes / 1e6:.1f} MB; "
+                f"caller {self.copy_sec / n * 1e3:.2f} ms/frame, writer {self.write_sec / max(self.written, 1) * 1e3:.2f} ms/frame")
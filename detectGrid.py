@@ -1,84 +1,244 @@
 import time
+from collections import namedtuple
+
 import cv2
 import numpy as np
-from ultralytics import YOLO
+
+from bitBoard import Board, as_board
+from detectorBackend import detect, load_detector
+from stageTrace import traced
 
 
 DEFAULT_WEIGHTS = "best2.pt"
 DEFAULT_INTERVAL = 1.0
 DEFAULT_DEVICE = "cpu"  # or "cuda"
 DEFAULT_CONF = 0.25
+DEFAULT_BACKEND = "auto"   # "yolo", "onnx", "openvino" or "auto" (ONNX if exported, else ultralytics)
 ID2TOKEN = {0: "X", 1: "O", 2: " "}
+CELL_PAD = 0.1             # crop margin around a cell, as a fraction of the cell size
+CELL_PIXEL_DIFF = 25       # gray-level change that marks a pixel as changed
+CELL_CHANGE_FRACTION = 0.02  # fraction of changed pixels that marks a cell as changed
+
+# board: Board in game orientation; boxes: (xyxy, cls, conf) arrays or None;
+# grid_lines: ((x1, y1), (x2, y2)) image segments the cells were cut along
+Detection = namedtuple("Detection", "board boxes grid_lines")
 
 
-def _cell_index_from_center(cx: float, cy: float, W: int, H: int):
+def _cell_index_from_center(cx: float, cy: float, W: int, H: int, n: int = 3):
     nx, ny = cx / max(W, 1), cy / max(H, 1)
-    col = int(min(2, max(0, nx * 3.0)))
-    row = int(min(2, max(0, ny * 3.0)))
+    col = int(min(n - 1, max(0, nx * n)))
+    row = int(min(n - 1, max(0, ny * n)))
     return row, col
 
-def save_debug_image(frame):
-    import os, cv2, glob
-    os.makedirs("debug", exist_ok=True)
-    n = len(glob.glob("debug/img_*.png")) + 1
-    path = f"debug/img_{n:02d}.png"
-    cv2.imwrite(path, frame)
-    return path
+_debug_recorder = None
+
+def save_debug_image(frame, detection=None, timings=None):
+    """Queue the frame (and its detection) for debug/; returns the path it will be written to, or None if dropped.
+
+    Encoding and writing happen on debugRecorder's writer thread.
+    """
+    global _debug_recorder
+    if _debug_recorder is None:
+        import atexit
+        from debugRecorder import DebugRecorder
+        _debug_recorder = DebugRecorder().start()
+        atexit.register(_debug_recorder.stop)
+    name = _debug_recorder.record(frame, detection, timings=timings)
+    return None if name is None else f"{_debug_recorder.folder}/{name}.{_debug_recorder.fmt}"
+
+def best_per_cell(boxes, cell_of, n=3):
+    """Most confident token per cell, in image orientation: (rows, confidences).
+
+    Cells without a box are " " with confidence -1.
+    """
+    board = [[" " for _ in range(n)] for _ in range(n)]
+    best_conf = [[-1.0 for _ in range(n)] for _ in range(n)]
+    if boxes is None:
+        return board, best_conf
+    xyxy, cls, conf = boxes
+    for i in range(xyxy.shape[0]):
+        x1, y1, x2, y2 = xyxy[i]
+        row, col = cell_of(0.5 * (x1 + x2), 0.5 * (y1 + y2))
+        p = float(conf[i])
+        if p > best_conf[row][col]:
+            board[row][col] = ID2TOKEN.get(int(cls[i]), " ")
+            best_conf[row][col] = p
+    return board, best_conf
+
+@traced("detect.board")
+def detect_board(frame_bgr, model, conf_thr=0.25, locator=None):
+    """Structured detection for one frame: board, raw boxes and the grid used for the cells.
 
-def process_frame(frame_bgr, model, conf_thr=0.25):
+    With a BoardLocator that has found the drawn grid, detections are mapped
+    to cells through its homography; otherwise the frame is cut into thirds.
+    Nothing is drawn; see annotate() and frameRenderer for that.
+    """
     # save_debug_image(frame_bgr)
     H, W = frame_bgr.shape[:2]
-    result = model.predict(source=frame_bgr, conf=conf_thr, verbose=False)
+    boxes = detect(model, [frame_bgr], conf_thr)[0]
 
-    board = [[" " for _ in range(3)] for _ in range(3)]
-    best_conf = [[-1.0 for _ in range(3)] for _ in range(3)]
-    annotated = frame_bgr.copy()
+    if locator is not None and locator.update(frame_bgr):
+        cell_of = locator.cell_of
+        grid_lines = locator.grid_lines()
+    else:
+        cell_of = lambda cx, cy: _cell_index_from_center(cx, cy, W, H)
+        grid_lines = _thirds_lines(W, H)
 
-    # draw grid
+    if boxes is None:
+        return Detection(Board.EMPTY, None, grid_lines)
+    board, _ = best_per_cell(boxes, cell_of)
+    # the camera looks at the board upside down
+    return Detection(Board.from_rows(board).rotated180(), boxes, grid_lines)
+
+
+def _thirds_lines(W, H):
+    lines = []
     for k in range(1, 3):
         x = int(W * k / 3.0)
         y = int(H * k / 3.0)
-        cv2.line(annotated, (x, 0), (x, H), (0, 255, 255), 1, cv2.LINE_AA)
-        cv2.line(annotated, (0, y), (W, y), (0, 255, 255), 1, cv2.LINE_AA)
+        lines.append(((x, 0), (x, H)))
+        lines.append(((0, y), (W, y)))
+    return lines
 
-    if not result:
-        return board, annotated
 
-    r0 = result[0]
-    if r0.boxes is None or r0.boxes.data is None or len(r0.boxes) == 0:
-        return board, annotated
+def annotate(frame_bgr, detection, board_text=False):
+    """Copy of the frame with the grid, every box and its label drawn on it."""
+    annotated = frame_bgr.copy()
+    for a, b in detection.grid_lines:
+        cv2.line(annotated, a, b, (0, 255, 255), 1, cv2.LINE_AA)
+    if detection.boxes is not None:
+        xyxy, cls, conf = detection.boxes
+        for i in range(xyxy.shape[0]):
+            x1, y1, x2, y2 = xyxy[i]
+            token = ID2TOKEN.get(int(cls[i]), " ")
+            p = float(conf[i])
+            cv2.rectangle(annotated, (int(x1), int(y1)), (int(x2), int(y2)), (255, 255, 255), 1)
+            cv2.putText(
+                annotated,
+                f"{token}:{p:.2f}",
+                (int(x1), int(y1) - 5),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (255, 255, 255),
+                1,
+                cv2.LINE_AA,
+            )
+    if board_text:
+        _overlay_board_text(annotated, detection.board)
+    return annotated
 
-    xyxy = r0.boxes.xyxy.cpu().numpy()
-    cls = r0.boxes.cls.cpu().numpy().astype(int)
-    conf = r0.boxes.conf.cpu().numpy()
 
-    for i in range(xyxy.shape[0]):
-        x1, y1, x2, y2 = xyxy[i]
-        c = int(cls[i])
-        p = float(conf[i])
-        cx = 0.5 * (x1 + x2)
-        cy = 0.5 * (y1 + y2)
-        row, col = _cell_index_from_center(cx, cy, W, H)
-        token = ID2TOKEN.get(c, " ")
-        if p > best_conf[row][col]:
-            board[row][col] = token
-            best_conf[row][col] = p
-        cv2.rectangle(annotated, (int(x1), int(y1)), (int(x2), int(y2)), (255, 255, 255), 1)
-        cv2.putText(
-            annotated,
-            f"{token}:{p:.2f}",
-            (int(x1), int(y1) - 5),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            (255, 255, 255),
-            1,
-            cv2.LINE_AA,
-        )
-    return reverse_nested_lists(board), annotated
+@traced("detect.process_frame")
+def process_frame(frame_bgr, model, conf_thr=0.25, locator=None):
+    """Board and annotated image for one frame (detect_board followed by annotate)."""
+    detection = detect_board(frame_bgr, model, conf_thr, locator)
+    return detection.board, annotate(frame_bgr, detection)
+
+
+class CellInference:
+    """Change-masked detection: only cells that changed since the last read go to the model.
+
+    The first call runs detect_board on the whole frame. After that each call
+    compares every cell with its crop from the previous read, sends just the
+    changed crops to the model in one batched detect() call and merges the
+    answers into the cached board. `classify(crops) -> tokens` can replace the
+    model with a small per-cell classifier. With a BoardLocator the cells are
+    cut from the rectified board instead of the frame's thirds.
+    """
+
+    def __init__(self, model, conf_thr=DEFAULT_CONF, classify=None, pad=CELL_PAD,
+                 pixel_diff=CELL_PIXEL_DIFF, change_fraction=CELL_CHANGE_FRACTION, locator=None):
+        self.model = model
+        self.conf_thr = conf_thr
+        self.classify = classify
+        self.locator = locator
+        self.pad = pad
+        self.pixel_diff = pixel_diff
+        self.change_fraction = change_fraction
+        self.reset()
+
+    def reset(self):
+        """Forget the cached board, e.g. for a new game; the next call reads the full frame."""
+        self._rows = None      # board in image orientation
+        self._gray = None      # gray crop per cell from the last read
+        self._located = None   # locator.locate_count the cached crops were cut with
+        self.last_changed = []
+
+    def _cell_boxes(self, W, H):
+        boxes = []
+        for row in range(3):
+            for col in range(3):
+                px, py = self.pad * W / 3.0, self.pad * H / 3.0
+                x1 = int(max(0, W * col / 3.0 - px))
+                y1 = int(max(0, H * row / 3.0 - py))
+                x2 = int(min(W, W * (col + 1) / 3.0 + px))
+                y2 = int(min(H, H * (row + 1) / 3.0 + py))
+                boxes.append((row, col, x1, y1, x2, y2))
+        return boxes
+
+    def _classify_crops(self, crops):
+        if self.classify is not None:
+            return list(self.classify(crops))
+        tokens = []
+        for crop, boxes in zip(crops, detect(self.model, crops, self.conf_thr)):
+            token = " "
+            if boxes is not None:
+                h, w = crop.shape[:2]
+                xyxy, cls, conf = boxes
+                # the most confident box whose center is inside the cell proper
+                best = -1.0
+                for k in range(xyxy.shape[0]):
+                    cx = 0.5 * (xyxy[k][0] + xyxy[k][2]) / w
+                    cy = 0.5 * (xyxy[k][1] + xyxy[k][3]) / h
+                    inner = self.pad / (1 + 2 * self.pad)
+                    if inner <= cx <= 1 - inner and inner <= cy <= 1 - inner and conf[k] > best:
+                        best = float(conf[k])
+                        token = ID2TOKEN.get(int(cls[k]), " ")
+            tokens.append(token)
+        return tokens
+
+    @traced("detect.cells")
+    def __call__(self, frame_bgr):
+        """Board for this frame (same orientation as process_frame)."""
+        located = None
+        if self.locator is not None and self.locator.update(frame_bgr):
+            located = self.locator.locate_count
+            image = self.locator.rectified(frame_bgr)
+        else:
+            image = frame_bgr
+        H, W = image.shape[:2]
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        boxes = self._cell_boxes(W, H)
+        crops_gray = [gray[y1:y2, x1:x2].astype(np.int16) for _, _, x1, y1, x2, y2 in boxes]
+
+        if self._rows is None or located != self._located:
+            # first read, or the cells moved (camera moved / grid found or lost)
+            board = detect_board(frame_bgr, self.model, conf_thr=self.conf_thr, locator=self.locator).board
+            self._rows = board.rotated180().to_rows(empty=" ", x="X", o="O")
+            self._gray = crops_gray
+            self._located = located
+            self.last_changed = [(row, col) for row, col, *_ in boxes]
+            return board
+
+        changed = []
+        for k, (row, col, x1, y1, x2, y2) in enumerate(boxes):
+            diff = np.abs(crops_gray[k] - self._gray[k]) > self.pixel_diff
+            if np.count_nonzero(diff) > self.change_fraction * diff.size:
+                changed.append(k)
+        self.last_changed = [boxes[k][:2] for k in changed]
+        if changed:
+            crops = [image[y1:y2, x1:x2] for _, _, x1, y1, x2, y2 in (boxes[k] for k in changed)]
+            for k, token in zip(changed, self._classify_crops(crops)):
+                row, col = boxes[k][:2]
+                self._rows[row][col] = token
+                self._gray[k] = crops_gray[k]
+        # the camera looks at the board upside down
+        return Board.from_rows(self._rows).rotated180()
 
 
 def _overlay_board_text(img: np.ndarray, board):
     """Overlay the 3x3 board as text on the image (top-left)."""
+    board = as_board(board).to_rows(empty=" ", x="X", o="O")
     x0, y0 = 10, 25
     dy = 25
     cv2.putText(img, "Board:", (x0, y0), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2, cv2.LINE_AA)
@@ -95,11 +255,8 @@ def _overlay_board_text(img: np.ndarray, board):
             cv2.LINE_AA,
         )
 
-def reverse_nested_lists(data):
-    return [inner[::-1] for inner in data[::-1]]
-
 def _print_board(board):
-    # board = reverse_nested_lists(board)
+    board = as_board(board).to_rows(empty=" ", x="X", o="O")
     lines = []
     for r in range(3):
         row = " | ".join(board[r])
@@ -111,9 +268,14 @@ def _print_board(board):
 # ------------------ FOR TESTING INDIVIDUAL CLASS ------------------
 
 def main():
-    model = YOLO(DEFAULT_WEIGHTS)
+    import sys
+    from frameSource import open_source
+    model = load_detector(DEFAULT_WEIGHTS, DEFAULT_BACKEND, device=DEFAULT_DEVICE)
     cap = None
-    for idx in range(1,5):
+    if len(sys.argv) > 1:
+        # python detectGrid.py <video file | image folder | .raw archive>
+        cap = open_source(sys.argv[1], realtime=True)
+    for idx in (range(1,5) if cap is None else []):
         test = cv2.VideoCapture(idx)
         if test.isOpened():
             cap = test
@@ -125,13 +287,13 @@ def main():
         print("❌ Cannot open any camera (tried indices 0-2).")
         return
 
-    cv2.namedWindow("TicTacToe Detector", cv2.WINDOW_NORMAL)
-    cv2.resizeWindow("TicTacToe Detector", 800, 600)
-
+    from frameRenderer import Renderer
+    renderer = Renderer("TicTacToe Detector", size=(800, 600)).start()
     last_capture_time = 0
+    detection = None
 
     print("Press 'q' to quit.")
-    while True:
+    while not renderer.quit_requested():
         ret, frame = cap.read()
         if not ret or frame is None:
             print("⚠️ Failed to grab frame.")
@@ -140,22 +302,15 @@ def main():
         current_time = time.time()
         if current_time - last_capture_time >= 5:
             last_capture_time = current_time
-            board, annotated = process_frame(frame, model, conf_thr=DEFAULT_CONF)
+            detection = detect_board(frame, model, conf_thr=DEFAULT_CONF)
 
             print("\nDetected Board:")
-            _print_board(board)
-
-            _overlay_board_text(annotated, board)
-            cv2.imshow("TicTacToe Detector", annotated)
-        else:
-            cv2.imshow("TicTacToe Detector", frame)
-
-        # required for OpenCV window refresh
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+            _print_board(detection.board)
+        # the renderer draws the last detection over the live frame on its own thread
+        renderer.submit(frame, detection)
 
+    renderer.stop()
     cap.release()
-    cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
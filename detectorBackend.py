@@ -0,0 +1,268 @@
+"""Pluggable detector backends for the board detector.
+
+Every backend has `detect(images, conf) -> [boxes]`, one entry per image,
+where boxes is an (xyxy, cls, conf) tuple of NumPy arrays in that image's
+pixel coordinates, or None when nothing was found.
+
+- YoloBackend runs the .pt weights through ultralytics/torch (the fallback).
+- OnnxBackend runs weights exported to ONNX with ONNX Runtime on the CPU.
+- OpenVinoBackend runs weights exported to OpenVINO IR on the CPU.
+
+The exported backends take a fixed, square input size and reuse one
+preallocated letterbox canvas and input tensor for every image, so a warm
+call allocates nothing but the outputs. The ONNX model can be quantized to
+INT8 (quantize_int8), the OpenVINO one is exported as INT8 by ultralytics.
+load_detector picks a backend by name and exports the weights on first use.
+"""
+import abc
+import os
+
+import cv2
+import numpy as np
+
+from stageTrace import traced
+
+DEFAULT_IMGSZ = 640        # exported models take a fixed imgsz x imgsz input
+DEFAULT_THREADS = 4        # CPU threads for the exported backends
+NMS_IOU = 0.7              # same as ultralytics predict()
+LETTERBOX_FILL = 114
+BACKENDS = ("auto", "yolo", "onnx", "openvino")
+
+
+def _boxes(r):
+    """(xyxy, cls, conf) arrays of one ultralytics result, or None if it has no boxes."""
+    if r.boxes is None or r.boxes.data is None or len(r.boxes) == 0:
+        return None
+    return (r.boxes.xyxy.cpu().numpy(),
+            r.boxes.cls.cpu().numpy().astype(int),
+            r.boxes.conf.cpu().numpy())
+
+
+@traced("detect.model")
+def detect(model, images, conf):
+    """Boxes per image from a backend, or from a bare ultralytics YOLO model."""
+    if hasattr(model, "detect"):
+        return model.detect(images, conf)
+    return [_boxes(r) for r in model.predict(source=list(images), conf=conf, verbose=False)]
+
+
+def warm_up(model, shape, conf=0.25):
+    """One detection on a blank frame, so lazy initialization is not paid on the first real frame."""
+    detect(model, [np.zeros(shape, dtype=np.uint8)], conf)
+
+
+class YoloBackend:
+    name = "yolo"
+
+    def __init__(self, weights, device="cpu"):
+        from ultralytics import YOLO
+        self.model = YOLO(weights)
+        self.device = device
+
+    def detect(self, images, conf):
+        results = self.model.predict(source=list(images), conf=conf, device=self.device, verbose=False)
+        return [_boxes(r) for r in results]
+
+
+class _ExportedBackend(abc.ABC):
+    """Letterboxing into a preallocated input tensor and YOLOv8 output decoding."""
+
+    name = None
+
+    def __init__(self, imgsz=DEFAULT_IMGSZ, iou=NMS_IOU):
+        self.imgsz = imgsz
+        self.iou = iou
+        self._canvas = np.full((imgsz, imgsz, 3), LETTERBOX_FILL, dtype=np.uint8)
+        self._input = np.empty((1, 3, imgsz, imgsz), dtype=np.float32)
+
+    def _letterbox(self, image):
+        """Fill the input tensor from a BGR image; returns (scale, pad_x, pad_y)."""
+        h, w = image.shape[:2]
+        r = min(self.imgsz / h, self.imgsz / w)
+        nw, nh = int(round(w * r)), int(round(h * r))
+        left, top = (self.imgsz - nw) // 2, (self.imgsz - nh) // 2
+        self._canvas[...] = LETTERBOX_FILL
+        self._canvas[top:top + nh, left:left + nw] = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        # BGR HWC uint8 -> RGB CHW float in [0, 1], written in place
+        np.multiply(self._canvas[..., ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=self._input[0], casting="unsafe")
+        return r, left, top
+
+    @abc.abstractmethod
+    def _run(self):
+        """Raw model output for self._input, shape (1, 4 + classes, anchors)."""
+
+    def _decode(self, out, conf, scale, pad_x, pad_y, shape):
+        pred = out[0].T                       # anchors x (cx, cy, w, h, class scores...)
+        scores = pred[:, 4:]
+        cls = scores.argmax(axis=1)
+        best = scores[np.arange(len(cls)), cls]
+        keep = best > conf
+        if not keep.any():
+            return None
+        pred, cls, best = pred[keep], cls[keep], best[keep]
+        xywh = pred[:, :4].copy()
+        xywh[:, 0] -= 0.5 * xywh[:, 2]
+        xywh[:, 1] -= 0.5 * xywh[:, 3]
+        # per-class NMS: shift each class to its own region of the plane
+        shifted = xywh.copy()
+        shifted[:, :2] += cls[:, None] * (2 * self.imgsz)
+        idx = cv2.dnn.NMSBoxes(shifted.tolist(), best.tolist(), conf, self.iou)
+        idx = np.asarray(idx, dtype=int).reshape(-1)
+        if idx.size == 0:
+            return None
+        xyxy = np.empty((idx.size, 4), dtype=np.float32)
+        xyxy[:, 0] = (xywh[idx, 0] - pad_x) / scale
+        xyxy[:, 1] = (xywh[idx, 1] - pad_y) / scale
+        xyxy[:, 2] = xyxy[:, 0] + xywh[idx, 2] / scale
+        xyxy[:, 3] = xyxy[:, 1] + xywh[idx, 3] / scale
+        h, w = shape[:2]
+        np.clip(xyxy[:, 0::2], 0, w, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, h, out=xyxy[:, 1::2])
+        return xyxy, cls[idx].astype(int), best[idx]
+
+    def detect(self, images, conf):
+        found = []
+        for image in images:
+            scale, pad_x, pad_y = self._letterbox(image)
+            found.append(self._decode(self._run(), conf, scale, pad_x, pad_y, image.shape))
+        return found
+
+
+class OnnxBackend(_ExportedBackend):
+    name = "onnx"
+
+    def __init__(self, path, imgsz=DEFAULT_IMGSZ, threads=DEFAULT_THREADS, iou=NMS_IOU):
+        import onnxruntime as ort
+        super().__init__(imgsz, iou)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._input_name = self.session.get_inputs()[0].name
+        self._binding = self.session.io_binding()
+        self._binding.bind_cpu_input(self._input_name, self._input)
+        self._binding.bind_output(self.session.get_outputs()[0].name)
+
+    def _run(self):
+        # the binding points at self._input, so refilling it is all a new image needs
+        self.session.run_with_iobinding(self._binding)
+        return self._binding.copy_outputs_to_cpu()[0]
+
+
+class OpenVinoBackend(_ExportedBackend):
+    name = "openvino"
+
+    def __init__(self, path, imgsz=DEFAULT_IMGSZ, threads=DEFAULT_THREADS, iou=NMS_IOU):
+        import openvino as ov
+        super().__init__(imgsz, iou)
+        core = ov.Core()
+        self.compiled = core.compile_model(core.read_model(path), "CPU",
+                                           {"INFERENCE_NUM_THREADS": threads,
+                                            "PERFORMANCE_HINT": "LATENCY"})
+        self._request = self.compiled.create_infer_request()
+        self._output = self.compiled.output(0)
+
+    def _run(self):
+        self._request.infer({0: self._input})
+        return self._request.get_tensor(self._output).data
+
+
+# ------------------ export ------------------
+
+def _stem(weights):
+    return os.path.splitext(weights)[0]
+
+
+def exported_path(weights, backend, int8=False):
+    """Where load_detector looks for (and exports) the weights for `backend`."""
+    stem = _stem(weights)
+    if backend == "onnx":
+        return stem + ("_int8.onnx" if int8 else ".onnx")
+    if backend == "openvino":
+        name = os.path.basename(stem)
+        folder = f"{stem}_int8_openvino_model" if int8 else f"{stem}_openvino_model"
+        return os.path.join(folder, name + ".xml")
+    raise ValueError(f"{backend!r} has no exported weights")
+
+
+def export(weights, backend, imgsz=DEFAULT_IMGSZ, int8=False, calibration_frames=None):
+    """Export .pt weights for an exported backend (needs ultralytics); returns the model path."""
+    from ultralytics import YOLO
+    target = exported_path(weights, backend, int8)
+    if backend == "onnx":
+        fp32 = exported_path(weights, "onnx")
+        if not os.path.exists(fp32):
+            YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+        if int8:
+            quantize_int8(fp32, target, calibration_frames, imgsz)
+    else:
+        YOLO(weights).export(format="openvino", imgsz=imgsz, int8=int8)
+    return target
+
+
+class _CalibrationReader:
+    """Feeds letterboxed frames to ONNX Runtime's static quantizer."""
+
+    def __init__(self, frames, input_name, imgsz):
+        self._letterbox = _ExportedBackend(imgsz)
+        self._frames = iter(frames)
+        self._input_name = input_name
+
+    def get_next(self):
+        frame = next(self._frames, None)
+        if frame is None:
+            return None
+        self._letterbox._letterbox(frame)
+        return {self._input_name: self._letterbox._input.copy()}
+
+
+def quantize_int8(src, dst, calibration_frames=None, imgsz=DEFAULT_IMGSZ):
+    """INT8 copy of an ONNX model: static with calibration frames, dynamic without."""
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+
+    if calibration_frames:
+        input_name = onnx.load(src).graph.input[0].name
+        quantize_static(src, dst, _CalibrationReader(calibration_frames, input_name, imgsz),
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    else:
+        quantize_dynamic(src, dst, weight_type=QuantType.QUInt8)
+    return dst
+
+
+def load_detector(weights, backend="auto", device="cpu", imgsz=DEFAULT_IMGSZ,
+                  threads=DEFAULT_THREADS, int8=False):
+    """Detector for `weights` (.pt, or an exported .onnx / .xml).
+
+    "auto" uses ONNX Runtime when it is installed and the exported model
+    exists, and ultralytics otherwise. An exported backend whose runtime is
+    missing also falls back to ultralytics.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend {backend!r}, expected one of {BACKENDS}")
+    if weights.endswith(".onnx"):
+        return OnnxBackend(weights, imgsz, threads)
+    if weights.endswith(".xml"):
+        return OpenVinoBackend(weights, imgsz, threads)
+
+    if backend == "auto":
+        path = exported_path(weights, "onnx", int8)
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            return YoloBackend(weights, device)
+        return OnnxBackend(path, imgsz, threads) if os.path.exists(path) else YoloBackend(weights, device)
+    if backend == "yolo":
+        return YoloBackend(weights, device)
+
+    cls = OnnxBackend if backend == "onnx" else OpenVinoBackend
+    path = exported_path(weights, backend, int8)
+    try:
+        if not os.path.exists(path):
+            export(weights, backend, imgsz, int8)
+        return cls(path, imgsz, threads)
+    except ImportError as exc:
+        print(f"[detector] {backend} backend unavailable ({exc}), using ultralytics")
+        return YoloBackend(weights, device)
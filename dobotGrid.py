@@ -1,14 +1,43 @@
 import time
-from pydobot.dobot import MODE_PTP
-import pydobot
-import json
 import math
 
+from dobotSim import HOME_POSE, MODE_PTP, SimDobot  # same mode numbers as pydobot's MODE_PTP
+from gridGeometry import load_geometry
+from motionPlan import ARC, HOME, MotionPlan
+from penPath import optimize_strokes
+from stageTrace import span, traced, sleep as traced_sleep
+
+SIM_PORT = "sim"
+MOTION_TIMEOUT_SEC = 60.0
+POSE_TOLERANCE_MM = 0.5
+POSE_POLL_SEC = 0.02
+STABLE_POLLS = 3
+MOTION_START_GRACE_SEC = 0.5  # a motion that has not started by then is treated as done
+LIFT_MM = 20                  # pen-up height above the paper
+ARC_TOLERANCE_MM = 0.5        # max chord error of a drawn O, about the pen line width
+MIN_ARC_SEGMENTS = 8
+
+
+def arc_segments(radius, tolerance=ARC_TOLERANCE_MM):
+    """Fewest chords for a full circle whose sagitta stays within tolerance."""
+    if tolerance >= radius:
+        return MIN_ARC_SEGMENTS
+    # a chord spanning angle t deviates radius * (1 - cos(t / 2)) from the arc
+    segments = math.ceil(math.pi / math.acos(1 - tolerance / radius))
+    return max(MIN_ARC_SEGMENTS, segments)
+
 class DobotGrid:
-    def __init__(self, port="/dev/ttyACM0"):
-        self.device = pydobot.Dobot(port=port)
+    def __init__(self, port="/dev/ttyACM0", n=3, device=None):
+        """port="sim" (or an explicit device object) runs against dobotSim.SimDobot."""
+        if device is None:
+            if port == SIM_PORT:
+                device = SimDobot(port)
+            else:
+                import pydobot  # imported on first use: it pulls in pyserial
+                device = pydobot.Dobot(port=port)
+        self.device = device
         self.device.speed(100, 100)
-        self.grid_map = "/home/aj/Documents/Robotics-lab/mid_term/TTT_Dobot/grid_map.json"
+        self.geometry = None        # gridGeometry arrays, loaded on first use
         self.points = {}
         self.grid = {}
         self.x = 250
@@ -17,99 +46,81 @@ class DobotGrid:
         self.r = 0
         self.d = 40
         self.offset = 5
+        self.n = n  # cells per side
         self.radius = self.d/2 - self.offset
+        self.arc_tolerance = ARC_TOLERANCE_MM
+        self.native_arcs = hasattr(self.device, "arc_to")
         # self.intermediate = (182.214, -2.686, 47.714, 15.854)
         self.intermediate = (228.106, 2.180, 44.833, 0.703)
+        self.home_pose = None       # learnt the first time a homing run settles
+        self.motion_log = []        # (label, seconds) per synchronized motion
+        self._last_cmd = None
+        self._last_target = None
+        self._queued_pose = None    # where the arm will be once the queue drains
+        self._pending = []          # plans sent but not yet waited for
+        self._plan_done_at = 0.0
+        self.plan_log = []          # (plan name, expected s, actual s)
         print("Dobot connected successfully.")
 
+    def _geometry(self):
+        if self.geometry is None:
+            self.geometry = load_geometry(self.x, self.y, self.z, self.r, self.d,
+                                          self.offset, self.n, LIFT_MM)
+        return self.geometry
+
     def generate_points(self):
-        x = self.x
-        y = self.y
-        z = self.z
-        r = self.r
-        d = self.d
-
-        points = {
-            "A1": (x, y, z, r),
-            "A2": (x, y + 3*d, z, r),
-            "A3": (x + 3*d, y, z, r),
-            "A4": (x + 3*d, y + 3*d, z, r),
-
-            "S1": (x, y + d, z, r),
-            "S2": (x + 3*d, y + d, z, r),
-            "S3": (x, y + 2*d, z, r),
-            "S4": (x + 3*d, y + 2*d, z, r),
-            "S5": (x + d, y, z, r),
-            "S6": (x + d, y + 3*d, z, r),
-            "S7": (x + 2*d, y, z, r),
-            "S8": (x + 2*d, y + 3*d, z, r),
-
-            "SI1": (x, y + d, z + 20, r),
-            "SI2": (x + 3*d, y + d, z + 20, r),
-            "SI3": (x, y + 2*d, z + 20, r),
-            "SI4": (x + 3*d, y + 2*d, z + 20, r),
-            "SI5": (x + d, y, z + 20, r),
-            "SI6": (x + d, y + 3*d, z + 20, r),
-            "SI7": (x + 2*d, y, z + 20, r),
-            "SI8": (x + 2*d, y + 3*d, z + 20, r),
-
-            "SM1": (x + d, y + d, z, r),
-            "SM2": (x + d, y + 2*d, z, r),
-            "SM3": (x + 2*d, y + d, z, r),
-            "SM4": (x + 2*d, y + 2*d, z, r)
-        }
+        """Named points of an n x n grid with side d, starting at (x, y).
+
+        A1..A4 are the outer corners, S1..S(4n-4) the ends of the n-1 lines
+        along x and then the n-1 lines along y (SI* the same with the pen up),
+        and SM* the interior crossings, numbered row by row.
+        """
+        lattice = self._geometry()["lattice"].tolist()
+        lift = LIFT_MM
+        points = {}
+        for i, row in enumerate(lattice):
+            for j, pose in enumerate(row):
+                name = self.lattice_name(i, j)
+                points[name] = tuple(pose)
+                if name.startswith("S") and not name.startswith("SM"):
+                    points["SI" + name[1:]] = (pose[0], pose[1], pose[2] + lift, pose[3])
         self.points = points
         print("Grid points generated successfully.")
 
-    def generate_grid1(self):
-        grid_map_path=self.grid_map
-        if not self.points:
-            raise ValueError("Please generate points before generating the grid!")
-
-        with open(grid_map_path, "r") as f:
-            grid_map = json.load(f)
+    def lattice_name(self, i, j):
+        """Name of the grid point at lattice position (i, j), 0 <= i, j <= n."""
+        n = self.n
+        if i in (0, n) and j in (0, n):
+            return "A" + str(1 + (j == n) + 2*(i == n))
+        if i == 0 and 0 < j < n:
+            return f"S{2*j - 1}"
+        if i == n and 0 < j < n:
+            return f"S{2*j}"
+        if j == 0 and 0 < i < n:
+            return f"S{2*(n - 1) + 2*i - 1}"
+        if j == n and 0 < i < n:
+            return f"S{2*(n - 1) + 2*i}"
+        return f"SM{(i - 1)*(n - 1) + j}"
 
+    def generate_grid(self):
+        """Cell corners G{row}{col} (and G{row}{col}I with the pen up), inset by offset."""
+        geometry = self._geometry()
+        corners = geometry["corners"].tolist()
+        lifted = geometry["lifted"].tolist()
         grid = {}
-        offset = self.offset
-        z_val = self.z
-        r_val = self.r
-
-        for grid_name, corner_keys in grid_map.items():
-            if len(corner_keys) != 4:
-                print(f"Grid {grid_name} does not have 4 corners, skipping.")
-                continue
-
-            try:
-                p1 = self.points[corner_keys[0]]
-                p2 = self.points[corner_keys[1]]
-                p3 = self.points[corner_keys[2]]
-                p4 = self.points[corner_keys[3]]
-
-                grid[grid_name] = [
-                    (p1[0] + offset, p1[1] + offset, z_val, r_val),
-                    (p2[0] + offset, p2[1] - offset, z_val, r_val),
-                    (p3[0] - offset, p3[1] + offset, z_val, r_val),
-                    (p4[0] - offset, p4[1] - offset, z_val, r_val),
-                ]
-
-                grid[grid_name + "I"] = [
-                    (p1[0] + offset, p1[1] + offset, z_val + 20, r_val),
-                    (p2[0] + offset, p2[1] - offset, z_val + 20, r_val),
-                    (p3[0] - offset, p3[1] + offset, z_val + 20, r_val),
-                    (p4[0] - offset, p4[1] - offset, z_val + 20, r_val),
-                ]
-            except KeyError as e:
-                print(f"Missing point {e} for grid {grid_name}, skipping.")
-                continue
-
+        for row in range(self.n):
+            for col in range(self.n):
+                grid_name = f"G{row + 1}{col + 1}"
+                grid[grid_name] = [tuple(p) for p in corners[row][col]]
+                grid[grid_name + "I"] = [tuple(p) for p in lifted[row][col]]
         self.grid = grid
         print("Grid coordinates generated successfully.")
 
     def move_to_point(self, key, delay=0):
         if key.lower() == "home":
             print("Moving to home position.")
-            self.device.home()
-            time.sleep(delay)
+            self._send_home()
+            traced_sleep(delay, "arm.sleep")
             return
 
         if key not in self.points:
@@ -118,8 +129,87 @@ class DobotGrid:
 
         x, y, z, r = self.points[key]
         print(f"Moving to {key}: x={x}, y={y}, z={z}, r={r}")
-        self.device.move_to(mode=int(MODE_PTP.MOVJ_XYZ), x=x, y=y, z=z, r=r)
-        time.sleep(delay)
+        self._send_move(MODE_PTP.MOVJ_XYZ, x, y, z, r)
+        traced_sleep(delay, "arm.sleep")
+
+    # ---------- motion synchronization ----------
+
+    def _send_move(self, mode, x, y, z, r):
+        with span("arm.move_to"):
+            cmd = self.device.move_to(mode=int(mode), x=x, y=y, z=z, r=r)
+        self._last_cmd = cmd if isinstance(cmd, int) else None
+        self._last_target = (x, y, z, r)
+        self._queued_pose = self._last_target
+
+    def _send_arc(self, via, x, y, z, r):
+        with span("arm.arc_to"):
+            cmd = self.device.arc_to(cir_point=via, to_point=(x, y, z, r))
+        self._last_cmd = cmd if isinstance(cmd, int) else None
+        self._last_target = (x, y, z, r)
+        self._queued_pose = self._last_target
+
+    def _send_home(self):
+        with span("arm.home"):
+            cmd = self.device.home()
+        self._last_cmd = cmd if isinstance(cmd, int) else None
+        self._last_target = self.home_pose
+        self._queued_pose = self.home_pose
+
+    def _pose(self):
+        return tuple(self.device.pose()[:4])
+
+    def wait_for_motion(self, label="motion", timeout=MOTION_TIMEOUT_SEC):
+        """Block until the last command sent has finished executing.
+
+        Uses the controller's queued-command index when the backend reports
+        command ids, otherwise waits for the pose to settle on the last target
+        (or, for homing with an unknown home pose, to stop changing).
+        Returns False on timeout.
+        """
+        start = time.monotonic()
+        done = self._wait_for(self._last_cmd, self._last_target, timeout)
+        elapsed = time.monotonic() - start
+        self.motion_log.append((label, elapsed))
+        if done:
+            print(f"[motion] {label}: {elapsed:.2f} s")
+        else:
+            print(f"[motion] Warning: {label} did not finish within {timeout:.0f} s")
+        return done
+
+    @traced("arm.wait")
+    def _wait_for(self, cmd, target, timeout):
+        start = time.monotonic()
+        if cmd is not None and hasattr(self.device, "_get_queued_cmd_current_index"):
+            done = False
+            while time.monotonic() - start < timeout:
+                if self.device._get_queued_cmd_current_index() >= cmd:
+                    done = True
+                    break
+                time.sleep(POSE_POLL_SEC)
+        else:
+            done = self._wait_for_pose(target, start, timeout)
+        if done and target is None:
+            # a homing run: remember where home is so later waits can converge on it
+            self.home_pose = self._pose()
+        return done
+
+    def _wait_for_pose(self, target, start, timeout):
+        first = last = self._pose()
+        stable = 0
+        moved = False
+        while time.monotonic() - start < timeout:
+            time.sleep(POSE_POLL_SEC)
+            pose = self._pose()
+            still = math.dist(pose[:3], last[:3]) <= POSE_TOLERANCE_MM
+            stable = stable + 1 if still else 0
+            moved = moved or math.dist(pose[:3], first[:3]) > POSE_TOLERANCE_MM
+            last = pose
+            if target is not None:
+                if stable >= 1 and math.dist(pose[:3], target[:3]) <= POSE_TOLERANCE_MM:
+                    return True
+            elif stable >= STABLE_POLLS and (moved or time.monotonic() - start > MOTION_START_GRACE_SEC):
+                return True
+        return False
     
     def move_to_intermediate(self):
         x = self.intermediate[0]
@@ -127,92 +217,140 @@ class DobotGrid:
         z = self.intermediate[2]
         r = self.intermediate[3]
         print(f"Moving to intermdiate: x={x}, y={y}, z={z}, r={r}")
-        self.device.move_to(mode=int(MODE_PTP.MOVJ_XYZ), x=x, y=y, z=z, r=r)
-        time.sleep(7) # as moving is not a synchronous process, pause the flow until it is done
-
-    def draw_grid(self):
-        sequence = [
-            "home",
-            "SI1", "S1", "S2", "SI2",
-            "SI3", "S3", "S4", "SI4",
-            "SI5", "S5", "S6", "SI6",
-            "SI7", "S7", "S8", "SI8",
-            "home"
-        ]
-
-        for key in sequence:
-            self.move_to_point(key)
-        time.sleep(30) # as drawing is not a synchronous process, pause the flow until it is done
-
-        print("Grid drawing completed successfully!")
-    
-    def draw_x(self, row, col, delay=0):
-        grid_name = "G" + str(row) + str(col)
-        grid_i_name = grid_name + "I"
-        if grid_name not in self.grid or grid_i_name not in self.grid:
-            print(f"Either '{grid_name}' or '{grid_i_name}' not found in grid data.")
-            return
+        self._send_move(MODE_PTP.MOVJ_XYZ, x, y, z, r)
+        # queued behind any plan still drawing; collect those timings first
+        self.wait_plans()
+        self.wait_for_motion("intermediate")
+
+    # ---------- motion plans ----------
+
+    def _start_pose(self):
+        """Where the next plan starts: the end of the queue, or the arm's pose now."""
+        return self._queued_pose or self._pose()
 
+    def _add_strokes(self, plan, strokes, start, mode=MODE_PTP.MOVL_XYZ):
+        """Append pen-down strokes in the order and direction with the least pen-up travel."""
+        z, r = self.z, self.r
+        for (x0, y0), (x1, y1) in optimize_strokes(strokes, start):
+            plan.add((x0, y0, z + LIFT_MM, r), mode)
+            plan.add((x0, y0, z, r), mode)
+            plan.add((x1, y1, z, r), mode)
+            plan.add((x1, y1, z + LIFT_MM, r), mode)
+        return plan
+
+    def plan_grid(self):
+        # one homing run to reference the arm before the first line, none after
+        plan = MotionPlan("grid").home()
+        strokes = [(self.points[f"S{k}"], self.points[f"S{k + 1}"])
+                   for k in range(1, 4*(self.n - 1), 2)]
+        self._add_strokes(plan, strokes, self.home_pose or HOME_POSE, MODE_PTP.MOVJ_XYZ)
+        return plan.merge_collinear()
+
+    def plan_x(self, row, col, start_pose=None):
+        grid_name = "G" + str(row) + str(col)
         grid = self.grid[grid_name]
-        grid_i = self.grid[grid_i_name]
+        plan = MotionPlan(f"x {grid_name}")
+        strokes = [(grid[0], grid[3]), (grid[1], grid[2])]
+        self._add_strokes(plan, strokes, start_pose or self._start_pose())
+        return plan.merge_collinear()
 
-        print(f"Starting to draw X in {grid_name}.")
-        motion_sequence = [
-            "home",
-            (grid_i[0], f"{grid_i_name}[0]"),
-            (grid[0], f"{grid_name}[0]"),
-            (grid[3], f"{grid_name}[3]"),
-            (grid_i[3], f"{grid_i_name}[3]"),
-            (grid_i[1], f"{grid_i_name}[1]"),
-            (grid[1], f"{grid_name}[1]"),
-            (grid[2], f"{grid_name}[2]"),
-            (grid_i[2], f"{grid_i_name}[2]"),
-            "home"
-        ]
-
-        for step in motion_sequence:
-            if step == "home":
-                print("Moving to home.")
-                self.device.home()
-                time.sleep(delay)
-            else:
-                (x, y, z, r), name = step
-                # print(f"Moving to {name}: x={x:.2f}, y={y:.2f}, z={z:.2f}, r={r:.2f}")
-                self.device.move_to(mode=int(MODE_PTP.MOVL_XYZ), x=x, y=y, z=z, r=r)
-                time.sleep(delay)
+    def plan_o(self, row, col, angle_step=None, start_pose=None):
+        """Circle of self.radius in the cell, started at the point nearest the arm.
 
-        time.sleep(5) # as drawing is not a synchronous process, pause the flow until it is done
-    
-    def calculate_center(self, tuple_list):
-        avg_tuple = tuple(
-            sum(values) / len(values)
-            for values in zip(*tuple_list)
-        )
-        return avg_tuple
-
-    def draw_o(self, row, col, angle_step=25):
+        Uses two native ARC commands when the controller supports them,
+        otherwise the fewest chords that keep within self.arc_tolerance of the
+        circle (or a fixed angle_step in degrees, if given).
+        """
         radius = self.radius
         grid_name = "G" + str(row) + str(col)
-        grid = self.grid[grid_name]
-        center = self.calculate_center(grid)
+        center = self._geometry()["centers"][row - 1, col - 1].tolist()
         x_center = center[0]
         y_center = center[1]
         z = center[2]
         r = center[3]
-        start_x = x_center + radius
-        start_y = y_center
-
-        self.device.move_to(mode=int(MODE_PTP.MOVL_XYZ), x=start_x, y=start_y, z=z+20, r=r)
-        self.device.move_to(mode=int(MODE_PTP.MOVL_XYZ), x=start_x, y=start_y, z=z, r=r)
-
-        for angle in range(0, 375, angle_step):
-            rad = math.radians(angle)
-            x = x_center + radius * math.cos(rad)
-            y = y_center + radius * math.sin(rad)
-            self.device.move_to(mode=int(MODE_PTP.MOVL_XYZ), x=x, y=y, z=z, r=r)
-        self.device.home()
-        time.sleep(5) # as drawing is not a synchronous process, pause the flow until it is done
-    
+
+        start = start_pose or self._start_pose()
+        a0 = math.atan2(start[1] - y_center, start[0] - x_center)
+
+        def on_circle(angle, height=z):
+            return (x_center + radius * math.cos(angle), y_center + radius * math.sin(angle), height, r)
+
+        plan = MotionPlan(f"o {grid_name}")
+        plan.add(on_circle(a0, z + LIFT_MM))
+        plan.add(on_circle(a0))
+        if self.native_arcs and angle_step is None:
+            plan.add_arc(on_circle(a0 + math.pi / 2), on_circle(a0 + math.pi))
+            plan.add_arc(on_circle(a0 + 3 * math.pi / 2), on_circle(a0 + 2 * math.pi))
+        else:
+            if angle_step is None:
+                segments = arc_segments(radius, self.arc_tolerance)
+            else:
+                segments = math.ceil(360 / angle_step)
+            for k in range(1, segments + 1):
+                plan.add(on_circle(a0 + 2 * math.pi * k / segments))
+        plan.add(on_circle(a0 + 2 * math.pi, z + LIFT_MM))
+        return plan.merge_collinear()
+
+    def run_plan(self, plan, wait=True):
+        """Send every waypoint of the plan to the controller queue in one burst.
+
+        With wait=False this returns as soon as the plan is queued, so the next
+        plan can be compiled and queued while this one is still drawing;
+        wait_plans() collects them later.
+        """
+        start_pose = self._queued_pose or self._pose()
+        expected = plan.expected_duration(start_pose, getattr(self.device, "velocity", None),
+                                          getattr(self.device, "accel", None))
+        sent_at = time.monotonic()
+        for wp in plan.waypoints:
+            if wp.mode == HOME:
+                self._send_home()
+            elif wp.mode == ARC:
+                self._send_arc(wp.via, wp.x, wp.y, wp.z, wp.r)
+            else:
+                self._send_move(wp.mode, wp.x, wp.y, wp.z, wp.r)
+        self._pending.append((plan, self._last_cmd, self._last_target, sent_at, expected))
+        if wait:
+            self.wait_plans()
+
+    def wait_plans(self, timeout=MOTION_TIMEOUT_SEC):
+        """Wait for the queued plans in order, logging expected vs. actual time of each."""
+        while self._pending:
+            plan, cmd, target, sent_at, expected = self._pending.pop(0)
+            if cmd is None and self._pending:
+                # without command ids only the end of the whole queue is observable
+                print(f"[plan] {plan.name}: expected {expected:.2f} s, actual n/a (pipelined)")
+                continue
+            done = self._wait_for(cmd, target, timeout)
+            end = time.monotonic()
+            actual = end - max(sent_at, self._plan_done_at)
+            self._plan_done_at = end
+            self.plan_log.append((plan.name, expected, actual))
+            self.motion_log.append((plan.name, actual))
+            status = "" if done else " (timed out)"
+            print(f"[plan] {plan.name}: expected {expected:.2f} s, actual {actual:.2f} s{status}")
+
+    # ---------- drawing ----------
+
+    def draw_grid(self, wait=True):
+        self.run_plan(self.plan_grid(), wait=wait)
+        if wait:
+            print("Grid drawing completed successfully!")
+
+    def draw_x(self, row, col, delay=0, wait=True):
+        # delay is kept for callers; a batched plan has no pauses between moves
+        grid_name = "G" + str(row) + str(col)
+        grid_i_name = grid_name + "I"
+        if grid_name not in self.grid or grid_i_name not in self.grid:
+            print(f"Either '{grid_name}' or '{grid_i_name}' not found in grid data.")
+            return
+
+        print(f"Starting to draw X in {grid_name}.")
+        self.run_plan(self.plan_x(row, col), wait=wait)
+
+    def draw_o(self, row, col, angle_step=None, wait=True):
+        self.run_plan(self.plan_o(row, col, angle_step), wait=wait)
+
     def disconnect(self):
         self.device.close()
 
@@ -1,5 +1,6 @@
 class DobotGrid:
-    def __init__(self, port="/dev/ttyACM0"):
+    def __init__(self, port="/dev/ttyACM0", n=3):
+        self.n = n
         print("INITIALIZING DOBOT")
 
     def generate_points(self):
@@ -16,13 +17,13 @@ class DobotGrid:
     def move_to_intermediate(self):
         print(f"Moving to intermdiate position")
 
-    def draw_grid(self):
+    def draw_grid(self, wait=True):
         print("Grid drawing completed successfully!")
     
-    def draw_x(self, row, col, delay=0):
+    def draw_x(self, row, col, delay=0, wait=True):
         print("drawing x")
 
-    def draw_o(self, row, col, angle_step=25):
+    def draw_o(self, row, col, angle_step=None, wait=True):
         print("drawing o")
     
     def disconnect(self):
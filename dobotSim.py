@@ -0,0 +1,183 @@
+"""Simulated Dobot with the parts of the pydobot interface DobotGrid uses.
+
+Commands go into a queue and execute one after another with realistic
+durations (trapezoidal speed profile per segment, slow homing), so pose()
+and the queued-command index behave like the real controller. time_scale > 1
+runs the simulated clock faster than the wall clock for quick benchmarks.
+"""
+import math
+import threading
+import time
+from enum import IntEnum
+
+
+class MODE_PTP(IntEnum):
+    JUMP_XYZ = 0
+    MOVJ_XYZ = 1
+    MOVL_XYZ = 2
+    JUMP_ANGLE = 3
+    MOVJ_ANGLE = 4
+    MOVL_ANGLE = 5
+    MOVJ_INC = 6
+    MOVL_INC = 7
+    MOVJ_XYZ_INC = 8
+    JUMP_MOVL_XYZ = 9
+
+
+HOME_POSE = (259.0, 0.0, 40.0, 0.0)
+HOME_REFERENCE_POSE = (200.0, 0.0, 120.0, 0.0)  # where homing drives to before returning
+HOME_DURATION_SEC = 15.0      # homing re-references every joint, it is slow
+MAX_VELOCITY_MM_S = 200.0     # at speed(100, 100)
+MAX_ACCEL_MM_S2 = 400.0
+SETTLE_SEC = 0.08             # per command, controller latency and settling
+JOINT_MOVE_FACTOR = 0.8       # MOVJ is a bit faster than a straight MOVL
+
+
+def travel_duration(dist, velocity=MAX_VELOCITY_MM_S, accel=MAX_ACCEL_MM_S2):
+    """Seconds to travel dist mm with a trapezoidal speed profile, plus settling."""
+    ramp = velocity / accel  # time to reach full speed
+    if dist < velocity * ramp:
+        t = 2.0 * math.sqrt(dist / accel)  # triangular profile, never at full speed
+    else:
+        t = dist / velocity + ramp
+    return t + SETTLE_SEC
+
+
+def segment_duration(start, end, mode=MODE_PTP.MOVL_XYZ, velocity=MAX_VELOCITY_MM_S,
+                     accel=MAX_ACCEL_MM_S2):
+    """Seconds to travel start -> end (x, y, z, r) with a trapezoidal profile."""
+    t = travel_duration(math.dist(start[:3], end[:3]), velocity, accel)
+    if mode == MODE_PTP.MOVJ_XYZ:
+        t = (t - SETTLE_SEC) * JOINT_MOVE_FACTOR + SETTLE_SEC
+    return t
+
+
+def _arc_geometry(src, via, dst):
+    """Center, radius, start angle and signed sweep of the xy arc src -> via -> dst."""
+    (ax, ay), (bx, by), (cx, cy) = src[:2], via[:2], dst[:2]
+    d = 2.0 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    if abs(d) < 1e-9:
+        return None  # collinear: a straight line
+    ux = ((ax*ax + ay*ay) * (by - cy) + (bx*bx + by*by) * (cy - ay) + (cx*cx + cy*cy) * (ay - by)) / d
+    uy = ((ax*ax + ay*ay) * (cx - bx) + (bx*bx + by*by) * (ax - cx) + (cx*cx + cy*cy) * (bx - ax)) / d
+    radius = math.hypot(ax - ux, ay - uy)
+    a0 = math.atan2(ay - uy, ax - ux)
+    a1 = (math.atan2(by - uy, bx - ux) - a0) % (2 * math.pi)
+    a2 = (math.atan2(cy - uy, cx - ux) - a0) % (2 * math.pi)
+    if a2 == 0:
+        a2 = 2 * math.pi  # a full circle back to the start
+    sweep = a2 if a1 <= a2 else a2 - 2 * math.pi  # go the way that passes through via
+    return ux, uy, radius, a0, sweep
+
+
+def arc_length(src, via, dst):
+    geo = _arc_geometry(src, via, dst)
+    if geo is None:
+        return math.dist(src[:3], dst[:3])
+    return abs(geo[2] * geo[4])
+
+
+def arc_point(src, via, dst, f):
+    """Pose a fraction f of the way along the arc src -> via -> dst."""
+    geo = _arc_geometry(src, via, dst)
+    if geo is None:
+        return tuple(a + (b - a) * f for a, b in zip(src, dst))
+    ux, uy, radius, a0, sweep = geo
+    a = a0 + sweep * f
+    z = src[2] + (dst[2] - src[2]) * f
+    r = src[3] + (dst[3] - src[3]) * f
+    return (ux + radius * math.cos(a), uy + radius * math.sin(a), z, r)
+
+
+class SimDobot:
+    def __init__(self, port=None, time_scale=1.0, start_pose=HOME_POSE):
+        self.port = port
+        self.time_scale = time_scale
+        self.velocity = MAX_VELOCITY_MM_S
+        self.accel = MAX_ACCEL_MM_S2
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self._queue = []          # (start, end, from_pose, to_pose, via), simulated seconds
+        self._done = 0            # commands finished and dropped from the queue
+        self._tail_pose = tuple(start_pose)
+        self._tail_time = 0.0
+        self.commands_sent = 0
+
+    def now(self):
+        """Simulated seconds since the device was created."""
+        return (time.monotonic() - self._t0) * self.time_scale
+
+    def _enqueue(self, target, duration, via=None):
+        with self._lock:
+            start = max(self.now(), self._tail_time)
+            end = start + duration
+            self._queue.append((start, end, self._tail_pose, tuple(target), via))
+            self._tail_pose, self._tail_time = tuple(target), end
+            self.commands_sent += 1
+            return self.commands_sent
+
+    def _advance(self, now):
+        while self._queue and self._queue[0][1] <= now:
+            self._queue.pop(0)
+            self._done += 1
+
+    # ---------- pydobot interface ----------
+
+    def speed(self, velocity=100.0, acceleration=100.0):
+        self.velocity = MAX_VELOCITY_MM_S * velocity / 100.0
+        self.accel = MAX_ACCEL_MM_S2 * acceleration / 100.0
+
+    def move_to(self, x, y, z, r, mode=MODE_PTP.MOVJ_XYZ, wait=False):
+        target = (float(x), float(y), float(z), float(r))
+        duration = segment_duration(self._tail_pose, target, mode, self.velocity, self.accel)
+        index = self._enqueue(target, duration)
+        if wait:
+            self.wait_for_cmd(index)
+        return index
+
+    def arc_to(self, cir_point, to_point, wait=False):
+        """Circular arc from the current target through cir_point to to_point (Dobot ARC command)."""
+        via = tuple(float(v) for v in cir_point[:4])
+        target = tuple(float(v) for v in to_point[:4])
+        duration = travel_duration(arc_length(self._tail_pose, via, target), self.velocity, self.accel)
+        index = self._enqueue(target, duration, via)
+        if wait:
+            self.wait_for_cmd(index)
+        return index
+
+    def home(self):
+        # homing drives every joint to its reference, then back to the home pose
+        self._enqueue(HOME_REFERENCE_POSE, HOME_DURATION_SEC / 2.0)
+        return self._enqueue(HOME_POSE, HOME_DURATION_SEC / 2.0)
+
+    def pose(self):
+        """(x, y, z, r, j1, j2, j3, j4) like pydobot; joint angles are not simulated."""
+        now = self.now()
+        with self._lock:
+            self._advance(now)
+            pose = self._tail_pose
+            for start, end, src, dst, via in self._queue:
+                if now < start:
+                    pose = src
+                    break
+                if now < end:
+                    f = (now - start) / (end - start)
+                    if via is None:
+                        pose = tuple(a + (b - a) * f for a, b in zip(src, dst))
+                    else:
+                        pose = arc_point(src, via, dst, f)
+                    break
+        return pose + (0.0, 0.0, 0.0, 0.0)
+
+    def _get_queued_cmd_current_index(self):
+        now = self.now()
+        with self._lock:
+            self._advance(now)
+            return self._done
+
+    def wait_for_cmd(self, index):
+        while self._get_queued_cmd_current_index() < index:
+            time.sleep(0.01)
+
+    def close(self):
+        pass
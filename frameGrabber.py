@@ -0,0 +1,172 @@
+"""Camera thread that writes frames into a preallocated ring of buffers.
+
+cap.retrieve() decodes straight into the next free slot, so capturing does
+not allocate, and readers get read-only views of a slot instead of copies.
+Every frame gets a sequence number; wait_newer(seq) blocks until a frame
+after `seq` arrives, so a caller never works on a frame from before some
+event (e.g. the arm leaving the camera's view).
+
+A view stays valid until the ring wraps around to its slot, which takes
+slots - 1 newer frames. That is plenty for display; anything slower (a
+detection) should hold() the frame, which keeps the writer off its slot
+until the block ends. If every other slot is held, new frames are dropped.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from stageTrace import span
+
+RING_SLOTS = 4
+NOMINAL_FPS = 30.0
+
+
+class FrameGrabber:
+    """Continuously grabs frames; read() returns a view of the latest frame instantly."""
+
+    def __init__(self, cap, slots=RING_SLOTS):
+        self.cap = cap
+        self.slots = slots
+        self._cond = threading.Condition()
+        self._ring = None          # preallocated frame buffers
+        self._seqs = None          # sequence number held by each slot
+        self._pins = None          # readers holding each slot
+        self._latest = -1          # slot of the newest frame
+        self._seq = 0
+        self._running = False
+        self._t = None
+        # counters for report()
+        self.frames = 0
+        self.views = 0
+        self.dropped = 0
+        self.reallocs = 0
+        self._started_at = None
+
+    def start(self):
+        if self._running: return
+        self._running = True
+        self._started_at = time.perf_counter()
+        self._t = threading.Thread(target=self._loop, daemon=True)
+        self._t.start()
+
+    # ---------- writer ----------
+
+    def _allocate(self, frame):
+        self._ring = [np.empty_like(frame) for _ in range(self.slots)]
+        self._seqs = [0] * self.slots
+        self._pins = [0] * self.slots
+        self._latest = -1
+        self.reallocs += 1
+
+    def _free_slot(self):
+        for k in range(1, self.slots + 1):
+            slot = (self._latest + k) % self.slots
+            if slot != self._latest and self._pins[slot] == 0:
+                return slot
+        return None
+
+    def _loop(self):
+        # grab -> retrieve keeps buffer small and reduces latency
+        while self._running:
+            if not self.cap.grab():
+                time.sleep(0.01)
+                continue
+            with self._cond:
+                slot = self._free_slot() if self._ring is not None else 0
+            if slot is None:
+                self.dropped += 1
+                continue
+            buf = self._ring[slot] if self._ring is not None else None
+            with span("capture.retrieve"):
+                ok, frame = self.cap.retrieve(buf) if buf is not None else self.cap.retrieve()
+            if not ok:
+                time.sleep(0.005)
+                continue
+            with self._cond:
+                if buf is None or frame is not buf:
+                    # first frame, or the camera changed size: (re)build the ring around it
+                    self._allocate(frame)
+                    slot = 0
+                    self._ring[0][...] = frame
+                self._seq += 1
+                self._seqs[slot] = self._seq
+                self._latest = slot
+                self.frames += 1
+                self._cond.notify_all()
+
+    # ---------- readers ----------
+
+    def _view_locked(self, slot):
+        view = self._ring[slot].view()
+        view.flags.writeable = False
+        self.views += 1
+        return view
+
+    def read(self):
+        """Read-only view of the most recent frame (or None if not ready)."""
+        return self.read_seq()[1]
+
+    def read_seq(self):
+        """(sequence number, read-only view of the most recent frame); seq grows by one per frame."""
+        with self._cond:
+            if self._latest < 0:
+                return self._seq, None
+            return self._seq, self._view_locked(self._latest)
+
+    def wait_newer(self, seq, timeout=None):
+        """(seq, view) of the first frame after `seq`; (seq, None) on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > seq or not self._running, timeout):
+                return seq, None
+            if self._latest < 0:
+                return seq, None
+            return self._seq, self._view_locked(self._latest)
+
+    @contextmanager
+    def hold(self, after=None, timeout=None):
+        """Yield (seq, view) of the latest frame (newer than `after`) and keep it from being overwritten."""
+        with self._cond:
+            if after is not None:
+                self._cond.wait_for(lambda: self._seq > after or not self._running, timeout)
+            if self._latest < 0 or (after is not None and self._seq <= after):
+                slot = None
+            else:
+                slot = self._latest
+                self._pins[slot] += 1
+                held = self._seqs[slot], self._view_locked(slot)
+                ring = self._ring
+        if slot is None:
+            yield self._seq, None
+            return
+        try:
+            yield held
+        finally:
+            with self._cond:
+                if self._ring is ring:
+                    self._pins[slot] -= 1
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._t:
+            self._t.join(timeout=1.0)
+            self._t = None
+
+    # ---------- stats ----------
+
+    def report(self, fps=NOMINAL_FPS):
+        """Allocations and copy bandwidth the ring saved, measured and scaled to `fps`."""
+        if self._ring is None or not self._started_at:
+            return "[grabber] no frames captured"
+        elapsed = max(time.perf_counter() - self._started_at, 1e-6)
+        nbytes = self._ring[0].nbytes
+        views_per_frame = self.views / max(self.frames, 1)
+        # before: one new array per retrieve and one copy per read
+        saved = fps * (1 + views_per_frame) * nbytes / 1e6
+        return (f"[grabber] {self.frames} frames ({self.frames / elapsed:.1f} fps), {self.views} views, "
+                f"{self.dropped} dropped, {self.reallocs} ring allocation(s); "
+                f"at {fps:.0f} fps this avoids {fps:.0f} frame allocations/s and "
+                f"{fps * views_per_frame:.0f} copies/s, {saved:.1f} MB/s of memory traffic")
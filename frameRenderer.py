@@ -0,0 +1,101 @@
+"""Display stage kept off the detection path.
+
+Detection returns detectGrid.Detection results and draws nothing. Callers
+hand the latest frame (and the latest detection, if any) to a Renderer,
+which keeps only the newest submission and, on its own thread and at most
+`fps` times a second, draws the annotations and shows the window. submit()
+never blocks and never copies; the frame is copied when it is drawn.
+
+All HighGUI calls (window creation, imshow, waitKey, destroy) happen on the
+renderer thread, which works with OpenCV's GTK and Qt backends on Linux.
+In headless mode no Renderer is created at all, so no window exists and no
+drawing is done.
+"""
+import threading
+import time
+
+import cv2
+
+from detectGrid import _overlay_board_text, annotate
+from stageTrace import span
+
+RENDER_FPS = 15.0
+
+
+class Renderer:
+    def __init__(self, window="Feed", fps=RENDER_FPS, size=(960, 720), board_text=True, show=True):
+        """show=False draws without a window (for benchmarks)."""
+        self.window = window
+        self.fps = fps
+        self.size = size
+        self.board_text = board_text
+        self.show = show
+        self._lock = threading.Lock()
+        self._pending = None
+        self._quit = threading.Event()
+        self._running = False
+        self._t = None
+        self.rendered = 0
+        self.skipped = 0
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._t = threading.Thread(target=self._loop, name="renderer", daemon=True)
+        self._t.start()
+        return self
+
+    def submit(self, frame, detection=None, board=None):
+        """Queue a frame to show; replaces any frame not yet drawn."""
+        if frame is None:
+            return
+        with self._lock:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = (frame, detection, board)
+
+    def quit_requested(self):
+        """True once 'q' was pressed in the window."""
+        return self._quit.is_set()
+
+    def _draw(self, frame, detection, board):
+        if detection is not None:
+            return annotate(frame, detection, board_text=self.board_text)
+        image = frame.copy()
+        if board is not None and self.board_text:
+            _overlay_board_text(image, board)
+        return image
+
+    def _loop(self):
+        if self.show:
+            cv2.namedWindow(self.window, cv2.WINDOW_NORMAL)
+            cv2.resizeWindow(self.window, *self.size)
+        period = 1.0 / self.fps
+        next_at = time.perf_counter()
+        while self._running:
+            with self._lock:
+                item, self._pending = self._pending, None
+            if item is not None:
+                with span("render.draw"):
+                    image = self._draw(*item)
+                self.rendered += 1
+                if self.show:
+                    cv2.imshow(self.window, image)
+            if self.show and cv2.waitKey(1) & 0xFF == ord('q'):
+                self._quit.set()
+            next_at += period
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+            next_at = max(next_at, time.perf_counter() - period)
+        if self.show:
+            cv2.destroyWindow(self.window)
+            cv2.waitKey(1)
+
+    def stop(self):
+        self._running = False
+        if self._t:
+            self._t.join(timeout=1.0)
+            self._t = None
+
+    def report(self):
+        return f"[render] {self.rendered} frames drawn, {self.skipped} superseded before drawing"
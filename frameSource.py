@@ -0,0 +1,288 @@
+"""Frame sources behind the cv2.VideoCapture interface.
+
+Every source has read(), grab(), retrieve([image]), get(prop), isOpened()
+and release(), so FrameGrabber, the orchestrator and the benchmarks take a
+recording wherever they take a camera. Sources also name their frames
+(`last_name`, and frames() yields (name, frame)) so labels can be matched.
+
+- CameraSource: a live camera index.
+- VideoFileSource: a video file; frame names are the frame index.
+- ImageDirSource: the .png/.jpg files of a folder in natural name order
+  (img_99 before img_100), e.g. the debug/img_*.jpg frames debugRecorder
+  writes or the older img_NN.png ones.
+- RawArchiveSource: a memory-mapped archive of raw BGR frames written by
+  write_archive (or `python frameSource.py pack`). Reads are views into the
+  mapping, so replay costs no decoding and no copies.
+
+open_source(spec) picks the source from an int, a path or a folder.
+Recorded sources replay as fast as they are read unless realtime=True,
+which paces them at their frame rate like a camera.
+"""
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_FPS = 30.0
+IMAGE_EXTS = ("png", "jpg", "jpeg", "bmp")
+ARCHIVE_EXT = ".raw"
+
+
+def natural_key(path):
+    """Sort key that orders the numbers in a name by value: img_9 < img_10 < img_100."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", os.path.basename(path))]
+
+
+class _Source:
+    """Shared replay logic; subclasses implement _frame(k) and set self.count / self.fps."""
+
+    def __init__(self, fps=DEFAULT_FPS, realtime=False, loop=False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.count = 0
+        self.pos = 0
+        self.last_name = None
+        self._grabbed = None
+        self._next_at = None
+
+    def _frame(self, k):
+        raise NotImplementedError
+
+    def _name(self, k):
+        return f"{k:06d}"
+
+    def isOpened(self):
+        return self.count > 0
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.count
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.pos
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.pos = int(value)
+            return True
+        return False
+
+    def _pace(self):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_at is None:
+            self._next_at = now
+        self._next_at += 1.0 / self.fps
+        time.sleep(max(0.0, self._next_at - now))
+
+    def grab(self):
+        if self.pos >= self.count:
+            if not self.loop or not self.count:
+                return False
+            self.pos = 0
+        self._pace()
+        self._grabbed = self.pos
+        self.last_name = self._name(self.pos)
+        self.pos += 1
+        return True
+
+    def retrieve(self, image=None):
+        if self._grabbed is None:
+            return False, None
+        frame = self._frame(self._grabbed)
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            image[...] = frame
+            return True, image
+        return True, frame
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def frames(self):
+        """(name, frame) for every remaining frame, without pacing or looping."""
+        realtime, loop = self.realtime, self.loop
+        self.realtime = self.loop = False
+        try:
+            while True:
+                ok, frame = self.read()
+                if not ok:
+                    return
+                yield self.last_name, frame
+        finally:
+            self.realtime, self.loop = realtime, loop
+
+    def release(self):
+        self.count = 0
+
+
+class CameraSource:
+    """A live camera; cv2.VideoCapture itself plus frame names."""
+
+    def __init__(self, index):
+        self.cap = cv2.VideoCapture(index)
+        self.index = index
+        self.seq = 0
+        self.last_name = None
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+    def grab(self):
+        ok = self.cap.grab()
+        if ok:
+            self.seq += 1
+            self.last_name = f"{self.seq:06d}"
+        return ok
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.cap.retrieve(image)
+
+    def frames(self):
+        while True:
+            ok, frame = self.read()
+            if not ok:
+                return
+            yield self.last_name, frame
+
+
+class VideoFileSource(_Source):
+    def __init__(self, path, realtime=False, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS, realtime, loop)
+        self.count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)) if self.cap.isOpened() else 0
+        self._decoded = -1
+
+    def _frame(self, k):
+        if k != self._decoded + 1:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, k)
+        ok, frame = self.cap.read()
+        self._decoded = k
+        return frame if ok else None
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirSource(_Source):
+    def __init__(self, folder, fps=DEFAULT_FPS, realtime=False, loop=False):
+        super().__init__(fps, realtime, loop)
+        self.folder = folder
+        self.paths = sorted((p for ext in IMAGE_EXTS for p in glob.glob(os.path.join(folder, f"*.{ext}"))),
+                            key=natural_key)
+        self.count = len(self.paths)
+
+    def _name(self, k):
+        return os.path.basename(self.paths[k])
+
+    def _frame(self, k):
+        return cv2.imread(self.paths[k])
+
+
+class RawArchiveSource(_Source):
+    """Frames of a write_archive file, as read-only views into a memory mapping."""
+
+    def __init__(self, path, realtime=False, loop=False):
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+        super().__init__(meta.get("fps", DEFAULT_FPS), realtime, loop)
+        self.meta = meta
+        # a segment debugRecorder is still writing (or was killed writing) may list no frames yet
+        self.frames_map = np.memmap(path, dtype=np.uint8, mode="r", shape=tuple(meta["shape"])) \
+            if meta["shape"][0] else None
+        self.names = meta.get("names") or [f"{k:06d}" for k in range(meta["shape"][0])]
+        self.labels = meta.get("labels", {})
+        self.count = meta["shape"][0]
+
+    def _name(self, k):
+        return self.names[k]
+
+    def _frame(self, k):
+        return self.frames_map[k]
+
+    def release(self):
+        super().release()
+        self.frames_map = None
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def write_archive(path, frames, fps=DEFAULT_FPS, labels=None):
+    """Write (name, frame) pairs, all the same shape, as a raw archive; returns the frame count."""
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        raise ValueError("no frames to archive")
+    names = [first[0]]
+    shape = first[1].shape
+    with open(path, "wb") as f:
+        f.write(np.ascontiguousarray(first[1], dtype=np.uint8).tobytes())
+        for name, frame in frames:
+            if frame.shape != shape:
+                raise ValueError(f"{name}: frame shape {frame.shape} differs from {shape}")
+            f.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+            names.append(name)
+    meta = {"shape": [len(names), *shape], "fps": fps, "names": names}
+    if labels:
+        meta["labels"] = labels
+    with open(_meta_path(path), "w") as f:
+        json.dump(meta, f)
+    return len(names)
+
+
+def open_source(spec, realtime=False, loop=False):
+    """Camera index (int or digit string), .raw archive, image folder or video file."""
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, realtime=realtime, loop=loop)
+    if spec.endswith(ARCHIVE_EXT):
+        return RawArchiveSource(spec, realtime=realtime, loop=loop)
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
+
+
+def load_labels(spec):
+    """Expected boards by frame name: labels.json in a folder, next to a file, or in an archive's metadata."""
+    if isinstance(spec, str) and spec.endswith(ARCHIVE_EXT) and os.path.exists(_meta_path(spec)):
+        with open(_meta_path(spec)) as f:
+            labels = json.load(f).get("labels")
+        if labels:
+            return labels
+    if isinstance(spec, int) or spec.isdigit():
+        return {}
+    folder = spec if os.path.isdir(spec) else os.path.dirname(spec)
+    path = os.path.join(folder, "labels.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    """python frameSource.py pack <source> <out.raw>: archive any recording for fast replay."""
+    if len(sys.argv) != 4 or sys.argv[1] != "pack":
+        raise SystemExit("usage: python frameSource.py pack <source> <out.raw>")
+    src = open_source(sys.argv[2])
+    n = write_archive(sys.argv[3], src.frames(), src.get(cv2.CAP_PROP_FPS), load_labels(sys.argv[2]))
+    print(f"{n} frames written to {sys.argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Configurable N x N, k-in-a-row engine for boards too large for brute-force minimax.
+
+Iterative-deepening negamax with alpha-beta, a Zobrist-hashed transposition
+table, move ordering and an evaluation that is updated incrementally from
+per-line piece counts. Each call to best_move() gets a wall-clock budget and
+returns the best move of the deepest iteration that finished in time.
+"""
+import math
+import random
+import time
+
+EMPTY, X, O = 0, 1, 2
+TOKENS = {'_': EMPTY, ' ': EMPTY, 'x': X, 'X': X, 'o': O, 'O': O}
+
+WIN_SCORE = 1_000_000
+EXACT, LOWER, UPPER = 0, 1, 2
+TIME_CHECK_NODES = 1024
+
+
+class _Timeout(Exception):
+    pass
+
+
+class SearchInfo:
+    """What the last best_move() call did, for logging and benchmarks."""
+
+    def __init__(self):
+        self.depth = 0
+        self.nodes = 0
+        self.score = 0
+        self.elapsed = 0.0
+        self.timed_out = False
+
+    def __repr__(self):
+        return (f"SearchInfo(depth={self.depth}, nodes={self.nodes}, score={self.score}, "
+                f"elapsed={self.elapsed:.3f}s, timed_out={self.timed_out})")
+
+
+class Engine:
+    def __init__(self, n=3, k=3, time_budget=1.0, max_depth=None, seed=0):
+        if not 1 <= k <= n:
+            raise ValueError(f"Need 1 <= k <= n, got n={n}, k={k}")
+        self.n = n
+        self.k = k
+        self.time_budget = time_budget
+        self.max_depth = max_depth if max_depth is not None else n * n
+        self.info = SearchInfo()
+
+        self.lines = self._build_lines()
+        self.cell_lines = [[] for _ in range(n * n)]
+        for idx, line in enumerate(self.lines):
+            for c in line:
+                self.cell_lines[c].append(idx)
+        # weight of a line holding `count` pieces of one player and none of the other
+        self.weights = [0] + [10 ** (c - 1) for c in range(1, k)] + [WIN_SCORE]
+        # tie-break moves towards the center
+        mid = (n - 1) / 2.0
+        self.center_bias = [-(abs(c // n - mid) + abs(c % n - mid)) for c in range(n * n)]
+
+        rng = random.Random(seed)
+        self.zobrist = [[0, rng.getrandbits(64), rng.getrandbits(64)] for _ in range(n * n)]
+        self.tt = {}
+        self.history = [0] * (n * n)
+
+    def _build_lines(self):
+        n, k = self.n, self.k
+        lines = []
+        for r in range(n):
+            for c in range(n):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < n and 0 <= end_c < n:
+                        lines.append(tuple((r + dr * s) * n + (c + dc * s) for s in range(k)))
+        return lines
+
+    # ---------- incremental state ----------
+
+    def _load(self, board):
+        n = self.n
+        if len(board) != n or any(len(row) != n for row in board):
+            raise ValueError(f"Expected a {n}x{n} board")
+        self.cells = [TOKENS.get(board[c // n][c % n], EMPTY) for c in range(n * n)]
+        self.count = [[0] * len(self.lines), [0] * len(self.lines), [0] * len(self.lines)]
+        self.key = 0
+        self.score = 0  # from X's point of view
+        self.won = EMPTY
+        for c, p in enumerate(self.cells):
+            if p != EMPTY:
+                self.key ^= self.zobrist[c][p]
+                for idx in self.cell_lines[c]:
+                    self.count[p][idx] += 1
+                    if self.count[p][idx] == self.k:
+                        self.won = p
+        for idx in range(len(self.lines)):
+            self.score += self._line_value(idx)
+
+    def _line_value(self, idx):
+        cx, co = self.count[X][idx], self.count[O][idx]
+        if cx and co:
+            return 0
+        return self.weights[cx] - self.weights[co]
+
+    def _place(self, c, p):
+        self.cells[c] = p
+        self.key ^= self.zobrist[c][p]
+        count = self.count[p]
+        for idx in self.cell_lines[c]:
+            before = self._line_value(idx)
+            count[idx] += 1
+            self.score += self._line_value(idx) - before
+            if count[idx] == self.k:
+                self.won = p
+
+    def _remove(self, c, p):
+        self.cells[c] = EMPTY
+        self.key ^= self.zobrist[c][p]
+        count = self.count[p]
+        for idx in self.cell_lines[c]:
+            before = self._line_value(idx)
+            count[idx] -= 1
+            self.score += self._line_value(idx) - before
+        self.won = EMPTY
+
+    # ---------- search ----------
+
+    def _ordered_moves(self, hint):
+        moves = [c for c, p in enumerate(self.cells) if p == EMPTY]
+        history, bias = self.history, self.center_bias
+        moves.sort(key=lambda c: (c == hint, history[c], bias[c]), reverse=True)
+        return moves
+
+    def _negamax(self, depth, ply, alpha, beta, side):
+        self.info.nodes += 1
+        if self.info.nodes % TIME_CHECK_NODES == 0 and time.monotonic() > self.deadline:
+            raise _Timeout()
+
+        if self.won != EMPTY:
+            # the previous move won, so the side to move has lost
+            return -(WIN_SCORE - ply)
+        if depth == 0 or EMPTY not in self.cells:
+            return self.score if side == X else -self.score
+
+        alpha0 = alpha
+        entry = self.tt.get((self.key, side))
+        hint = -1
+        if entry is not None:
+            e_depth, e_value, e_flag, hint = entry
+            if e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_value
+                if e_flag == LOWER:
+                    alpha = max(alpha, e_value)
+                else:
+                    beta = min(beta, e_value)
+                if alpha >= beta:
+                    return e_value
+
+        other = O if side == X else X
+        best, best_move = -math.inf, -1
+        for c in self._ordered_moves(hint):
+            self._place(c, side)
+            try:
+                val = -self._negamax(depth - 1, ply + 1, -beta, -alpha, other)
+            finally:
+                self._remove(c, side)
+            if val > best:
+                best, best_move = val, c
+            alpha = max(alpha, val)
+            if alpha >= beta:
+                self.history[c] += depth * depth
+                break
+
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+        self.tt[(self.key, side)] = (depth, best, flag, best_move)
+        return best
+
+    def _root(self, depth, side, moves):
+        other = O if side == X else X
+        alpha, beta = -math.inf, math.inf
+        best, best_move = -math.inf, moves[0]
+        for c in moves:
+            self._place(c, side)
+            try:
+                val = -self._negamax(depth - 1, 1, -beta, -alpha, other)
+            finally:
+                self._remove(c, side)
+            if val > best:
+                best, best_move = val, c
+            alpha = max(alpha, val)
+        return best_move, best
+
+    def best_move(self, board, token='x', time_budget=None):
+        """Best (row, col) for `token` on an n x n list of lists, or (-1, -1) if the board is full.
+
+        Searches deeper until the time budget runs out and returns the best move
+        of the deepest finished iteration.
+        """
+        start = time.monotonic()
+        budget = self.time_budget if time_budget is None else time_budget
+        self.deadline = start + budget
+        self.info = SearchInfo()
+        self._load(board)
+        side = TOKENS[token]
+
+        moves = self._ordered_moves(-1)
+        if not moves or self.won != EMPTY:
+            self.info.elapsed = time.monotonic() - start
+            return (-1, -1)
+
+        best_move = moves[0]
+        for depth in range(1, min(self.max_depth, len(moves)) + 1):
+            try:
+                move, score = self._root(depth, side, moves)
+            except _Timeout:
+                self.info.timed_out = True
+                break
+            best_move = move
+            self.info.depth, self.info.score = depth, score
+            # search the previous best first in the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCORE - self.n * self.n:
+                break  # forced result found, deeper search cannot change it
+
+        self.info.elapsed = time.monotonic() - start
+        return (best_move // self.n, best_move % self.n)
@@ -0,0 +1,304 @@
+"""Game server: several stations, each with its own arm, camera and game, in one process.
+
+Every station is an orchestrator.Orchestrator running in a shared event
+loop. What the stations share:
+
+- BatchDetector: the one detector model. Detections requested by different
+  stations within BATCH_WAIT_SEC of each other go into a single batched
+  model call, so N stations cost far fewer than N model calls.
+- SharedSolver: the robot's moves, from ticTacToe's move table (one per
+  process), counting the moves it answered and the positions it did not
+  know (solved by search).
+
+The server prints every station's status and throughput (and the batching
+and solver figures) every --report seconds and on exit, and can write the
+final figures as JSON with --metrics. The stations' game output is dropped
+unless --verbose, which prints it prefixed with the station's name; the
+arms' own output is never touched.
+
+Each station plays --games games back to back. Before every game after the
+first, a recording is rewound and a real or simulated arm draws a new grid.
+
+A station is ARM=SOURCE: ARM is "stub" (dobotGrid_stubbings), "sim" (the
+simulated arm) or a serial port, SOURCE a camera index, video file, image
+folder or .raw archive. Recordings loop, paced at their frame rate.
+
+Three stub stations on one machine, no hardware:
+    python gameServer.py --station stub=game1.mp4 --station stub=game2.mp4 --station stub=debug/
+"""
+import argparse
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cv2
+
+from boardLocator import BoardLocator
+from detectGrid import DEFAULT_BACKEND, DEFAULT_CONF, DEFAULT_DEVICE, DEFAULT_WEIGHTS
+from detectorBackend import detect, load_detector, warm_up
+from frameSource import open_source
+from orchestrator import Orchestrator
+import stageTrace
+from stageTrace import span
+from ticTacToe import best_move_for, lookup_move
+
+BATCH_WAIT_SEC = 0.005     # how long a detection waits for other stations' frames
+MAX_BATCH = 8              # images per model call
+REPORT_SEC = 10.0
+THREADS_PER_STATION = 4    # capture, detect, search and a spare, in the default executor
+
+
+class BatchDetector:
+    """Detector backend that merges concurrent detect() calls from many threads into batched model calls."""
+
+    name = "batch"
+
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait=BATCH_WAIT_SEC):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        self._running = True
+        self._t = threading.Thread(target=self._loop, name="batch-detect", daemon=True)
+        self._t.start()
+        # counters for report()
+        self.calls = 0
+        self.images = 0
+        self.largest = 0
+
+    def detect(self, images, conf):
+        """Blocks until the batch holding these images has run."""
+        done = Future()
+        self._requests.put((list(images), conf, done))
+        return done.result()
+
+    def _collect(self, first):
+        """`first` plus whatever other requests arrive within max_wait, up to max_batch images."""
+        batch = [first]
+        n = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while n < self.max_batch:
+            try:
+                request = self._requests.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if request is None:
+                self._running = False
+                break
+            batch.append(request)
+            n += len(request[0])
+        return batch
+
+    def _loop(self):
+        while self._running:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+            # one model call per confidence threshold (all stations normally share one)
+            for conf in {conf for _, conf, _ in batch}:
+                requests = [r for r in batch if r[1] == conf]
+                images = [image for r in requests for image in r[0]]
+                try:
+                    with span("detect.batch"):
+                        boxes = detect(self.model, images, conf)
+                except Exception as exc:
+                    for _, _, done in requests:
+                        done.set_exception(exc)
+                    continue
+                self.calls += 1
+                self.images += len(images)
+                self.largest = max(self.largest, len(images))
+                k = 0
+                for r_images, _, done in requests:
+                    done.set_result(boxes[k:k + len(r_images)])
+                    k += len(r_images)
+
+    def stop(self):
+        self._requests.put(None)
+        self._t.join(timeout=1.0)
+
+    def report(self):
+        return (f"[batch] {self.images} images in {self.calls} model calls "
+                f"({self.images / max(self.calls, 1):.2f} per call, largest {self.largest})")
+
+
+class SharedSolver:
+    """solve(board, robot_token) for Orchestrator: ticTacToe.best_move_for, counting move-table hits."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0       # answered by the shared move table
+        self.misses = 0     # not in the table (a misread position): solved by search
+
+    def __call__(self, board, robot_token):
+        known = lookup_move(board if robot_token == 'x' else board.swapped()) is not None
+        with self._lock:
+            if known:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return best_move_for(board, robot_token)
+
+    def report(self):
+        return f"[solver] {self.hits} moves from the shared move table, {self.misses} solved by search"
+
+
+def parse_station(text):
+    arm, sep, source = text.partition("=")
+    if not sep or not arm or not source:
+        raise argparse.ArgumentTypeError(f"expected ARM=SOURCE, got {text!r}")
+    return arm, source
+
+
+def make_arm(arm):
+    if arm == "stub":
+        from dobotGrid_stubbings import DobotGrid
+    else:
+        from dobotGrid import DobotGrid
+    dobot = DobotGrid(port=arm)
+    dobot.generate_points()
+    dobot.generate_grid()
+    dobot.draw_grid(wait=False)
+    return dobot
+
+
+def _quiet(*args, **kwargs):
+    pass
+
+
+class GameServer:
+    def __init__(self, stations, model, first=None, games=1, conf_thr=DEFAULT_CONF, quiet=True):
+        """stations: [(arm, source)]; first: "robot", "human" or None to alternate by station."""
+        self.batcher = BatchDetector(model)
+        self.solver = SharedSolver()
+        self.games = games
+        self.stations = []
+        self._setup = {}       # station -> (arm, recorded)
+        for k, (arm, source) in enumerate(stations):
+            cap = open_source(source, loop=True)
+            if not cap.isOpened():
+                raise RuntimeError(f"station {k}: cannot open {source}")
+            recorded = not (isinstance(source, int) or source.isdigit())
+            name = f"{k}:{arm}={source}"
+            log = _quiet if quiet else (lambda *args, prefix=f"[{name}]": print(prefix, *args))
+            station = Orchestrator(
+                make_arm(arm), self.batcher, cap, first=first or ("robot", "human")[k % 2], headless=True,
+                locator=BoardLocator(), realtime=recorded, conf_thr=conf_thr, solve=self.solver,
+                name=name, log=log)
+            self.stations.append(station)
+            self._setup[station] = (arm, recorded)
+        self.started_at = time.perf_counter()
+
+    async def _play(self, station):
+        arm, recorded = self._setup[station]
+        for game in range(self.games):
+            if game:
+                # a fresh board for the next game: the recording from its start, a new grid on paper
+                if recorded:
+                    station.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                if arm != "stub":
+                    await asyncio.to_thread(station.dobot.draw_grid)
+            await station.run()
+            if station.quit.is_set():
+                break
+
+    def status(self):
+        """Per-station status plus the shared batching and cache figures."""
+        elapsed = max(time.perf_counter() - self.started_at, 1e-6)
+        b, s = self.batcher, self.solver
+        return {
+            "uptime_sec": elapsed,
+            "stations": [station.status() for station in self.stations],
+            "batch": {"calls": b.calls, "images": b.images, "per_call": b.images / max(b.calls, 1),
+                      "largest": b.largest},
+            "solver": {"table_hits": s.hits, "searched": s.misses},
+            "moves_per_sec": sum(st.counts["human_moves"] + st.counts["robot_moves"]
+                                 for st in self.stations) / elapsed,
+        }
+
+    def report(self):
+        status = self.status()
+        lines = [f"{'station':<28} {'turn':>6} {'board':>13} {'fps':>6} {'reads':>6} "
+                 f"{'det p50':>8} {'moves':>6} {'games':>6}  results"]
+        for st in status["stations"]:
+            board = "/".join(st["board"]) if st["board"] else "-"
+            results = Counter({r: n for r, n in st["results"].items() if n})
+            lines.append(f"{st['name'][:28]:<28} {st['turn'] or '-':>6} {board:>13} {st['fps']:6.1f} "
+                         f"{st['reads']:6d} {st['detect_p50_ms']:6.1f}ms {st['moves']:6d} {st['games']:6d}  "
+                         f"{dict(results) or '-'}")
+        lines.append(f"{status['moves_per_sec']:.2f} moves/s over {len(self.stations)} stations; "
+                     f"{self.batcher.report()}; {self.solver.report()}")
+        return "\n".join(lines)
+
+    async def _monitor(self, every):
+        while True:
+            await asyncio.sleep(every)
+            print(self.report(), flush=True)
+
+    async def run(self, report_every=REPORT_SEC):
+        loop = asyncio.get_running_loop()
+        # every station keeps a few blocking calls in flight in the default executor
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=THREADS_PER_STATION * len(self.stations) + 4))
+        monitor = asyncio.create_task(self._monitor(report_every), name="monitor")
+        try:
+            await asyncio.gather(*(self._play(station) for station in self.stations))
+        finally:
+            monitor.cancel()
+            await asyncio.gather(monitor, return_exceptions=True)
+
+    def close(self):
+        self.batcher.stop()
+        for station in self.stations:
+            station.cap.release()
+            try:
+                station.dobot.disconnect()
+            except Exception:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--station", action="append", type=parse_station, required=True, metavar="ARM=SOURCE",
+                        help='e.g. stub=game.mp4, sim=debug/ or /dev/ttyACM0=1; repeat for every station')
+    parser.add_argument("--first", choices=("robot", "human"), help="who goes first everywhere (default: alternate)")
+    parser.add_argument("--games", type=int, default=1, help="games per station")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="detector backend (see detectorBackend)")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS)
+    parser.add_argument("--report", type=float, default=REPORT_SEC, help="seconds between status reports")
+    parser.add_argument("--metrics", help="write the final status as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="print every station's game output, prefixed by station")
+    parser.add_argument("--trace", help="write per-stage spans to this Chrome/Perfetto trace file")
+    args = parser.parse_args()
+    if args.trace:
+        stageTrace.enable()
+
+    model = load_detector(args.weights, args.backend, device=DEFAULT_DEVICE)
+    server = GameServer(args.station, model, first=args.first, games=args.games, quiet=not args.verbose)
+    ok, frame = server.stations[0].cap.read()
+    if ok:
+        warm_up(model, frame.shape, DEFAULT_CONF)
+        server.stations[0].cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    print(f"[server] {len(server.stations)} stations, detector {args.weights} ({args.backend})")
+    try:
+        asyncio.run(server.run(args.report))
+    except KeyboardInterrupt:
+        print("Interrupted.")
+    finally:
+        print(server.report())
+        if args.metrics:
+            with open(args.metrics, "w") as f:
+                json.dump(server.status(), f, indent=2)
+            print(f"[server] metrics written to {args.metrics}")
+        server.close()
+        if args.trace:
+            print(stageTrace.current().summary())
+            print(f"[trace] {stageTrace.current().export_chrome(args.trace)} spans written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Turn logic of one game as a pure state machine.
+
+GameState is an immutable snapshot; every function takes a state and an
+observation (a detected board, the robot's chosen cell) and returns the
+next state plus what happened. Nothing here touches the camera, the arm or
+the console, so the same rules drive main.py's loop and the asyncio
+orchestrator, and can be replayed without hardware.
+"""
+from collections import namedtuple
+
+from bitBoard import Board, as_board
+from ticTacToe import evaluate, is_moves_left
+
+# result: None while playing, then "robot", "human", "draw" or "cheat"
+GameState = namedtuple("GameState", "board robot_token human_token robot_move result",
+                       defaults=(None,))
+
+# what on_detection saw
+NO_CHANGE = "no change"
+HUMAN_MOVED = "human moved"
+CHEAT_MANY = "more than one cell changed"
+CHEAT_WRONG = "the changed cell is not a new human token"
+
+
+def new_game(first):
+    """first is "robot" (robot plays 'x' and starts) or "human"."""
+    if first == "robot":
+        return GameState(Board.EMPTY, 'x', 'o', True)
+    if first == "human":
+        return GameState(Board.EMPTY, 'o', 'x', False)
+    raise ValueError(f"first must be 'robot' or 'human', not {first!r}")
+
+
+def count_diffs(A, B):
+    return as_board(A).diff(as_board(B))
+
+
+def winner_from_evaluate(val, robot_token):
+    if val == 10:
+        return "robot" if robot_token == 'x' else "human"
+    if val == -10:
+        return "robot" if robot_token == 'o' else "human"
+    return None
+
+
+def check_end(state):
+    """State with `result` set if the board is won or full."""
+    if state.result is not None:
+        return state
+    w = winner_from_evaluate(evaluate(state.board), state.robot_token)
+    if w is not None:
+        return state._replace(result=w)
+    if not is_moves_left(state.board):
+        return state._replace(result="draw")
+    return state
+
+
+def on_detection(state, detected):
+    """(next state, event) for a board read during the human's turn."""
+    detected = as_board(detected)
+    diffs = count_diffs(state.board, detected)
+    if len(diffs) == 0:
+        return state, NO_CHANGE
+    if len(diffs) > 1:
+        return state._replace(result="cheat"), CHEAT_MANY
+    ri, rj = diffs[0]
+    if state.board.cell(ri, rj) != '_' or detected.cell(ri, rj) != state.human_token:
+        return state._replace(result="cheat"), CHEAT_WRONG
+    return state._replace(board=detected, robot_move=True), HUMAN_MOVED
+
+
+def on_robot_move(state, i, j):
+    """State after the robot plays (i, j); (-1, -1) means it had no move (a draw)."""
+    if i == -1 or j == -1 or not is_moves_left(state.board):
+        return state._replace(result="draw")
+    return state._replace(board=state.board.place(i, j, state.robot_token), robot_move=False)
+
+
+def result_text(state):
+    return {"robot": "Robot wins!", "human": "Human wins!", "draw": "It's a draw!",
+            "cheat": "YOU ARE A CHEATER, I DON'T WANT TO PLAY."}.get(state.result, "")
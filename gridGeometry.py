@@ -0,0 +1,45 @@
+"""Grid geometry as NumPy arrays, computed in one vectorized step.
+
+Everything DobotGrid draws with is derived from the calibration (x, y, z, r,
+d, offset, n, lift). Computing it takes tens of microseconds, so it is kept
+in memory per calibration rather than on disk.
+"""
+import functools
+
+import numpy as np
+
+# corner k of a cell is lattice point (row + di, col + dj), pulled into the cell by offset
+CORNER_STEPS = ((0, 0), (0, 1), (1, 0), (1, 1))
+CORNER_INSET = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]], dtype=float)
+
+
+def compute_geometry(x, y, z, r, d, offset, n, lift):
+    """Arrays of (x, y, z, r) poses:
+
+    lattice  (n+1, n+1, 4)  grid line crossings, lattice[i, j] = (x + i*d, y + j*d)
+    corners  (n, n, 4, 4)   the four inset drawing corners of every cell
+    lifted   (n, n, 4, 4)   the same corners with the pen up
+    centers  (n, n, 4)      cell centers
+    """
+    steps = np.arange(n + 1, dtype=float) * d
+    lattice = np.empty((n + 1, n + 1, 4))
+    lattice[..., 0] = x + steps[:, None]
+    lattice[..., 1] = y + steps[None, :]
+    lattice[..., 2] = z
+    lattice[..., 3] = r
+
+    corners = np.stack([lattice[di:di + n, dj:dj + n] for di, dj in CORNER_STEPS], axis=2)
+    corners[..., :2] += offset * CORNER_INSET
+    lifted = corners.copy()
+    lifted[..., 2] += lift
+    centers = corners.mean(axis=2)
+    return {"lattice": lattice, "corners": corners, "lifted": lifted, "centers": centers}
+
+
+@functools.lru_cache(maxsize=None)
+def load_geometry(x, y, z, r, d, offset, n, lift):
+    """Geometry for this calibration, computed on first use and shared (read-only) after that."""
+    geometry = compute_geometry(x, y, z, r, d, offset, n, lift)
+    for array in geometry.values():
+        array.flags.writeable = False
+    return geometry
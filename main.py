@@ -1,245 +1,281 @@
 import time
-import copy
 import cv2
-from ultralytics import YOLO
-import threading
 
 from dobotGrid import DobotGrid
-from detectGrid import process_frame, DEFAULT_CONF
-from detectGrid import DEFAULT_WEIGHTS
-from ticTacToe import evaluate, is_moves_left, evaluate_next_move
+from detectGrid import detect_board, CellInference, DEFAULT_CONF
+from detectGrid import DEFAULT_WEIGHTS, DEFAULT_DEVICE
+from detectorBackend import load_detector, warm_up
+from ticTacToe import best_move_for, show_board
+from gameState import new_game, check_end, on_detection, on_robot_move, result_text, NO_CHANGE, HUMAN_MOVED
+from bitBoard import as_board
+from movePrecompute import MovePrecomputer
+from changeGate import StabilityGate
+from boardLocator import BoardLocator
+from startup import StartupTimer
+from frameGrabber import FrameGrabber
+from frameSource import open_source
+from boardVote import BoardVoter
+from frameRenderer import Renderer
+from debugRecorder import DebugRecorder
+import stageTrace
+from stageTrace import span
 
-DETECT_INTERVAL_SEC = 15.0
+DETECT_INTERVAL_SEC = 15.0     # fallback poll if the change gate never fires
+GATE_MOTION_THRESHOLD = 0.005  # see changeGate for the meaning of these
+GATE_STABLE_FRAMES = 6
+GATE_CHANGE_THRESHOLD = 0.001
+CELL_INFERENCE = False         # only re-detect cells that changed (no boxes to draw)
+TEMPORAL_VOTE = True           # read the board from a burst of frames that vote per cell (no boxes to draw)
+HEADLESS = False               # no window and no drawing at all
+DETECTOR_BACKEND = "auto"      # "yolo", "onnx" or "openvino"; see detectorBackend.load_detector
+LOCATE_BOARD = True            # map detections through the drawn grid's homography, not the frame's thirds
 CAM_INDEX_CANDIDATES = [1, 2, 3, 0]
+FRAME_SOURCE = None            # None: first camera that opens; or a video file, image folder or .raw archive
+FIRST_FRAME_TIMEOUT_SEC = 5.0
+FRAME_TIMEOUT_SEC = 5.0        # no new frame for this long: the camera or recording has stopped
+WARMUP_FRAME_SHAPE = (480, 640, 3)  # dummy frame for the detector's first (slow) inference
 PORT = "/dev/ttyACM0"
+TRACE_FILE = None              # e.g. "trace.json": record per-stage spans for chrome://tracing / Perfetto
+DEBUG_RECORD = None            # "jpg", "png" or "raw": keep every detected frame in debug/ (see debugRecorder)
 
-def open_camera():
-    cap = None
+def find_camera():
+    """FRAME_SOURCE, or the first camera that opens; safe to call off the main thread (no window)."""
+    if FRAME_SOURCE is not None:
+        print(f"[cam] Replaying {FRAME_SOURCE}")
+        return open_source(FRAME_SOURCE, realtime=True)
     for idx in CAM_INDEX_CANDIDATES:
         c = cv2.VideoCapture(idx)
         if c.isOpened():
-            cap = c
             print(f"[cam] Using camera index {idx}")
-            break
+            return c
         c.release()
-    if cap is None:
-        raise RuntimeError("No camera available (tried indices: %s)" % CAM_INDEX_CANDIDATES)
-    cv2.namedWindow("Feed", cv2.WINDOW_NORMAL)
-    cv2.resizeWindow("Feed", 960, 720)
-    return cap
-
-def show_board(board):
-    rows = []
-    for r in range(3):
-        rows.append(" " + " | ".join(board[r]).replace('_', ' ') + " ")
-        if r < 2: rows.append("---+---+---")
-    print("\n".join(rows))
+    raise RuntimeError("No camera available (tried indices: %s)" % CAM_INDEX_CANDIDATES)
+
+def load_model():
+    model = load_detector(DEFAULT_WEIGHTS, DETECTOR_BACKEND, device=DEFAULT_DEVICE)
+    warm_up(model, WARMUP_FRAME_SHAPE, conf=DEFAULT_CONF)
+    return model
 
 def detected_to_internal(det_board):
-    return [[('x' if c == 'X' else ('o' if c == 'O' else '_')) for c in row] for row in det_board]
-
-def count_diffs(A, B):
-    diffs = []
-    for i in range(3):
-        for j in range(3):
-            if A[i][j] != B[i][j]:
-                diffs.append((i, j))
-    return diffs
-
-def winner_from_evaluate(val, robot_token):
-    if val == 10:
-        return "robot" if robot_token == 'x' else "human"
-    if val == -10:
-        return "robot" if robot_token == 'o' else "human"
-    return None
-
-def best_move_for_robot(board, robot_token):
-    if robot_token == 'x':
-        return evaluate_next_move(copy.deepcopy(board))
-    swap = {'x':'o', 'o':'x', '_':'_'}
-    swapped = [[swap[c] for c in row] for row in board]
-    i, j = evaluate_next_move(swapped)
-    return (i, j)
+    return as_board(det_board)
 
 def draw_symbol(dobot, token, i, j):
+    # queued without waiting: the next move_to_intermediate waits behind it
     if token == 'x':
-        dobot.draw_x(i+1, j+1, delay=0)
+        dobot.draw_x(i+1, j+1, delay=0, wait=False)
     else:
-        dobot.draw_o(i+1, j+1)
-
-class FrameGrabber:
-    """Continuously grabs frames; read() returns the latest frame instantly."""
-    def __init__(self, cap):
-        self.cap = cap
-        self._lock = threading.Lock()
-        self._latest = None
-        self._running = False
-        self._t = None
-
-    def start(self):
-        if self._running: return
-        self._running = True
-        self._t = threading.Thread(target=self._loop, daemon=True)
-        self._t.start()
-
-    def _loop(self):
-        # grab -> retrieve keeps buffer small and reduces latency
-        while self._running:
-            if not self.cap.grab():
-                time.sleep(0.01)
-                continue
-            ok, frame = self.cap.retrieve()
-            if not ok: 
-                time.sleep(0.005)
-                continue
-            with self._lock:
-                self._latest = frame
-
-    def read(self):
-        """Returns a copy of the most recent frame (or None if not ready)."""
-        with self._lock:
-            if self._latest is None:
-                return None
-            return self._latest.copy()
-
-    def stop(self):
-        self._running = False
-        if self._t:
-            self._t.join(timeout=1.0)
-            self._t = None    
+        dobot.draw_o(i+1, j+1, wait=False)
 
 def main():
-    # 1) Initialize Dobot + grid
-    dobot = DobotGrid(port=PORT)
-    dobot.generate_points()
-    dobot.generate_grid()
-    dobot.draw_grid()
-
-    # 2) YOLO + camera
-    model = YOLO(DEFAULT_WEIGHTS)
-    cap = open_camera()
-    grabber = FrameGrabber(cap)
-    grabber.start()
-    last_poll = 0.0
-    annotated_frame = None
-
-    # 3) Game state
-    current = [['_','_','_'], ['_','_','_'], ['_','_','_']]
-    previous = copy.deepcopy(current)
-    robot_move = False
-    game_over = False
-
-    # 4) Who goes first?
-    #    If Dobot first: robot='x', human='o' and robot_move=True
-    #    If Human first: human='x', robot='o' and robot_move=False
-    while True:
-        choice = input("Who goes first? Type 'robot' or 'human': ").strip().lower()
-        if choice in ("robot", "human"):
-            break
-        print("Please type exactly 'robot' or 'human'.")
-    if choice == "robot":
-        robot_token, human_token = 'x', 'o'
-        robot_move = True
-        print("Dobot is 'X', Human is 'O'.")
-    else:
-        human_token, robot_token = 'x', 'o'
-        robot_move = False
-        print("Human is 'X', Dobot is 'O'.")
-
-    print("\n--- Game start ---")
-    show_board(current)
+    # 1) Load + warm up the detector and find the camera in the background
+    if TRACE_FILE:
+        stageTrace.enable()
+    startup = StartupTimer()
+    startup.background("model load + warm-up", load_model)
+    startup.background("camera", find_camera)
 
+    # 2) Initialize Dobot + grid; the grid is queued, later moves wait behind it
+    with startup.phase("dobot connect"):
+        dobot = DobotGrid(port=PORT)
+    # everything from here on is released in the finally below, even if startup fails
+    renderer = recorder = precompute = voter = cap = grabber = None
     try:
-        while not game_over:
+        with startup.phase("grid geometry"):
+            dobot.generate_points()
+            dobot.generate_grid()
+        with startup.phase("queue grid drawing"):
+            dobot.draw_grid(wait=False)
+
+        # the window lives on the renderer's thread; detection never draws
+        renderer = None if HEADLESS else Renderer("Feed").start()
+        recorder = DebugRecorder(fmt=DEBUG_RECORD).start() if DEBUG_RECORD else None
+        locator = BoardLocator() if LOCATE_BOARD else None
+        last_poll = 0.0
+        last_detection = None   # detectGrid.Detection to draw, when there is one
+        last_board = None       # board to overlay when the read had no boxes (votes, cell crops)
+        gate = StabilityGate(GATE_MOTION_THRESHOLD, GATE_STABLE_FRAMES, GATE_CHANGE_THRESHOLD)
+        arm_parked = False
+        seen = 0                # newest frame the human-turn loop has looked at
+        read_again = False
+
+        # 4) Who goes first? (asked while the arm draws and the model loads)
+        #    If Dobot first: robot='x', human='o' and robot_move=True
+        #    If Human first: human='x', robot='o' and robot_move=False
+        startup.mark("first question")
+        while True:
+            choice = input("Who goes first? Type 'robot' or 'human': ").strip().lower()
+            if choice in ("robot", "human"):
+                break
+            print("Please type exactly 'robot' or 'human'.")
+
+        # 3) Game state (see gameState for the turn rules)
+        state = new_game(choice)
+        if state.robot_move:
+            print("Dobot is 'X', Human is 'O'.")
+        else:
+            print("Human is 'X', Dobot is 'O'.")
+
+        # Solve the robot's reply to every possible human move while the human thinks
+        robot_token = state.robot_token
+        precompute = MovePrecomputer(lambda board: best_move_for(board, robot_token))
+        if not state.robot_move:
+            precompute.speculate(state.board, state.human_token)
+
+        model = startup.result("model load + warm-up")
+        cell_inference = CellInference(model, conf_thr=DEFAULT_CONF, locator=locator) if CELL_INFERENCE else None
+        voter = BoardVoter(model, conf_thr=DEFAULT_CONF, locator=locator) if TEMPORAL_VOTE else None
+        cap = startup.result("camera")
+        grabber = FrameGrabber(cap)
+        grabber.start()
+        with startup.phase("first frame"):
+            _, first = grabber.wait_newer(0, timeout=FIRST_FRAME_TIMEOUT_SEC)
+        if first is None:
+            raise RuntimeError(f"No frame from the camera within {FIRST_FRAME_TIMEOUT_SEC:.0f} s")
+        startup.mark("ready to play")
+        print(startup.report())
+
+        print("\n--- Game start ---")
+        show_board(state.board)
+
+        def refresh(frame):
+            """Hand the frame to the renderer; True if 'q' was pressed."""
+            if renderer is None:
+                return False
+            renderer.submit(frame, last_detection, last_board)
+            return renderer.quit_requested()
+
+        while state.result is None:
             frame = grabber.read()
-            cv2.imshow("frame", frame)
 
             # Check terminal game status first (win/draw)
-            val = evaluate(current)
-            w = winner_from_evaluate(val, robot_token)
-            if w is not None:
-                print("\nFinal board:"); show_board(current)
-                print("Result:", "Robot wins!" if w == "robot" else "Human wins!")
-                game_over = True
-            elif not is_moves_left(current):
-                print("\nFinal board:"); show_board(current)
-                print("Result: It's a draw!")
-                game_over = True
-
-            if game_over:
-                cv2.imshow("Feed", annotated_frame if annotated_frame is not None else frame)
-                cv2.waitKey(1)
+            state = check_end(state)
+            if state.result is not None:
+                print("\nFinal board:"); show_board(state.board)
+                print("Result:", result_text(state))
+                refresh(frame)
                 break
 
             # ------------ Human turn ------------
-            if not robot_move:
-                now = time.time()
-                if now - last_poll >= DETECT_INTERVAL_SEC:
-                    last_poll = now
-                    dobot.move_to_intermediate()
-                    frame = grabber.read()
-                    det_board, annotated = process_frame(frame, model, conf_thr=DEFAULT_CONF)
-                    annotated_frame = annotated
+            if not state.robot_move:
+                if not arm_parked:
+                    # get the arm out of the camera's view, then watch for the human's move
+                    with span("arm.move_to_intermediate"):
+                        dobot.move_to_intermediate()
+                    # a frame taken after the arm stopped, not one with the arm still over the board
+                    seq, frame = grabber.wait_newer(grabber.read_seq()[0], timeout=FRAME_TIMEOUT_SEC)
+                    if frame is None:
+                        raise RuntimeError(f"No new frame within {FRAME_TIMEOUT_SEC:.0f} s: the camera or recording stopped")
+                    gate.reset(frame)
+                    arm_parked = True
+                    seen = seq
+                    last_poll = time.time()
+                else:
+                    # nothing to look at until the camera has a newer frame
+                    seen, frame = grabber.wait_newer(seen, timeout=FRAME_TIMEOUT_SEC)
+                    if frame is None:
+                        raise RuntimeError(f"No new frame within {FRAME_TIMEOUT_SEC:.0f} s: the camera or recording stopped")
+                det_board = None
+                # hold the frame so the camera thread cannot overwrite it during detection
+                with grabber.hold() as (seq, frame):
+                    now = time.time()
+                    triggered = False
+                    if frame is not None:
+                        seen = max(seen, seq)
+                        with span("detect.gate"):
+                            triggered = gate.update(frame, seq)
+                    if frame is not None and (triggered or read_again or now - last_poll >= DETECT_INTERVAL_SEC):
+                        last_poll = now
+                        read_again = False
+                        t0 = time.perf_counter()
+                        # what this read saw, for the recorder: None when it gave no accepted board
+                        read_frame, read_detection = frame, None
+                        if cell_inference is not None:
+                            det_board = last_board = cell_inference(frame)
+                        elif voter is not None:
+                            burst = voter.burst(grabber, after=seq - 1)
+                            vote = voter.vote(burst) if burst else None
+                            if burst:
+                                read_frame = burst[-1]
+                            if vote is not None and vote.stable:
+                                det_board = last_board = vote.board
+                            elif vote is not None:
+                                print(f"[vote] {vote}, reading again")
+                                read_again = True
+                        else:
+                            last_detection = read_detection = detect_board(frame, model, conf_thr=DEFAULT_CONF,
+                                                                           locator=locator)
+                            det_board = last_detection.board
+                        if recorder is not None:
+                            recorder.record(read_frame, read_detection, det_board,
+                                            timings={"detect": time.perf_counter() - t0})
+                        if triggered:
+                            print(gate.last_trigger_summary() + f", detection {time.perf_counter() - t0:.2f} s")
+                if det_board is not None:
                     detected = detected_to_internal(det_board)
-
-                    diffs = count_diffs(previous, detected)
-                    if len(diffs) == 0:
+                    before = state.board
+                    state, event = on_detection(state, detected)
+                    if event == NO_CHANGE:
                         print("[human] Please make your move...")
-                    elif len(diffs) > 1:
-                        print(previous)
-                        print(detected)
-                        print('YOU ARE A CHEATER, I DON\'T WANT TO PLAY. (1)')
-                        game_over = True
+                    elif event == HUMAN_MOVED:
+                        print("\nBoard after human move:")
+                        show_board(state.board)
                     else:
-                        (ri, rj) = diffs[0]
-                        if previous[ri][rj] != '_' or detected[ri][rj] != human_token:
-                            print(previous)
-                            print(detected)
-                            print('YOU ARE A CHEATER, I DON\'T WANT TO PLAY. (2)')
-                            game_over = True
-                        else:
-                            previous = copy.deepcopy(current)
-                            current = detected
-                            robot_move = True
-                            print("\nBoard after human move:")
-                            show_board(current)
-
-                cv2.imshow("Feed", annotated_frame if annotated_frame is not None else frame)
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                        print(before)
+                        print(detected)
+                        print(f"{result_text(state)} ({event})")
+
+                if refresh(frame):
                     print("Quit requested."); break
                 continue
 
             # ------------ Robot turn ------------
-            if robot_move:
-                i, j = best_move_for_robot(copy.deepcopy(current), robot_token)
-                if i == -1 or j == -1 or not is_moves_left(current):
-                    print("\nFinal board:"); show_board(current)
-                    print("Result: No valid moves. It's a draw!")
-                    game_over = True
-                else:
-                    print(f"[robot] Playing at row {i+1}, col {j+1} as '{robot_token.upper()}'")
-                    draw_symbol(dobot, robot_token, i, j)
-                    current[i][j] = robot_token
-                    robot_move = False
-                    print("\nBoard after robot move:")
-                    show_board(current)
-
-            previous = copy.deepcopy(current)
-            cv2.imshow("Feed", annotated_frame if annotated_frame is not None else frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            with span("search.move"):
+                i, j = precompute.get(state.board)
+            state = on_robot_move(state, i, j)
+            if state.result is not None:
+                print("\nFinal board:"); show_board(state.board)
+                print("Result: No valid moves. It's a draw!")
+            else:
+                print(f"[robot] Playing at row {i+1}, col {j+1} as '{state.robot_token.upper()}'")
+                with span("arm.draw_symbol"):
+                    draw_symbol(dobot, state.robot_token, i, j)
+                arm_parked = False
+                precompute.speculate(state.board, state.human_token)
+                print("\nBoard after robot move:")
+                show_board(state.board)
+
+            if refresh(frame):
                 print("Quit requested."); break
 
     finally:
         # graceful shutdown
-        grabber.stop()  
-        cap.release()
-        cv2.destroyAllWindows()
+        if precompute is not None:
+            precompute.shutdown()
+            print(precompute.report())
+        if grabber is not None:
+            print(grabber.report())
+        if voter is not None:
+            print(voter.report())
+        if stageTrace.current() is not None:
+            print(stageTrace.current().summary())
+            n = stageTrace.current().export_chrome(TRACE_FILE)
+            print(f"[trace] {n} spans written to {TRACE_FILE}")
+        if renderer is not None:
+            renderer.stop()
+            print(renderer.report())
+        if recorder is not None:
+            recorder.stop()
+            print(recorder.report())
+        if grabber is not None:
+            grabber.stop()
+        if cap is not None:
+            cap.release()
         try:
             dobot.disconnect()
         except Exception:
             pass
         print("\n[shutdown] Camera closed and Dobot disconnected.")
-        
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,117 @@
+"""Motion plans: a whole symbol or the grid compiled into one list of waypoints.
+
+A plan is sent to the controller's command queue in one burst (no Python-side
+sleeps between moves), so the arm never waits on the host between strokes.
+"""
+import math
+from collections import namedtuple
+
+from dobotSim import (HOME_DURATION_SEC, HOME_POSE, MODE_PTP, arc_length, segment_duration,
+                      travel_duration)
+
+HOME = "home"
+ARC = "arc"
+COLLINEAR_TOL_MM = 0.05
+
+# via is the intermediate point of an ARC waypoint
+Waypoint = namedtuple("Waypoint", "x y z r mode via", defaults=(None,))
+
+
+def home_waypoint():
+    return Waypoint(math.nan, math.nan, math.nan, math.nan, HOME)
+
+
+class MotionPlan:
+    def __init__(self, name, waypoints=()):
+        self.name = name
+        self.waypoints = list(waypoints)
+
+    def __len__(self):
+        return len(self.waypoints)
+
+    def __repr__(self):
+        return f"MotionPlan({self.name!r}, {len(self.waypoints)} waypoints)"
+
+    def add(self, pose, mode=MODE_PTP.MOVL_XYZ):
+        x, y, z, r = pose[:4]
+        self.waypoints.append(Waypoint(x, y, z, r, int(mode)))
+        return self
+
+    def add_arc(self, via, pose):
+        """Circular arc from the previous waypoint through via to pose."""
+        x, y, z, r = pose[:4]
+        self.waypoints.append(Waypoint(x, y, z, r, ARC, tuple(via[:4])))
+        return self
+
+    def home(self):
+        self.waypoints.append(home_waypoint())
+        return self
+
+    def merge_collinear(self, tol=COLLINEAR_TOL_MM):
+        """Drop waypoints that lie on the straight segment between their neighbours."""
+        merged = []
+        for wp in self.waypoints:
+            if len(merged) >= 2 and _mergeable(merged[-2], merged[-1], wp, tol):
+                merged[-1] = wp
+            else:
+                merged.append(wp)
+        self.waypoints = merged
+        return self
+
+    def expected_duration(self, start_pose, velocity=None, accel=None):
+        """Seconds the arm needs for the plan from start_pose, from the dobotSim motion model."""
+        kwargs = {}
+        if velocity is not None:
+            kwargs["velocity"] = velocity
+        if accel is not None:
+            kwargs["accel"] = accel
+        total = 0.0
+        pose = tuple(start_pose[:4])
+        for wp in self.waypoints:
+            if wp.mode == HOME:
+                total += HOME_DURATION_SEC
+                pose = HOME_POSE
+                continue
+            if wp.mode == ARC:
+                total += travel_duration(arc_length(pose, wp.via, wp[:4]), **kwargs)
+            else:
+                total += segment_duration(pose, wp[:4], wp.mode, **kwargs)
+            pose = wp[:4]
+        return total
+
+    def path_length(self, start_pose):
+        """Total tool travel in mm (homing runs are not counted)."""
+        total = 0.0
+        pose = tuple(start_pose[:3])
+        for wp in self.waypoints:
+            if wp.mode == HOME:
+                pose = HOME_POSE[:3]
+                continue
+            if wp.mode == ARC:
+                total += arc_length(pose, wp.via, wp[:3])
+            else:
+                total += math.dist(pose, wp[:3])
+            pose = wp[:3]
+        return total
+
+    def last_pose(self):
+        """Final (x, y, z, r) of the plan, or None if it ends with homing."""
+        if not self.waypoints or self.waypoints[-1].mode == HOME:
+            return None
+        return tuple(self.waypoints[-1][:4])
+
+
+def _mergeable(a, b, c, tol):
+    if {a.mode, b.mode, c.mode} & {HOME, ARC} or not a.mode == b.mode == c.mode or a.r != b.r or b.r != c.r:
+        return False
+    ab = [b[i] - a[i] for i in range(3)]
+    bc = [c[i] - b[i] for i in range(3)]
+    if sum(p * q for p, q in zip(ab, bc)) <= 0:
+        return False  # turning back is not a straight line
+    ac = [c[i] - a[i] for i in range(3)]
+    length = math.sqrt(sum(v * v for v in ac))
+    if length == 0:
+        return False
+    # distance of b from the line a -> c
+    cross = (ab[1] * ac[2] - ab[2] * ac[1], ab[2] * ac[0] - ab[0] * ac[2], ab[0] * ac[1] - ab[1] * ac[0])
+    return math.sqrt(sum(v * v for v in cross)) / length <= tol
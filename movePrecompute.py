@@ -0,0 +1,81 @@
+"""Speculative robot-move precomputation while the human is thinking.
+
+As soon as the robot has played, every possible human reply is known. A
+background pool solves the robot's answer to each of them and keeps the
+results in a cache keyed by board, so the robot turn becomes a lookup.
+"""
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class MovePrecomputer:
+    def __init__(self, solve, workers=2):
+        """solve(board) -> (row, col) is the robot's move on a bitBoard.Board."""
+        self.solve = solve
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="precompute")
+        self._lock = threading.Lock()
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.saved_sec = 0.0
+        self.waited_sec = 0.0
+
+    def _timed_solve(self, board):
+        start = time.perf_counter()
+        move = self.solve(board)
+        return move, time.perf_counter() - start
+
+    def speculate(self, board, human_token):
+        """Start solving the robot's reply to every human move from `board`."""
+        with self._lock:
+            self._cancel_locked()
+            if board.winner() is not None:
+                return
+            for i, j in board.empty_cells():
+                child = board.place(i, j, human_token)
+                if child.winner() is None and child.has_moves():
+                    self._cache[child] = self._pool.submit(self._timed_solve, child)
+
+    def get(self, board):
+        """The robot's move on `board`, from the cache when it was speculated."""
+        with self._lock:
+            future = self._cache.pop(board, None)
+            self._cancel_locked()
+
+        if future is not None:
+            start = time.perf_counter()
+            try:
+                move, solve_sec = future.result()
+            except CancelledError:
+                pass
+            else:
+                waited = time.perf_counter() - start
+                self.hits += 1
+                self.waited_sec += waited
+                self.saved_sec += max(0.0, solve_sec - waited)
+                return move
+
+        self.misses += 1
+        return self.solve(board)
+
+    def _cancel_locked(self):
+        for future in self._cache.values():
+            future.cancel()
+        self._cache.clear()
+
+    def cancel(self):
+        """Drop every pending speculation (e.g. when the game ends)."""
+        with self._lock:
+            self._cancel_locked()
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return (f"[precompute] hit rate {self.hits}/{total} ({rate:.0f}%), "
+                f"saved {self.saved_sec * 1e3:.1f} ms of solving, "
+                f"waited {self.waited_sec * 1e3:.1f} ms on unfinished results")
@@ -0,0 +1,366 @@
+"""Asyncio game loop: capture, detection, move search, arm motion and UI as concurrent tasks.
+
+main.py runs one blocking loop, so while the arm moves nothing else happens:
+the window freezes and camera frames pile up. Here every stage is its own
+task and the stages talk through queues:
+
+    capture  --frames-->  detect  --boards-->  play  --searches-->  search
+                                                ^  <----moves-----
+                                                |  --motions-->  motion
+    ui (shows the latest frame; 'q' quits)
+
+play() drives the gameState state machine and owns the turn order. Blocking
+work (camera reads, the detector, the solver, the arm) runs in worker
+threads, the arm on a single thread of its own so its commands keep their
+order. When the game ends, the video runs out or 'q' is pressed, every task
+is cancelled and awaited before the arm and camera are closed.
+
+Headless, with the stub arm and a recorded video:
+    python orchestrator.py --stub --video game.mp4 --first human --headless
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from boardLocator import BoardLocator
+from changeGate import StabilityGate
+from detectGrid import DEFAULT_BACKEND, DEFAULT_CONF, DEFAULT_DEVICE, DEFAULT_WEIGHTS, annotate, detect_board
+from detectorBackend import load_detector, warm_up
+from frameSource import open_source
+from gameState import HUMAN_MOVED, NO_CHANGE, check_end, new_game, on_detection, on_robot_move, result_text
+from movePrecompute import MovePrecomputer
+import stageTrace
+from ticTacToe import best_move_for, show_board
+
+DETECT_INTERVAL_SEC = 15.0     # fallback read if the change gate never fires
+UI_FPS = 30.0
+LATENCY_WINDOW = 100          # detection latencies kept for status()
+WINDOW = "Feed"
+
+
+class Orchestrator:
+    def __init__(self, dobot, model, cap, first=None, headless=False, locator=None,
+                 realtime=False, conf_thr=DEFAULT_CONF, detect_interval=DETECT_INTERVAL_SEC,
+                 solve=best_move_for, name="game", log=print):
+        """realtime=True paces a recording at its own frame rate, as a live camera would be.
+
+        solve(board, robot_token) -> (row, col) picks the robot's moves; the
+        game server passes one shared by all its stations. log(*args) takes
+        the game's console output.
+        """
+        self.name = name
+        self.log = log
+        self.dobot = dobot
+        self.model = model
+        self.cap = cap
+        self.first = first
+        self.headless = headless
+        self.locator = locator
+        self.realtime = realtime
+        self.conf_thr = conf_thr
+        self.detect_interval = detect_interval
+        self.solve = solve
+        self.state = None
+        self.display = None            # latest frame for the UI
+        self.detection = None          # latest detectGrid.Detection, drawn by the UI only
+        self.seq = 0
+        self.history = []              # one dict per move of the current game
+        # counters for status()
+        self.counts = Counter()        # frames, reads, human_moves, robot_moves, games, <result>
+        self.detect_sec = deque(maxlen=LATENCY_WINDOW)
+        self.started_at = time.perf_counter()
+
+    def status(self):
+        """Snapshot of the game and the station's throughput, for monitoring."""
+        elapsed = max(time.perf_counter() - self.started_at, 1e-6)
+        state = self.state
+        latencies = sorted(self.detect_sec)
+        turn = None
+        if state is not None and state.result is None:
+            turn = "robot" if state.robot_move else "human"
+        return {
+            "name": self.name,
+            "turn": turn,
+            "board": None if state is None else ["".join(r) for r in state.board.to_rows()],
+            "result": None if state is None else state.result,
+            "frames": self.counts["frames"],
+            "fps": self.counts["frames"] / elapsed,
+            "reads": self.counts["reads"],
+            "detect_p50_ms": latencies[len(latencies) // 2] * 1e3 if latencies else 0.0,
+            "moves": self.counts["human_moves"] + self.counts["robot_moves"],
+            "games": self.counts["games"],
+            "results": {r: self.counts[r] for r in ("robot", "human", "draw", "cheat")},
+        }
+
+    # ---------- stage tasks ----------
+
+    async def capture(self):
+        """Camera/recording reader: keeps only the newest frame in the frames queue."""
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        next_at = time.perf_counter()
+        while True:
+            ok, frame = await asyncio.to_thread(self.cap.read)
+            if not ok or frame is None:
+                self.log("[capture] end of video")
+                self.quit.set()
+                return
+            self.seq += 1
+            self.counts["frames"] += 1
+            if self.frames.full():
+                self.frames.get_nowait()
+            self.frames.put_nowait((self.seq, frame))
+            if self.display is None or not self.watching.is_set():
+                self.display = frame
+            if self.realtime:
+                next_at += 1.0 / fps
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    async def detect(self):
+        """While the human's turn is watched, reads the board when the scene settles."""
+        gate = StabilityGate()
+        watched = None
+        last_read = 0.0
+        while True:
+            await self.watching.wait()
+            seq, frame = await self.frames.get()
+            if watched != self.watch_id:
+                # a new human turn: only the scene from now on counts
+                watched = self.watch_id
+                gate.reset(frame)
+                last_read = time.time()
+                continue
+            triggered = gate.update(frame, seq)
+            if not triggered and time.time() - last_read < self.detect_interval:
+                self.display = frame
+                continue
+            last_read = time.time()
+            t0 = time.perf_counter()
+            detection = await asyncio.to_thread(detect_board, frame, self.model,
+                                                self.conf_thr, self.locator)
+            self.detect_sec.append(time.perf_counter() - t0)
+            self.counts["reads"] += 1
+            self.display, self.detection = frame, detection
+            if self.watching.is_set() and watched == self.watch_id:
+                await self.boards.put(detection.board)
+
+    async def search(self):
+        while True:
+            board = await self.searches.get()
+            move = await asyncio.to_thread(self.precompute.get, board)
+            await self.moves.put(move)
+
+    async def motion(self):
+        """Runs arm commands in order on the arm's own thread; completes each command's future."""
+        loop = asyncio.get_running_loop()
+        while True:
+            fn, args, done = await self.motions.get()
+            try:
+                result = await loop.run_in_executor(self._arm, fn, *args)
+            except Exception as exc:
+                if not done.cancelled():
+                    done.set_exception(exc)
+            else:
+                if not done.cancelled():
+                    done.set_result(result)
+
+    async def ui(self):
+        """Draws and shows the latest frame at UI_FPS; headless runs never draw."""
+        if self.headless:
+            return
+        cv2.namedWindow(WINDOW, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(WINDOW, 960, 720)
+        while True:
+            if self.display is not None:
+                image = self.display
+                if self.detection is not None:
+                    image = await asyncio.to_thread(annotate, image, self.detection, True)
+                cv2.imshow(WINDOW, image)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                self.log("Quit requested.")
+                self.quit.set()
+                return
+            await asyncio.sleep(1.0 / UI_FPS)
+
+    # ---------- game ----------
+
+    async def arm(self, fn, *args):
+        done = asyncio.get_running_loop().create_future()
+        await self.motions.put((fn, args, done))
+        return await done
+
+    async def ask_first(self):
+        while True:
+            choice = (await asyncio.to_thread(input, "Who goes first? Type 'robot' or 'human': ")).strip().lower()
+            if choice in ("robot", "human"):
+                return choice
+            self.log("Please type exactly 'robot' or 'human'.")
+
+    async def human_turn(self):
+        await self.arm(self.dobot.move_to_intermediate)
+        while not self.boards.empty():
+            self.boards.get_nowait()
+        self.watch_id += 1
+        self.watching.set()
+        try:
+            while True:
+                detected = await self.boards.get()
+                before = self.state.board
+                self.state, event = on_detection(self.state, detected)
+                if event == NO_CHANGE:
+                    self.log("[human] Please make your move...")
+                    continue
+                if event == HUMAN_MOVED:
+                    self.counts["human_moves"] += 1
+                    (i, j), = before.diff(self.state.board)
+                    self._log_move("human", self.state.human_token, i, j)
+                    self.log("\nBoard after human move:")
+                    show_board(self.state.board, self.log)
+                else:
+                    self.log(before)
+                    self.log(detected)
+                    self.log(f"{result_text(self.state)} ({event})")
+                return
+        finally:
+            self.watching.clear()
+
+    def _log_move(self, player, token, i, j):
+        self.history.append({"player": player, "token": token, "row": i, "col": j,
+                             "time": time.time(), "board": ["".join(r) for r in self.state.board.to_rows()]})
+
+    async def robot_turn(self):
+        await self.searches.put(self.state.board)
+        i, j = await self.moves.get()
+        self.state = on_robot_move(self.state, i, j)
+        if self.state.result is not None:
+            return
+        self.counts["robot_moves"] += 1
+        self._log_move("robot", self.state.robot_token, i, j)
+        token = self.state.robot_token
+        self.log(f"[robot] Playing at row {i+1}, col {j+1} as '{token.upper()}'")
+        if token == 'x':
+            await self.arm(self.dobot.draw_x, i + 1, j + 1, 0, False)
+        else:
+            await self.arm(self.dobot.draw_o, i + 1, j + 1, None, False)
+        self.precompute.speculate(self.state.board, self.state.human_token)
+        self.log("\nBoard after robot move:")
+        show_board(self.state.board, self.log)
+
+    async def play(self):
+        first = self.first or await self.ask_first()
+        self.state = new_game(first)
+        self.history = []
+        robot_token = self.state.robot_token
+        self.precompute = MovePrecomputer(lambda board: self.solve(board, robot_token))
+        if not self.state.robot_move:
+            self.precompute.speculate(self.state.board, self.state.human_token)
+        self.log(f"Dobot is '{robot_token.upper()}', Human is '{self.state.human_token.upper()}'.")
+        self.log("\n--- Game start ---")
+        show_board(self.state.board, self.log)
+
+        while True:
+            self.state = check_end(self.state)
+            if self.state.result is not None:
+                break
+            if self.state.robot_move:
+                await self.robot_turn()
+            else:
+                await self.human_turn()
+        self.counts["games"] += 1
+        self.counts[self.state.result] += 1
+        self.log("\nFinal board:")
+        show_board(self.state.board, self.log)
+        self.log("Result:", result_text(self.state))
+
+    async def run(self, quit=None):
+        """Play one game; setting `quit` (created here if not given) ends it early."""
+        self.frames = asyncio.Queue(maxsize=1)
+        self.boards = asyncio.Queue()
+        self.searches = asyncio.Queue()
+        self.moves = asyncio.Queue()
+        self.motions = asyncio.Queue()
+        self.watching = asyncio.Event()
+        self.quit = quit or asyncio.Event()
+        self.watch_id = 0
+        self.precompute = None
+        self._arm = ThreadPoolExecutor(max_workers=1, thread_name_prefix="arm")
+
+        stages = [asyncio.create_task(stage(), name=stage.__name__)
+                  for stage in (self.capture, self.detect, self.search, self.motion, self.ui)]
+        game = asyncio.create_task(self.play(), name="play")
+        quit_wait = asyncio.create_task(self.quit.wait(), name="quit")
+        try:
+            await asyncio.wait([game, quit_wait], return_when=asyncio.FIRST_COMPLETED)
+            if game.done():
+                game.result()   # re-raise a crash in the game logic
+        finally:
+            for task in stages + [game, quit_wait]:
+                task.cancel()
+            await asyncio.gather(*stages, game, quit_wait, return_exceptions=True)
+            # let a running arm command finish without blocking the event loop
+            await asyncio.to_thread(self._arm.shutdown, True)
+            if self.precompute is not None:
+                self.precompute.shutdown()
+                self.log(self.precompute.report())
+        return self.state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--stub", action="store_true", help="use dobotGrid_stubbings instead of the arm")
+    parser.add_argument("--port", default="/dev/ttyACM0", help='arm port, or "sim" for the simulated arm')
+    parser.add_argument("--video", help="read frames from a video file, image folder or .raw archive instead of a camera")
+    parser.add_argument("--camera", type=int, default=1, help="camera index")
+    parser.add_argument("--first", choices=("robot", "human"), help="skip the who-goes-first question")
+    parser.add_argument("--headless", action="store_true", help="no OpenCV window")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="detector backend (see detectorBackend)")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS)
+    parser.add_argument("--trace", help="write per-stage spans to this Chrome/Perfetto trace file")
+    args = parser.parse_args()
+    if args.trace:
+        stageTrace.enable()
+
+    if args.stub:
+        from dobotGrid_stubbings import DobotGrid
+    else:
+        from dobotGrid import DobotGrid
+    dobot = DobotGrid(port=args.port)
+    dobot.generate_points()
+    dobot.generate_grid()
+    dobot.draw_grid(wait=False)
+
+    model = load_detector(args.weights, args.backend, device=DEFAULT_DEVICE)
+    cap = open_source(args.video or args.camera)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open {args.video or f'camera {args.camera}'}")
+    ok, frame = cap.read()
+    if ok:
+        warm_up(model, frame.shape, DEFAULT_CONF)
+    if args.video:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    orchestrator = Orchestrator(dobot, model, cap, first=args.first, headless=args.headless,
+                                locator=BoardLocator(), realtime=bool(args.video))
+    try:
+        asyncio.run(orchestrator.run())
+    except KeyboardInterrupt:
+        print("Interrupted.")
+    finally:
+        cap.release()
+        if not args.headless:
+            cv2.destroyAllWindows()
+        try:
+            dobot.disconnect()
+        except Exception:
+            pass
+        print("\n[shutdown] Camera closed and Dobot disconnected.")
+        if args.trace:
+            print(stageTrace.current().summary())
+            print(f"[trace] {stageTrace.current().export_chrome(args.trace)} spans written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
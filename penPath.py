@@ -0,0 +1,73 @@
+"""Pen-travel optimizer: order strokes and pick their directions to minimize pen-up travel.
+
+A stroke is a pen-down segment ((x0, y0), (x1, y1)). Ordering strokes is a
+small travelling-salesman problem over the stroke endpoints: a nearest-
+neighbour tour from the arm's current position, refined with 2-opt moves
+(reversing a run of strokes, which also flips each stroke's direction) and
+single-stroke flips until nothing improves.
+"""
+import math
+
+
+def _travel(order, strokes, start):
+    """Pen-up distance of visiting strokes in order; order holds (index, reversed)."""
+    total = 0.0
+    pos = start
+    for idx, rev in order:
+        a, b = strokes[idx]
+        if rev:
+            a, b = b, a
+        total += math.dist(pos, a)
+        pos = b
+    return total
+
+
+def _nearest_neighbour(strokes, start):
+    left = set(range(len(strokes)))
+    order = []
+    pos = start
+    while left:
+        best = None
+        for idx in left:
+            a, b = strokes[idx]
+            for rev, entry in ((False, a), (True, b)):
+                d = math.dist(pos, entry)
+                if best is None or d < best[0]:
+                    best = (d, idx, rev)
+        _, idx, rev = best
+        left.remove(idx)
+        order.append((idx, rev))
+        a, b = strokes[idx]
+        pos = a if rev else b
+    return order
+
+
+def optimize_strokes(strokes, start=(0.0, 0.0), max_rounds=50):
+    """Returns the strokes reordered and re-oriented, as a list of (begin, end) points."""
+    strokes = [(tuple(a[:2]), tuple(b[:2])) for a, b in strokes]
+    start = tuple(start[:2])
+    if not strokes:
+        return []
+    order = _nearest_neighbour(strokes, start)
+    best = _travel(order, strokes, start)
+
+    for _ in range(max_rounds):
+        improved = False
+        n = len(order)
+        for i in range(n):
+            for j in range(i, n):
+                # 2-opt: reverse the run i..j (j == i is a single-stroke flip)
+                candidate = order[:i] + [(idx, not rev) for idx, rev in reversed(order[i:j + 1])] + order[j + 1:]
+                cost = _travel(candidate, strokes, start)
+                if cost < best - 1e-9:
+                    order, best, improved = candidate, cost, True
+        if not improved:
+            break
+
+    return [strokes[idx][::-1] if rev else strokes[idx] for idx, rev in order]
+
+
+def pen_up_travel(strokes, start=(0.0, 0.0)):
+    """Pen-up distance of drawing the strokes as given, starting from start."""
+    order = [(i, False) for i in range(len(strokes))]
+    return _travel(order, [(tuple(a[:2]), tuple(b[:2])) for a, b in strokes], tuple(start[:2]))
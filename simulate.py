@@ -0,0 +1,242 @@
+"""Headless game simulation: thousands of complete games, no camera, arm or window.
+
+Each game runs the real turn logic (gameState), the real detection path
+(detect_board) and the real solver, with three stand-ins:
+
+- SyntheticCamera renders the current board as a camera frame (paper, grid
+  lines, drawn X and O, upside down like the real camera, optional noise),
+- SyntheticDetector finds the symbols in that frame by their ink, in the
+  detector backend interface, so no model weights are needed,
+- the stub DobotGrid from dobotGrid_stubbings "draws" the robot's moves,
+  which the camera then shows.
+
+The human is random, perfect or a mix. Games are spread over a process
+pool; the report gives games/second, per-stage latency percentiles per turn
+and the outcomes, and is meant as the regression and performance baseline.
+
+    python simulate.py --games 5000 --workers 8 --human mixed
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from detectGrid import DEFAULT_CONF, detect_board
+from dobotGrid_stubbings import DobotGrid
+from gameState import HUMAN_MOVED, check_end, new_game, on_detection, on_robot_move
+from ticTacToe import best_move_for
+
+FRAME_SHAPE = (480, 640)       # (height, width) of a synthetic frame
+INK_LEVEL = 128                # gray level below which a pixel is ink
+STAGES = ("capture", "detect", "search", "motion")
+HUMANS = ("random", "perfect", "mixed")
+MIXED_PERFECT = 0.5            # chance that a "mixed" human plays the perfect move
+
+
+class SyntheticCamera:
+    """Renders a board the way the camera sees it, with cv2.VideoCapture's read()."""
+
+    def __init__(self, shape=FRAME_SHAPE, noise=0.0, rng=None):
+        self.shape = shape
+        self.noise = noise
+        self.rng = rng or np.random.default_rng()
+        self.board = None
+        self._frame = None
+
+    def show(self, board):
+        """Draw `board`; read() returns it until the next show()."""
+        if board == self.board:
+            return
+        H, W = self.shape
+        frame = np.full((H, W, 3), 235, dtype=np.uint8)
+        for k in (1, 2):
+            cv2.line(frame, (W * k // 3, 0), (W * k // 3, H), (40, 40, 40), 3)
+            cv2.line(frame, (0, H * k // 3), (W, H * k // 3), (40, 40, 40), 3)
+        cw, ch = W / 3.0, H / 3.0
+        for i in range(3):
+            for j in range(3):
+                token = board.cell(i, j)
+                if token == '_':
+                    continue
+                # the camera looks at the board upside down
+                cx, cy = (2 - j + 0.5) * cw, (2 - i + 0.5) * ch
+                r = 0.3 * min(cw, ch)
+                if token == 'x':
+                    cv2.line(frame, (int(cx - r), int(cy - r)), (int(cx + r), int(cy + r)), (30, 30, 30), 4)
+                    cv2.line(frame, (int(cx - r), int(cy + r)), (int(cx + r), int(cy - r)), (30, 30, 30), 4)
+                else:
+                    cv2.circle(frame, (int(cx), int(cy)), int(r), (30, 30, 30), 4)
+        self.board = board
+        self._frame = frame
+
+    def read(self):
+        frame = self._frame
+        if self.noise:
+            jitter = self.rng.normal(0.0, self.noise, frame.shape)
+            frame = np.clip(frame + jitter, 0, 255).astype(np.uint8)
+        return True, frame
+
+
+class SyntheticDetector:
+    """Detector backend for SyntheticCamera frames: ink in a cell's center means X, a ring means O."""
+
+    name = "synthetic"
+
+    def __init__(self, inset=0.15, min_ink=0.01, conf=0.9):
+        self.inset = inset
+        self.min_ink = min_ink
+        self.conf = conf
+
+    def _cell(self, ink, x1, y1, x2, y2):
+        dx, dy = int((x2 - x1) * self.inset), int((y2 - y1) * self.inset)
+        inner = ink[y1 + dy:y2 - dy, x1 + dx:x2 - dx]
+        if inner.mean() < self.min_ink:
+            return None
+        h, w = inner.shape
+        center = inner[h * 2 // 5:h * 3 // 5, w * 2 // 5:w * 3 // 5]
+        cls = 0 if center.mean() > 0.1 else 1     # ID2TOKEN: 0 = X, 1 = O
+        return (x1 + dx, y1 + dy, x2 - dx, y2 - dy), cls
+
+    def detect(self, images, conf):
+        found = []
+        for image in images:
+            H, W = image.shape[:2]
+            ink = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) < INK_LEVEL
+            boxes = []
+            for row in range(3):
+                for col in range(3):
+                    hit = self._cell(ink, W * col // 3, H * row // 3, W * (col + 1) // 3, H * (row + 1) // 3)
+                    if hit is not None:
+                        boxes.append(hit)
+            if not boxes or self.conf < conf:
+                found.append(None)
+                continue
+            found.append((np.array([b for b, _ in boxes], dtype=np.float32),
+                          np.array([c for _, c in boxes], dtype=int),
+                          np.full(len(boxes), self.conf, dtype=np.float32)))
+        return found
+
+
+def human_move(board, token, kind, rng):
+    if kind == "perfect" or (kind == "mixed" and rng.random() < MIXED_PERFECT):
+        return best_move_for(board, token)
+    return rng.choice(board.empty_cells())
+
+
+def play_game(seed, human="random", noise=0.0):
+    """One complete game; returns (result, first, {stage: [seconds per turn]})."""
+    rng = random.Random(seed)
+    first = rng.choice(("robot", "human"))
+    camera = SyntheticCamera(noise=noise, rng=np.random.default_rng(seed))
+    detector = SyntheticDetector()
+    dobot = DobotGrid(port="stub")
+    timings = {stage: [] for stage in STAGES}
+
+    state = new_game(first)
+    camera.show(state.board)
+    while True:
+        state = check_end(state)
+        if state.result is not None:
+            break
+        if state.robot_move:
+            t0 = time.perf_counter()
+            i, j = best_move_for(state.board, state.robot_token)
+            t1 = time.perf_counter()
+            state = on_robot_move(state, i, j)
+            if state.result is None:
+                draw = dobot.draw_x if state.robot_token == 'x' else dobot.draw_o
+                draw(i + 1, j + 1, wait=False)
+                camera.show(state.board)
+            timings["search"].append(t1 - t0)
+            timings["motion"].append(time.perf_counter() - t1)
+        else:
+            t0 = time.perf_counter()
+            dobot.move_to_intermediate()
+            i, j = human_move(state.board, state.human_token, human, rng)
+            camera.show(state.board.place(i, j, state.human_token))
+            t1 = time.perf_counter()
+            _, frame = camera.read()
+            t2 = time.perf_counter()
+            detected = detect_board(frame, detector, conf_thr=DEFAULT_CONF).board
+            t3 = time.perf_counter()
+            state, event = on_detection(state, detected)
+            timings["motion"].append(t1 - t0)
+            timings["capture"].append(t2 - t1)
+            timings["detect"].append(t3 - t2)
+            if event != HUMAN_MOVED and state.result is None:
+                raise RuntimeError(f"game {seed}: detection saw no move on {detected}")
+    return state.result, first, timings
+
+
+def play_games(seeds, human, noise):
+    """Worker: play every seed quietly (the stub arm prints on every call)."""
+    outcomes = Counter()
+    timings = {stage: [] for stage in STAGES}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for seed in seeds:
+            result, first, t = play_game(seed, human, noise)
+            outcomes[(first, result)] += 1
+            for stage in STAGES:
+                timings[stage].extend(t[stage])
+    return outcomes, timings
+
+
+def percentiles(values, ps=(50, 95, 99)):
+    if not values:
+        return [0.0] * len(ps)
+    values = sorted(values)
+    return [values[min(len(values) - 1, int(p / 100.0 * len(values)))] for p in ps]
+
+
+def run(games, workers, human="random", noise=0.0, seed=0, chunk=50):
+    """Play `games` games over `workers` processes; returns (seconds, outcomes, timings)."""
+    seeds = list(range(seed, seed + games))
+    chunks = [seeds[k:k + chunk] for k in range(0, games, chunk)]
+    outcomes = Counter()
+    timings = {stage: [] for stage in STAGES}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for o, t in pool.map(play_games, chunks, [human] * len(chunks), [noise] * len(chunks)):
+            outcomes.update(o)
+            for stage in STAGES:
+                timings[stage].extend(t[stage])
+    return time.perf_counter() - start, outcomes, timings
+
+
+def report(games, workers, sec, outcomes, timings):
+    lines = [f"{games} games on {workers} workers in {sec:.2f} s: {games / sec:.1f} games/s"]
+    lines.append(f"{'stage':<8} {'turns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for stage in STAGES:
+        p50, p95, p99 = percentiles(timings[stage])
+        lines.append(f"{stage:<8} {len(timings[stage]):7d} {p50 * 1e3:8.3f} {p95 * 1e3:8.3f} {p99 * 1e3:8.3f}")
+    for first in ("robot", "human"):
+        row = {r: outcomes[(first, r)] for r in ("robot", "human", "draw", "cheat")}
+        total = sum(row.values())
+        lines.append(f"{first} first ({total} games): " +
+                     ", ".join(f"{r} {n} ({100.0 * n / max(total, 1):.1f}%)" for r, n in row.items()))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--human", choices=HUMANS, default="random")
+    parser.add_argument("--noise", type=float, default=0.0, help="std-dev of camera noise, in gray levels")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sec, outcomes, timings = run(args.games, args.workers, args.human, args.noise, args.seed)
+    print(report(args.games, args.workers, sec, outcomes, timings))
+    if outcomes[("robot", "human")] + outcomes[("human", "human")]:
+        raise SystemExit("The robot lost a game: the solver or the detection path is broken.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Per-stage latency spans for the game loop, exported as a Chrome/Perfetto trace.
+
+Code marks its stages with `with span("detect"):` or the `@traced()`
+decorator. Tracing is off until enable() is called; while off, span()
+returns one shared do-nothing context manager and a traced function makes
+a single global check before calling through, so the marks can stay in the
+hot paths.
+
+While on, every span is kept (up to MAX_EVENTS) for export_chrome(), which
+writes the JSON that chrome://tracing and ui.perfetto.dev open, one row per
+thread. The last ROLLING_WINDOW durations of each stage feed summary(),
+a p50/p95/p99 table.
+"""
+import functools
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+ROLLING_WINDOW = 500       # durations per stage kept for summary()
+MAX_EVENTS = 200_000       # spans kept for export_chrome(); the oldest are dropped
+
+_tracer = None
+
+
+class Tracer:
+    def __init__(self, window=ROLLING_WINDOW, max_events=MAX_EVENTS):
+        self.t0 = time.perf_counter()
+        self.events = deque(maxlen=max_events)     # (name, start, end, thread id)
+        self.recent = defaultdict(lambda: deque(maxlen=window))
+        self.threads = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, start, end):
+        tid = threading.get_ident()
+        with self._lock:
+            self.events.append((name, start, end, tid))
+            self.recent[name].append(end - start)
+            if tid not in self.threads:
+                self.threads[tid] = threading.current_thread().name
+
+    def export_chrome(self, path):
+        """Write the spans in the Chrome trace event format; returns the number written."""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        trace = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                 for tid, name in threads.items()]
+        for name, start, end, tid in events:
+            trace.append({"name": name, "cat": name.split(".")[0], "ph": "X", "pid": 1, "tid": tid,
+                          "ts": (start - self.t0) * 1e6, "dur": (end - start) * 1e6})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def percentiles(self, name, ps=(50, 95, 99)):
+        with self._lock:
+            values = sorted(self.recent[name])
+        if not values:
+            return [0.0] * len(ps)
+        return [values[min(len(values) - 1, int(p / 100.0 * len(values)))] for p in ps]
+
+    def stages(self):
+        """{stage: (n, p50, p95, p99)} over each stage's rolling window, in seconds."""
+        with self._lock:
+            names = sorted(self.recent)
+            counts = {name: len(self.recent[name]) for name in names}
+        return {name: (counts[name], *self.percentiles(name)) for name in names}
+
+    def summary(self):
+        lines = [f"[trace] {'stage':<28} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+        for name, (n, p50, p95, p99) in self.stages().items():
+            lines.append(f"[trace] {name:<28} {n:5d} {p50 * 1e3:9.2f} {p95 * 1e3:9.2f} {p99 * 1e3:9.2f}")
+        return "\n".join(lines)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        tracer = _tracer
+        if tracer is not None:
+            tracer.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Context manager timing one stage; free while tracing is off."""
+    return _Span(name) if _tracer is not None else _NO_SPAN
+
+
+def traced(name=None):
+    """Decorator: every call of the function is a span (named after it by default)."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def sleep(sec, name="sleep"):
+    """time.sleep that shows up in the trace."""
+    with span(name):
+        time.sleep(sec)
+
+
+def enable(window=ROLLING_WINDOW, max_events=MAX_EVENTS):
+    global _tracer
+    _tracer = Tracer(window, max_events)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def current():
+    """The active Tracer, or None while tracing is off."""
+    return _tracer
@@ -0,0 +1,73 @@
+"""Startup pipeline: overlapping slow setup steps and timing each of them.
+
+Loading (and warming up) the detector and finding the camera do not need
+the arm, so they run on background threads while the arm connects and draws
+the grid. Every step is timed, foreground or background, and report()
+prints when each one started and how long it took, relative to startup.
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+
+class StartupTimer:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.phases = []         # (name, start offset, seconds, thread)
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def _record(self, name, start, thread):
+        end = time.perf_counter()
+        with self._lock:
+            self.phases.append((name, start - self.t0, end - start, thread))
+
+    def phase(self, name):
+        """Context manager that times a step on the calling thread."""
+        timer = self
+
+        class _Phase:
+            def __enter__(self):
+                self.start = time.perf_counter()
+
+            def __exit__(self, *exc):
+                timer._record(name, self.start, "main")
+                return False
+
+        return _Phase()
+
+    def background(self, name, fn, *args):
+        """Start fn(*args) on its own daemon thread; result(name) waits for it."""
+        future = Future()
+
+        def run():
+            start = time.perf_counter()
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+            finally:
+                self._record(name, start, "background")
+
+        self._jobs[name] = future
+        threading.Thread(target=run, name=f"startup-{name}", daemon=True).start()
+        return future
+
+    def result(self, name):
+        """Result of a background step; the wait, if any, is timed as its own phase."""
+        future = self._jobs[name]
+        if future.done():
+            return future.result()
+        with self.phase(f"wait for {name}"):
+            return future.result()
+
+    def mark(self, name):
+        """Record a zero-length milestone, e.g. the first question or the first move."""
+        self._record(name, time.perf_counter(), "main")
+
+    def report(self):
+        lines = ["[startup] phase                     start    took"]
+        for name, start, sec, thread in sorted(self.phases, key=lambda p: p[1]):
+            took = f"{sec:6.2f} s" if sec > 0 else "      -"
+            lines.append(f"[startup] {name:<24} {start:6.2f} s {took}  ({thread})")
+        return "\n".join(lines)
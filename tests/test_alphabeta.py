@@ -0,0 +1,10 @@
+from bitBoard import Board
+from ticTacToe import alphabeta_mismatches, alphabeta_next_move, reachable_boards
+
+
+def test_alphabeta_reaches_the_minimax_value_on_every_reachable_position():
+    assert alphabeta_mismatches(reachable_boards()) == []
+
+
+def test_alphabeta_takes_the_fastest_win():
+    assert alphabeta_next_move(Board.from_rows(["xx_", "oo_", "___"])) == (0, 2)
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from controlServer import ControlServer, ServedGame
+
+
+def _quiet(*args):
+    pass
+
+
+class WaitingGame(ServedGame):
+    """A ServedGame that asks for the first player, then waits to be stopped instead of playing."""
+
+    def __init__(self):
+        super().__init__(dobot=None, model=None, cap=None, headless=True, log=_quiet)
+
+    async def run(self, quit=None):
+        self.first = self.first or await self.ask_first()
+        await quit.wait()
+
+
+class Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def served(test):
+    """Run test(server) in an event loop, as the HTTP handlers are."""
+    async def main():
+        server = ControlServer(WaitingGame())
+        try:
+            await test(server)
+        finally:
+            if server.running():
+                server.task.cancel()
+    asyncio.run(main())
+
+
+async def request(server, raw):
+    reader = asyncio.StreamReader()
+    reader.feed_data(raw)
+    reader.feed_eof()
+    writer = Writer()
+    await server.handle(reader, writer)
+    return writer.data.split(b"\r\n", 1)[0]
+
+
+def test_start_stop_and_conflicts():
+    async def test(server):
+        assert server.stop()[0] == 409
+        assert server.start("nobody")[0] == 400
+        assert server.start("robot") == (202, {"started": True, "first": "robot"})
+        assert server.start("human")[0] == 409
+        assert server.stop()[0] == 202
+        await asyncio.wait_for(server.task, 1.0)
+        assert not server.running()
+        assert server.stop()[0] == 409
+    served(test)
+
+
+def test_stop_before_the_game_starts_running():
+    async def test(server):
+        server.start("human")
+        assert server.stop()[0] == 202          # the game task has not run a step yet
+        await asyncio.wait_for(server.task, 1.0)
+    served(test)
+
+
+def test_choose_first():
+    async def test(server):
+        assert server.choose_first("robot")[0] == 409
+        server.start()
+        await asyncio.sleep(0)
+        assert server.game.waiting_for_first()
+        assert server.choose_first("nobody")[0] == 400
+        assert server.choose_first("human") == (200, {"first": "human"})
+        await asyncio.sleep(0)
+        assert server.game.first == "human" and not server.game.waiting_for_first()
+        assert server.choose_first("robot")[0] == 409
+        server.stop()
+    served(test)
+
+
+def test_route_methods_and_unknown_paths():
+    async def test(server):
+        assert server._route("GET", "/board", {})[0] == 200
+        assert server._route("GET", "/history", {}) == (200, [])
+        assert server._route("POST", "/board", {})[0] == 405
+        assert server._route("GET", "/game/start", {})[0] == 405
+        assert server._route("GET", "/nowhere", {})[0] == 404
+        assert server._route("POST", "/game/start", {"first": "sideways"})[0] == 400
+        assert not server.running()
+    served(test)
+
+
+def test_http_requests():
+    async def test(server):
+        assert await request(server, b"GET /nowhere HTTP/1.1\r\n\r\n") == b"HTTP/1.1 404 Not Found"
+        body = b'["robot"]'
+        array = (b"POST /game/start HTTP/1.1\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        assert await request(server, array) == b"HTTP/1.1 400 Bad Request"
+        assert not server.running()
+        body = b'{"first": "robot"}'
+        start = (b"POST /game/start HTTP/1.1\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        assert await request(server, start) == b"HTTP/1.1 202 Accepted"
+        assert server.game.first == "robot"
+    served(test)
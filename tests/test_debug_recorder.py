@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from debugRecorder import DebugRecorder
+
+
+def frame(value, channels=3):
+    return np.full((8, 8, channels), value, np.uint8)
+
+
+def files(folder, ext):
+    return sorted(f for f in os.listdir(folder) if f.endswith(ext))
+
+
+def test_keeps_only_the_newest_max_files_frames(tmp_path):
+    recorder = DebugRecorder(str(tmp_path), fmt="png", max_files=3).start()
+    for k in range(6):
+        assert recorder.record(frame(k)) == f"img_{k:06d}"
+    recorder.stop()
+    assert recorder.written == 6 and recorder.dropped == 0
+    assert files(tmp_path, ".png") == [f"img_{k:06d}.png" for k in (3, 4, 5)]
+    assert len(files(tmp_path, ".json")) == 3
+    assert recorder.deleted == 3
+
+
+def test_rotation_counts_raw_segments_at_their_truncated_size(tmp_path):
+    # a segment preallocates room for 10 frames and is cut to the 3 written when it closes
+    recorder = DebugRecorder(str(tmp_path), fmt="raw", segment_frames=10, max_bytes=3200).start()
+    for k in range(3):
+        recorder.record(frame(k, 3))
+    for k in range(3):
+        recorder.record(frame(k, 4))    # a new shape closes the first segment
+    recorder.stop()
+    assert recorder.dropped == 0
+    raws = files(tmp_path, ".raw")
+    sizes = [os.path.getsize(tmp_path / name) for name in raws]
+    assert raws == ["seg_0001.raw", "seg_0002.raw"] and sizes == [3 * 192, 3 * 256]
+    assert recorder._kept_bytes == recorder.bytes == sum(sizes)
+    assert recorder.deleted == 0
+
+
+def test_rotation_continues_with_what_earlier_runs_left(tmp_path):
+    for run in range(2):
+        recorder = DebugRecorder(str(tmp_path), fmt="raw", segment_frames=10, max_files=2).start()
+        recorder.record(frame(run))
+        recorder.stop()
+    recorder = DebugRecorder(str(tmp_path), fmt="raw", segment_frames=10, max_files=2).start()
+    recorder.record(frame(2))
+    recorder.stop()
+    assert files(tmp_path, ".raw") == ["seg_0002.raw", "seg_0003.raw"]
+    assert recorder.deleted == 1
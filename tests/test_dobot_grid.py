@@ -0,0 +1,103 @@
+import math
+
+import pytest
+
+pytest.importorskip("numpy")    # gridGeometry
+
+from dobotGrid import ARC_TOLERANCE_MM, LIFT_MM, MIN_ARC_SEGMENTS, DobotGrid, arc_segments
+from motionPlan import ARC, HOME
+
+
+def sim_grid(n=3):
+    dobot = DobotGrid(port="sim", n=n)
+    dobot.generate_points()
+    dobot.generate_grid()
+    return dobot
+
+
+def strokes_of(plan):
+    """(approach, begin, end, retreat) of every pen stroke after the homing run."""
+    waypoints = [tuple(wp[:4]) for wp in plan.waypoints if wp.mode != HOME]
+    assert len(waypoints) % 4 == 0
+    return [tuple(waypoints[k:k + 4]) for k in range(0, len(waypoints), 4)]
+
+
+def test_grid_draws_every_line_with_its_approach_and_retreat():
+    dobot = sim_grid()
+    plan = dobot.plan_grid()
+    assert plan.waypoints[0].mode == HOME
+    points = dobot.points
+    drawn = set()
+    for approach, begin, end, retreat in strokes_of(plan):
+        names = {name for name, pose in points.items() if pose in (begin, end) and not name.startswith("SI")}
+        assert len(names) == 2
+        a, b = sorted(names, key=lambda name: int(name[1:]))
+        assert int(b[1:]) == int(a[1:]) + 1 and int(a[1:]) % 2 == 1
+        assert approach == points["SI" + (a if begin == points[a] else b)[1:]]
+        assert retreat == points["SI" + (b if end == points[b] else a)[1:]]
+        assert approach[2] == begin[2] + LIFT_MM and retreat[2] == end[2] + LIFT_MM
+        drawn.add((a, b))
+    assert drawn == {("S1", "S2"), ("S3", "S4"), ("S5", "S6"), ("S7", "S8")}
+
+
+@pytest.mark.parametrize("n", [3, 4, 5])
+def test_grid_has_one_stroke_per_s_pair(n):
+    dobot = sim_grid(n)
+    strokes = strokes_of(dobot.plan_grid())
+    assert len(strokes) == 2 * (n - 1)
+    pairs = {frozenset((dobot.points[f"S{k}"], dobot.points[f"S{k + 1}"])) for k in range(1, 4 * (n - 1), 2)}
+    assert {frozenset((begin, end)) for _, begin, end, _ in strokes} == pairs
+
+
+def test_x_strokes_are_the_cell_diagonals():
+    dobot = sim_grid()
+    corners = dobot.grid["G23"]
+    diagonals = {frozenset((corners[0], corners[3])), frozenset((corners[1], corners[2]))}
+    strokes = strokes_of(dobot.plan_x(2, 3, start_pose=dobot.intermediate))
+    assert {frozenset((begin, end)) for _, begin, end, _ in strokes} == diagonals
+    for approach, begin, end, retreat in strokes:
+        assert approach == (*begin[:2], begin[2] + LIFT_MM, begin[3])
+        assert retreat == (*end[:2], end[2] + LIFT_MM, end[3])
+
+
+@pytest.mark.parametrize("native_arcs", [False, True])
+def test_o_stays_on_its_circle_and_closes(native_arcs):
+    dobot = sim_grid()
+    dobot.native_arcs = native_arcs
+    plan = dobot.plan_o(1, 2, start_pose=dobot.intermediate)
+    cx, cy, z, r = dobot.geometry["centers"][0, 1].tolist()
+    first, last = plan.waypoints[0], plan.waypoints[-1]
+    assert first.z == last.z == z + LIFT_MM
+    assert math.dist(first[:2], last[:2]) == pytest.approx(0, abs=1e-9)
+    for wp in plan.waypoints:
+        for x, y in [wp[:2]] + ([wp.via[:2]] if wp.via else []):
+            assert math.dist((x, y), (cx, cy)) == pytest.approx(dobot.radius)
+    assert all(wp.z == z for wp in plan.waypoints[1:-1])
+    assert any(wp.mode == ARC for wp in plan.waypoints) is native_arcs
+
+
+@pytest.mark.parametrize("radius", [0.4, 2.0, 15.0, 50.0, 200.0])
+def test_arc_segments_keep_the_chord_error_within_tolerance(radius):
+    segments = arc_segments(radius)
+    assert segments >= MIN_ARC_SEGMENTS
+    assert radius * (1 - math.cos(math.pi / segments)) <= ARC_TOLERANCE_MM + 1e-12
+    if segments > MIN_ARC_SEGMENTS:
+        # one chord fewer would not do
+        assert radius * (1 - math.cos(math.pi / (segments - 1))) > ARC_TOLERANCE_MM
+
+
+def test_arc_segments_grow_with_the_radius():
+    counts = [arc_segments(radius) for radius in (5, 15, 50, 150, 500)]
+    assert counts == sorted(counts) and counts[0] < counts[-1]
+
+
+def test_o_chords_stay_within_tolerance_of_the_circle():
+    dobot = sim_grid()
+    dobot.native_arcs = False
+    plan = dobot.plan_o(2, 2, start_pose=dobot.intermediate)
+    cx, cy = dobot.geometry["centers"][1, 1].tolist()[:2]
+    drawn = plan.waypoints[1:-1]
+    assert len(drawn) - 1 == arc_segments(dobot.radius)
+    for a, b in zip(drawn, drawn[1:]):
+        middle = ((a.x + b.x) / 2, (a.y + b.y) / 2)
+        assert dobot.radius - math.dist(middle, (cx, cy)) <= dobot.arc_tolerance
@@ -0,0 +1,23 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from frameSource import ImageDirSource, natural_key
+
+
+def test_natural_key_orders_numbers_by_value():
+    names = ["img_100.png", "img_9.png", "img_10.png", "frame_2.png", "img_10b.png", "frame_10.png", "img.png"]
+    assert sorted(names, key=natural_key) == [
+        "frame_2.png", "frame_10.png", "img.png", "img_9.png", "img_10.png", "img_10b.png", "img_100.png"]
+
+
+def test_natural_key_ignores_the_folder():
+    assert sorted(["b/img_10.png", "a/img_9.png"], key=natural_key) == ["a/img_9.png", "b/img_10.png"]
+
+
+def test_image_folder_replays_in_natural_order(tmp_path):
+    for name in ("img_100", "img_9", "img_10"):
+        cv2.imwrite(str(tmp_path / f"{name}.png"), np.zeros((4, 4, 3), np.uint8))
+    names = [name for name, _ in ImageDirSource(str(tmp_path)).frames()]
+    assert names == ["img_9.png", "img_10.png", "img_100.png"]
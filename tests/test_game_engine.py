@@ -0,0 +1,29 @@
+import time
+
+from gameEngine import Engine
+from ticTacToe import _move_value, evaluate, minimax_next_move, reachable_boards, rows_of
+
+
+def test_engine_matches_the_exhaustive_solver_on_every_reachable_position():
+    engine = Engine(n=3, k=3, time_budget=60.0)
+    bad = []
+    for cells in reachable_boards():
+        rows = rows_of(cells)
+        if '_' not in cells or evaluate(rows) != 0:
+            continue
+        ref = _move_value(rows, minimax_next_move(rows))
+        got = _move_value(rows, engine.best_move(rows, 'x'))
+        if ref != got:
+            bad.append((cells, ref, got))
+    assert bad == []
+
+
+def test_engine_keeps_to_its_time_budget_on_4x4():
+    engine = Engine(n=4, k=4)
+    budget = 0.2
+    start = time.monotonic()
+    move = engine.best_move([['_'] * 4 for _ in range(4)], 'x', time_budget=budget)
+    elapsed = time.monotonic() - start
+    assert engine.info.timed_out
+    assert elapsed < budget + 0.1
+    assert engine.info.depth >= 1 and 0 <= move[0] < 4 and 0 <= move[1] < 4
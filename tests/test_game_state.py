@@ -0,0 +1,106 @@
+import pytest
+
+from bitBoard import Board
+from gameState import (CHEAT_MANY, CHEAT_WRONG, HUMAN_MOVED, NO_CHANGE, check_end, new_game,
+                       on_detection, on_robot_move)
+
+
+def test_new_game_robot_first():
+    state = new_game("robot")
+    assert state.board == Board.EMPTY
+    assert (state.robot_token, state.human_token) == ('x', 'o')
+    assert state.robot_move and state.result is None
+
+
+def test_new_game_human_first():
+    state = new_game("human")
+    assert (state.robot_token, state.human_token) == ('o', 'x')
+    assert not state.robot_move and state.result is None
+
+
+def test_new_game_rejects_unknown_player():
+    with pytest.raises(ValueError):
+        new_game("nobody")
+
+
+def test_check_end_keeps_playing():
+    state = new_game("human")._replace(board=Board.from_rows(["x__", "_o_", "___"]))
+    assert check_end(state).result is None
+
+
+def test_check_end_robot_wins():
+    state = new_game("robot")._replace(board=Board.from_rows(["xxx", "oo_", "___"]))
+    assert check_end(state).result == "robot"
+
+
+def test_check_end_human_wins():
+    state = new_game("robot")._replace(board=Board.from_rows(["ooo", "xx_", "x__"]))
+    assert check_end(state).result == "human"
+
+
+def test_check_end_draw():
+    state = new_game("robot")._replace(board=Board.from_rows(["xox", "xoo", "oxx"]))
+    assert check_end(state).result == "draw"
+
+
+def test_check_end_keeps_an_existing_result():
+    state = new_game("robot")._replace(board=Board.from_rows(["xxx", "oo_", "___"]), result="cheat")
+    assert check_end(state).result == "cheat"
+
+
+def test_on_detection_no_change():
+    state = new_game("human")
+    after, event = on_detection(state, Board.EMPTY)
+    assert event == NO_CHANGE
+    assert after == state
+
+
+def test_on_detection_human_moved():
+    state = new_game("human")
+    detected = Board.from_rows(["___", "_x_", "___"])
+    after, event = on_detection(state, detected)
+    assert event == HUMAN_MOVED
+    assert after.board == detected
+    assert after.robot_move and after.result is None
+
+
+def test_on_detection_accepts_rows():
+    after, event = on_detection(new_game("human"), [["_", "_", "_"], ["_", "X", "_"], ["_", "_", "_"]])
+    assert event == HUMAN_MOVED
+    assert after.board.cell(1, 1) == 'x'
+
+
+def test_on_detection_more_than_one_cell_is_cheating():
+    after, event = on_detection(new_game("human"), Board.from_rows(["x__", "_x_", "___"]))
+    assert event == CHEAT_MANY
+    assert after.result == "cheat"
+
+
+def test_on_detection_robot_token_is_cheating():
+    after, event = on_detection(new_game("human"), Board.from_rows(["___", "_o_", "___"]))
+    assert event == CHEAT_WRONG
+    assert after.result == "cheat"
+
+
+def test_on_detection_overwritten_cell_is_cheating():
+    state = new_game("human")._replace(board=Board.from_rows(["x__", "_o_", "___"]))
+    after, event = on_detection(state, Board.from_rows(["x__", "_x_", "___"]))
+    assert event == CHEAT_WRONG
+    assert after.result == "cheat"
+
+
+def test_on_robot_move_places_the_robot_token():
+    after = on_robot_move(new_game("robot"), 1, 1)
+    assert after.board == Board.from_rows(["___", "_x_", "___"])
+    assert not after.robot_move and after.result is None
+
+
+def test_on_robot_move_without_a_move_is_a_draw():
+    after = on_robot_move(new_game("robot"), -1, -1)
+    assert after.result == "draw"
+    assert after.board == Board.EMPTY
+
+
+def test_on_robot_move_on_a_full_board_is_a_draw():
+    state = new_game("robot")._replace(board=Board.from_rows(["xox", "xoo", "oxx"]))
+    assert on_robot_move(state, 0, 0).result == "draw"
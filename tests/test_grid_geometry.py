@@ -0,0 +1,16 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gridGeometry import compute_geometry, load_geometry
+
+CALIBRATION = dict(x=250, y=-80, z=-30, r=0, d=40, offset=5, n=3, lift=20)
+
+
+def test_load_geometry_computes_once_per_calibration():
+    geometry = load_geometry(**CALIBRATION)
+    assert load_geometry(**CALIBRATION) is geometry
+    assert load_geometry(**dict(CALIBRATION, n=4)) is not geometry
+    for name, array in compute_geometry(**CALIBRATION).items():
+        np.testing.assert_array_equal(geometry[name], array)
+        assert not geometry[name].flags.writeable
@@ -0,0 +1,30 @@
+from dobotSim import MODE_PTP
+from motionPlan import MotionPlan
+
+
+def poses(plan):
+    return [tuple(wp[:4]) for wp in plan.waypoints]
+
+
+def test_merge_collinear_drops_points_on_a_straight_segment():
+    plan = MotionPlan("line")
+    for x in (0, 10, 20, 30):
+        plan.add((x, 0, 0, 0))
+    assert poses(plan.merge_collinear()) == [(0, 0, 0, 0), (30, 0, 0, 0)]
+
+
+def test_merge_collinear_keeps_corners_and_turns_back():
+    plan = MotionPlan("corner")
+    for pose in ((0, 0, 0, 0), (10, 0, 0, 0), (10, 10, 0, 0), (10, 0, 0, 0)):
+        plan.add(pose)
+    assert len(plan.merge_collinear()) == 4
+
+
+def test_merge_collinear_keeps_mode_rotation_home_and_arc_boundaries():
+    plan = MotionPlan("mixed")
+    plan.add((0, 0, 0, 0)).add((10, 0, 0, 0), MODE_PTP.MOVJ_XYZ).add((20, 0, 0, 0))
+    plan.add((30, 0, 0, 5)).add((40, 0, 0, 5))
+    plan.home().add((50, 0, 0, 0)).add((60, 0, 0, 0))
+    plan.add_arc((65, 5, 0, 0), (70, 0, 0, 0)).add((80, 0, 0, 0))
+    before = list(plan.waypoints)
+    assert plan.merge_collinear().waypoints == before
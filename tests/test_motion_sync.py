@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+pytest.importorskip("numpy")    # gridGeometry, through dobotGrid
+
+from dobotGrid import POSE_TOLERANCE_MM, DobotGrid
+from dobotSim import HOME_POSE, SimDobot
+
+
+class PoseOnlyDobot:
+    """A controller that reports no command ids, only its pose."""
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def speed(self, velocity=100.0, acceleration=100.0):
+        self.sim.speed(velocity, acceleration)
+
+    def move_to(self, x, y, z, r, mode=None, wait=False):
+        self.sim.move_to(x, y, z, r, mode)
+
+    def home(self):
+        self.sim.home()
+
+    def pose(self):
+        return self.sim.pose()
+
+    def close(self):
+        pass
+
+
+def sim_grid(device):
+    dobot = DobotGrid(device=device)
+    dobot.generate_points()
+    return dobot
+
+
+def at(dobot, name):
+    return math.dist(dobot.device.pose()[:3], dobot.points[name][:3]) <= POSE_TOLERANCE_MM
+
+
+def test_waits_for_the_queued_command_index():
+    dobot = sim_grid(SimDobot(time_scale=20.0))
+    dobot.move_to_point("S1")
+    dobot.move_to_point("S8")
+    assert dobot._last_cmd == 2
+    assert dobot.wait_for_motion("s8")
+    assert dobot.device._get_queued_cmd_current_index() >= 2
+    assert at(dobot, "S8")
+
+
+def test_waits_for_the_pose_without_command_ids():
+    dobot = sim_grid(PoseOnlyDobot(SimDobot(time_scale=20.0)))
+    dobot.move_to_point("S1")
+    assert dobot._last_cmd is None
+    assert dobot.wait_for_motion("s1")
+    assert at(dobot, "S1")
+
+
+def test_learns_the_home_pose_once_homing_settles():
+    dobot = sim_grid(PoseOnlyDobot(SimDobot(time_scale=100.0)))
+    dobot.move_to_point("home")
+    assert dobot.wait_for_motion("home")
+    assert math.dist(dobot.home_pose[:3], HOME_POSE[:3]) <= POSE_TOLERANCE_MM
+
+
+@pytest.mark.parametrize("device", [SimDobot, lambda time_scale: PoseOnlyDobot(SimDobot(time_scale=time_scale))])
+def test_returns_false_on_timeout(device):
+    dobot = sim_grid(device(time_scale=0.01))
+    dobot.move_to_point("S8")
+    assert dobot.wait_for_motion("slow", timeout=0.2) is False
+    assert dobot.motion_log[-1][0] == "slow"
+    assert dobot.motion_log[-1][1] >= 0.2
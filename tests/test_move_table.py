@@ -0,0 +1,5 @@
+from ticTacToe import reachable_boards, table_mismatches
+
+
+def test_move_table_matches_minimax_on_every_reachable_position():
+    assert table_mismatches(reachable_boards()) == []
@@ -0,0 +1,17 @@
+import random
+from collections import Counter
+
+from penPath import optimize_strokes
+
+
+def test_optimize_strokes_reorders_the_same_strokes():
+    rng = random.Random(0)
+    strokes = [((rng.uniform(0, 200), rng.uniform(0, 200)), (rng.uniform(0, 200), rng.uniform(0, 200)))
+               for _ in range(12)]
+    optimized = optimize_strokes(strokes, start=(100.0, -50.0))
+    assert len(optimized) == len(strokes)
+    assert Counter(map(frozenset, optimized)) == Counter(map(frozenset, strokes))
+
+
+def test_optimize_strokes_without_strokes():
+    assert optimize_strokes([]) == []
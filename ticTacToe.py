@@ -1,6 +1,17 @@
 import math
+import os
+import sys
+
+from bitBoard import Board, as_board, canonical_key
+from stageTrace import traced
+
+MOVE_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "move_table.bin")
+NO_ENTRY = 0xFF
+NO_MOVE = 9
 
 def is_moves_left(board):
+    if isinstance(board, Board):
+        return board.has_moves()
     for row in board:
         if '_' in row:
             return True
@@ -8,6 +19,8 @@ def is_moves_left(board):
 
 
 def evaluate(board):
+    if isinstance(board, Board):
+        return board.score()
     for row in board:
         if row[0] == row[1] == row[2] != '_':
             return 10 if row[0] == 'x' else -10
@@ -22,7 +35,9 @@ def evaluate(board):
         return 10 if board[0][2] == 'x' else -10
     return 0
 
-def minimax(board, depth, is_maximizing):
+def minimax(board, depth, is_maximizing, stats=None):
+    if stats is not None:
+        stats.nodes += 1
     score = evaluate(board)
     if score == 10 or score == -10:
         return score
@@ -35,7 +50,7 @@ def minimax(board, depth, is_maximizing):
             for j in range(3):
                 if board[i][j] == '_':
                     board[i][j] = 'x'
-                    best = max(best, minimax(board, depth + 1, False))
+                    best = max(best, minimax(board, depth + 1, False, stats))
                     board[i][j] = '_'
         return best
     else:
@@ -44,12 +59,13 @@ def minimax(board, depth, is_maximizing):
             for j in range(3):
                 if board[i][j] == '_':
                     board[i][j] = 'o'
-                    best = min(best, minimax(board, depth + 1, True))
+                    best = min(best, minimax(board, depth + 1, True, stats))
                     board[i][j] = '_'
         return best
 
 
-def evaluate_next_move(board):
+def minimax_next_move(board, stats=None):
+    """Reference solver: full minimax from scratch. Used to build and verify the faster modes."""
     best_val = -math.inf
     best_move = (-1, -1)
 
@@ -57,7 +73,7 @@ def evaluate_next_move(board):
         for j in range(3):
             if board[i][j] == '_':
                 board[i][j] = 'x'
-                move_val = minimax(board, 0, False)
+                move_val = minimax(board, 0, False, stats)
                 board[i][j] = '_'
                 if move_val > best_val:
                     best_move = (i, j)
@@ -66,6 +82,271 @@ def evaluate_next_move(board):
     return best_move
 
 
+# ------------------ PRECOMPUTED MOVE TABLE ------------------
+# One byte per board, indexed by the base-3 number of the board read row by row
+# ('_' = 0, 'x' = 1, 'o' = 2). A byte holds move * 3 + (value + 10) // 10 for the
+# best move of 'x', or NO_ENTRY for boards that cannot occur in a game.
+
+TRIT = {'_': 0, 'x': 1, 'o': 2}
+
+
+def board_index(board):
+    if isinstance(board, Board):
+        return board.index
+    idx = 0
+    for k in range(8, -1, -1):
+        idx = idx * 3 + TRIT[board[k // 3][k % 3]]
+    return idx
+
+
+def reachable_boards():
+    """All boards reachable in a game, whichever side starts (play stops at a win)."""
+    seen = set()
+    for first in ('x', 'o'):
+        stack = [(('_',) * 9, first)]
+        while stack:
+            cells, turn = stack.pop()
+            if (cells, turn) in seen:
+                continue
+            seen.add((cells, turn))
+            board = [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+            if evaluate(board) != 0:
+                continue
+            nxt = 'o' if turn == 'x' else 'x'
+            for k in range(9):
+                if cells[k] == '_':
+                    stack.append((cells[:k] + (turn,) + cells[k + 1:], nxt))
+    return sorted({cells for cells, _ in seen})
+
+
+def build_move_table():
+    """Solve every reachable board once; the result matches minimax_next_move exactly."""
+    memo = {}
+
+    def value(cells, is_maximizing):
+        key = (cells, is_maximizing)
+        if key not in memo:
+            board = [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+            score = evaluate(board)
+            if score == 10 or score == -10:
+                memo[key] = score
+            elif '_' not in cells:
+                memo[key] = 0
+            else:
+                token = 'x' if is_maximizing else 'o'
+                vals = [value(cells[:k] + (token,) + cells[k + 1:], not is_maximizing)
+                        for k in range(9) if cells[k] == '_']
+                memo[key] = max(vals) if is_maximizing else min(vals)
+        return memo[key]
+
+    table = bytearray([NO_ENTRY]) * (3 ** 9)
+    for cells in reachable_boards():
+        best_val, best_k = -math.inf, NO_MOVE
+        for k in range(9):
+            if cells[k] == '_':
+                move_val = value(cells[:k] + ('x',) + cells[k + 1:], False)
+                if move_val > best_val:
+                    best_val, best_k = move_val, k
+        code = 1 if best_k == NO_MOVE else (best_val + 10) // 10
+        board = [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+        table[board_index(board)] = best_k * 3 + code
+    return bytes(table)
+
+
+def save_move_table(path=MOVE_TABLE_PATH):
+    table = build_move_table()
+    with open(path, "wb") as f:
+        f.write(table)
+    return table
+
+
+def load_move_table(path=MOVE_TABLE_PATH):
+    try:
+        with open(path, "rb") as f:
+            table = f.read()
+        if len(table) == 3 ** 9:
+            return table
+        print(f"Move table {path} is corrupt, rebuilding in memory.")
+    except FileNotFoundError:
+        print(f"Move table {path} not found, building in memory.")
+    return build_move_table()
+
+
+MOVE_TABLE = load_move_table()
+
+
+def lookup_move(board):
+    """Returns ((row, col), value) for 'x' from the table, or None if the board is not in it."""
+    entry = MOVE_TABLE[board_index(board)]
+    if entry == NO_ENTRY:
+        return None
+    k, code = divmod(entry, 3)
+    if k == NO_MOVE:
+        return (-1, -1), -math.inf
+    return (k // 3, k % 3), code * 10 - 10
+
+
+# ------------------ ALPHA-BETA SEARCH ------------------
+# Scores are depth aware: a win is worth 10 plus the number of cells still empty,
+# so the sooner it happens the higher it scores. Because the number of empty
+# cells is a property of the board, transposition entries stay valid across
+# searches and are shared by all 8 rotations/reflections of a position.
+
+EXACT, LOWER, UPPER = 0, 1, 2
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)  # center, corners, edges
+TRANSPOSITIONS = {}
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
+
+    def __repr__(self):
+        return f"SearchStats(nodes={self.nodes}, tt_hits={self.tt_hits}, cutoffs={self.cutoffs})"
+
+
+def alphabeta(board, is_maximizing, alpha=-math.inf, beta=math.inf, stats=None):
+    if stats is not None:
+        stats.nodes += 1
+    score = board.score()
+    if score:
+        empty = 9 - board.count()
+        return score + empty if score > 0 else score - empty
+    if not board.has_moves():
+        return 0
+
+    key = (canonical_key(board), is_maximizing)
+    entry = TRANSPOSITIONS.get(key)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT:
+            if stats is not None:
+                stats.tt_hits += 1
+            return value
+        if flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            if stats is not None:
+                stats.tt_hits += 1
+            return value
+
+    alpha0, beta0 = alpha, beta
+    free = board.empty_mask()
+    token = 'x' if is_maximizing else 'o'
+    best = -math.inf if is_maximizing else math.inf
+    for k in MOVE_ORDER:
+        if not free >> k & 1:
+            continue
+        val = alphabeta(board.place(k // 3, k % 3, token), not is_maximizing, alpha, beta, stats)
+        if is_maximizing:
+            best = max(best, val)
+            alpha = max(alpha, val)
+        else:
+            best = min(best, val)
+            beta = min(beta, val)
+        if alpha >= beta:
+            if stats is not None:
+                stats.cutoffs += 1
+            break
+
+    if best <= alpha0:
+        TRANSPOSITIONS[key] = (best, UPPER)
+    elif best >= beta0:
+        TRANSPOSITIONS[key] = (best, LOWER)
+    else:
+        TRANSPOSITIONS[key] = (best, EXACT)
+    return best
+
+
+def alphabeta_next_move(board, stats=None):
+    """Best move for 'x', preferring the fastest win (and the slowest loss)."""
+    board = as_board(board)
+    best_val = -math.inf
+    best_move = (-1, -1)
+    free = board.empty_mask()
+    for k in MOVE_ORDER:
+        if free >> k & 1:
+            move_val = alphabeta(board.place(k // 3, k % 3, 'x'), False, best_val, math.inf, stats)
+            if move_val > best_val:
+                best_move = (k // 3, k % 3)
+                best_val = move_val
+    return best_move
+
+
+# ------------------ ENTRY POINT ------------------
+
+SEARCH_MODES = ("table", "alphabeta", "minimax")
+
+
+@traced("search.evaluate_next_move")
+def evaluate_next_move(board, mode="table"):
+    """Best move for 'x' on a Board or a 3x3 list of lists.
+
+    mode: "table" (precomputed lookup), "alphabeta" (pruned search that prefers
+    faster wins) or "minimax" (the unpruned reference).
+    """
+    if mode == "alphabeta":
+        return alphabeta_next_move(board)
+    if mode == "table":
+        hit = lookup_move(board)
+        if hit is not None:
+            return hit[0]
+        # not a position from a legal game (e.g. a misdetection): solve it directly
+    elif mode != "minimax":
+        raise ValueError(f"Unknown search mode {mode!r}, expected one of {SEARCH_MODES}")
+    rows = board.to_rows() if isinstance(board, Board) else board
+    return minimax_next_move(rows)
+
+
+def rows_of(cells):
+    """3x3 rows of a 9-cell string or tuple, e.g. from reachable_boards()."""
+    return [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+
+
+def table_mismatches(boards):
+    """(cells, minimax move, table move) for every board where the move table disagrees with minimax."""
+    bad = []
+    for cells in boards:
+        expected = minimax_next_move(rows_of(cells))
+        got = evaluate_next_move(rows_of(cells))
+        if expected != got:
+            bad.append((cells, expected, got))
+    return bad
+
+
+def _move_value(rows, move):
+    """Reference minimax value of playing 'x' at move."""
+    i, j = move
+    rows[i][j] = 'x'
+    val = minimax(rows, 0, False)
+    rows[i][j] = '_'
+    return val
+
+
+def alphabeta_mismatches(boards):
+    """(cells, minimax value, alpha-beta value) for every board where alpha-beta's move is worse than minimax's."""
+    bad = []
+    for cells in boards:
+        if '_' not in cells:
+            continue
+        rows = rows_of(cells)
+        ref = _move_value(rows, minimax_next_move(rows))
+        got = _move_value(rows, alphabeta_next_move(Board.from_rows(rows)))
+        if ref != got:
+            bad.append((cells, ref, got))
+    return bad
+
+
+def best_move_for(board, token):
+    """Best move for `token` ('x' or 'o') on a Board or a 3x3 list of lists."""
+    board = as_board(board)
+    return evaluate_next_move(board if token == 'x' else board.swapped())
+
+
 # ------------------ FOR TERMINAL PLAY ------------------
 
 def print_board(board):
@@ -73,6 +354,12 @@ def print_board(board):
     print()
 
 
+def show_board(board, log=print):
+    """Board (Board or rows) as a grid with separators, as the robot games print it."""
+    rows = as_board(board).to_rows(empty=' ')
+    log("\n---+---+---\n".join(" " + " | ".join(r) + " " for r in rows))
+
+
 def check_winner(board):
     val = evaluate(board)
     if val == 10:
@@ -121,4 +408,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if "--build-table" in sys.argv:
+        save_move_table()
+        print(f"Move table written to {MOVE_TABLE_PATH}")
+    else:
+        main()